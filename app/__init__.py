@@ -16,6 +16,9 @@ from dotenv import load_dotenv
 import os
 
 
+import logging
+
+
 
 
 
@@ -37,10 +40,10 @@ load_dotenv(os.path.join(basedir, '.env'))
 from config import Config
 
 
-from app.extensions import db, login_manager, csrf, amadeus_client
+from app.extensions import db, login_manager, csrf
 
 
-from amadeus import Client
+from app.utils.model_registry import model_registry
 
 
 from datetime import datetime
@@ -49,37 +52,34 @@ from datetime import datetime
 
 
 
-def create_app(config_class=Config):
+# Set up logging
 
 
-    app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 
-    app.config.from_object(config_class)
-
 
 
 
+def create_app(config_class=Config):
 
-    # Print debug info about Amadeus credentials
 
+    app = Flask(__name__)
 
-    print("\n=== Debug: Amadeus Credentials ===")
 
+    app.config.from_object(config_class)
 
-    print(f"AMADEUS_CLIENT_ID found: {'Yes' if os.environ.get('AMADEUS_CLIENT_ID') else 'No'}")
 
 
-    print(f"AMADEUS_CLIENT_SECRET found: {'Yes' if os.environ.get('AMADEUS_CLIENT_SECRET') else 'No'}")
 
 
-    print(f"Config AMADEUS_CLIENT_ID: {'Yes' if app.config.get('AMADEUS_CLIENT_ID') else 'No'}")
+    logger.debug(f"Amadeus credentials configured: "
 
 
-    print(f"Config AMADEUS_CLIENT_SECRET: {'Yes' if app.config.get('AMADEUS_CLIENT_SECRET') else 'No'}")
+                 f"client id {'yes' if app.config.get('AMADEUS_CLIENT_ID') else 'no'}, "
 
 
-    print("===============================\n")
+                 f"client secret {'yes' if app.config.get('AMADEUS_CLIENT_SECRET') else 'no'}")
 
 
 
@@ -100,15 +100,35 @@ def create_app(config_class=Config):
     migrate = Migrate(app, db)
 
 
-    # Initialize Amadeus client
-    global amadeus_client
-    amadeus_client = Client(
-        client_id=app.config.get('AMADEUS_CLIENT_ID'),
-        client_secret=app.config.get('AMADEUS_CLIENT_SECRET')
-    )
-    
-    # Add Amadeus client to app context for access in routes
-    app.config['AMADEUS_CLIENT'] = amadeus_client
+    # The shared Amadeus client (pooled connections, cached OAuth token) is created by
+    # amadeus_api on the first search; set AMADEUS_CLIENT in the config to supply one
+
+    # Shared ML models, loaded on first use and reloaded when their pickles change
+    model_registry.init_app(app)
+
+    # Itinerary cost rollups kept current by ORM events, plus `flask rebuild-itinerary-rollups`
+    from app.utils import itinerary_rollups
+    itinerary_rollups.init_app(app)
+
+    # Cached per-user itinerary dropdowns, invalidated when itineraries change
+    from app.utils import itinerary_listing
+    itinerary_listing.init_app(app)
+
+    # Short-lived user snapshots so login_manager doesn't query the user on every request
+    from app.utils import user_cache
+    user_cache.init_app(app)
+
+    # `flask run-scheduler`, the one process that runs the periodic jobs registered below
+    from app.utils import periodic
+    periodic.init_app(app)
+
+    # `flask ingest-flights`, plus the scheduled ingest (FLIGHT_INGEST_INTERVAL)
+    from app.utils import flight_ingest
+    flight_ingest.init_app(app)
+
+    # `flask watch-prices`, plus the scheduled run (PRICE_WATCH_INTERVAL)
+    from app.utils import price_watch
+    price_watch.init_app(app)
 
 
     @app.template_filter('datetime')
@@ -147,7 +167,7 @@ def create_app(config_class=Config):
         from app.models import User, Itinerary, SavedFlight, Transportation, Booking
 
 
-        from app.models import Accommodation, Activity, Flight, HotelBooking, FlightBooking, UserSettings, Destination
+        from app.models import Accommodation, Activity, Flight, HotelBooking, FlightBooking, UserSettings, Destination, PriceChange
 
 
         
@@ -195,7 +215,7 @@ def create_app(config_class=Config):
     def load_user(id):
 
 
-        return User.query.get(int(id))
+        return user_cache.load_cached_user(id)
 
 
 
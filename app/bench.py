@@ -0,0 +1,421 @@
+"""
+Reproducible benchmarks for the flight price searches.
+
+    python -m app.bench search
+    python -m app.bench search --sizes 10000 100000 --repeats 5 --output bench.json
+
+Synthetic Flight tables are generated into throwaway SQLite databases, one per
+size, and every search in PRICE_SEARCH_MODES plus the linear search is run
+across a grid of target prices, tolerances and route selectivities. For each
+combination the report records latency percentiles, database round-trips
+(statements sent) and rows materialised (rows fetched from SQLite), as JSON,
+so runs can be diffed to spot regressions.
+
+    python -m app.bench imports --top 20
+    python -m app.bench startup --runs 5
+
+`imports` runs `python -X importtime` on create_app() in a fresh interpreter and
+lists the most expensive imports. `startup` times cold `import app` +
+create_app() in fresh interpreters, reports which of LAZY_MODULES were loaded,
+and compares the median against STARTUP_TIME_BUDGET_MS.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, insert, text
+
+from config import Config
+
+# Routes given a fixed share of the rows, keyed by that share. 1.0 means no route filter
+SELECTIVITY_ROUTES = {
+    1.0: (None, None),
+    0.1: ('LHR', 'JFK'),
+    0.01: ('LHR', 'CDG'),
+    0.001: ('LHR', 'BCN'),
+}
+# Airports for the remaining rows; none of them are LHR, so the routes above keep their share
+OTHER_AIRPORTS = ['MAN', 'EDI', 'AMS', 'FRA', 'MAD', 'FCO', 'IST', 'SIN', 'HKG', 'LAX', 'DXB', 'ORD']
+AIRLINES = ['British Airways', 'Virgin Atlantic', 'Air France', 'KLM', 'Lufthansa', 'Iberia', 'Emirates']
+FIRST_DEPARTURE = datetime(2026, 1, 5)
+DEPARTURE_DAYS = 30
+INSERT_CHUNK_SIZE = 20000
+
+# Heavy packages that features import when first used; create_app() shouldn't load them
+LAZY_MODULES = ('numpy', 'sklearn', 'amadeus', 'pandas')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Run in a fresh interpreter; the last line of its stdout is the JSON result
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (finished - imported) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+class QueryCounter:
+    """Counts statements and fetched rows on one SQLite engine"""
+
+    def __init__(self, engine):
+        self.round_trips = 0
+        self.rows = 0
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # sqlite3 calls the row factory once for every row it hands back
+        def count_row(cursor, row):
+            self.rows += 1
+            return row
+        dbapi_connection.row_factory = count_row
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.round_trips += 1
+
+    def reset(self):
+        self.round_trips = 0
+        self.rows = 0
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(math.ceil(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _make_app(db_path):
+    from app import create_app
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        # Built once per dataset; nothing writes to the table while the searches run
+        PRICE_INDEX_MAX_AGE = 0
+        WTF_CSRF_ENABLED = False
+
+    # Some modules create_app imports still print warnings to stdout (e.g. the
+    # ImportError fallbacks in app.models.user); keep stdout for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        return create_app(BenchConfig)
+
+
+def generate_flights(db, size, seed):
+    """Fill an empty database with `size` synthetic flights owned by one itinerary"""
+    from app.models import Flight, Itinerary, User
+
+    db.create_all()
+    db.session.execute(insert(User.__table__).values(
+        id=1, username='bench', email='bench@example.com', created_at=datetime.utcnow()))
+    db.session.execute(insert(Itinerary.__table__).values(
+        id=1, user_id=1, name='Benchmark flights', start_date=date(2026, 1, 1), end_date=date(2026, 2, 28)))
+
+    rng = random.Random(seed)
+    shares = [(share, route) for share, route in SELECTIVITY_ROUTES.items() if route != (None, None)]
+    rows = []
+    for flight_id in range(1, size + 1):
+        pick = rng.random()
+        route = None
+        for share, candidate in shares:
+            if pick < share:
+                route = candidate
+                break
+            pick -= share
+        if route is None:
+            route = tuple(rng.sample(OTHER_AIRPORTS, 2))
+
+        departure = FIRST_DEPARTURE + timedelta(days=rng.randrange(DEPARTURE_DAYS), minutes=rng.randrange(0, 1440, 5))
+        duration = rng.randrange(60, 900, 5)
+        rows.append({
+            'id': flight_id,
+            'itinerary_id': 1,
+            'departure_airport': route[0],
+            'arrival_airport': route[1],
+            'departure_time': departure,
+            'arrival_time': departure + timedelta(minutes=duration),
+            'airline': rng.choice(AIRLINES),
+            'flight_number': f'BN{flight_id % 10000:04d}',
+            'cost': round(min(max(rng.lognormvariate(math.log(400), 0.6), 30), 3000), 2),
+            'stops': rng.choice((0, 0, 0, 1, 1, 2)),
+            'duration': f'{duration // 60}h {duration % 60}m',
+            'is_connection': False,
+            'segment_order': 0,
+        })
+        if len(rows) >= INSERT_CHUNK_SIZE:
+            db.session.execute(insert(Flight.__table__), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(Flight.__table__), rows)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def _run_once(db, counter, search):
+    # A fresh session, so every run loads its rows instead of finding them in the identity map
+    db.session.remove()
+    counter.reset()
+    started = time.perf_counter()
+    matches, performance = search()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return elapsed_ms, counter.round_trips, counter.rows, len(matches), performance.get('error')
+
+
+def benchmark_dataset(size, args, workdir):
+    from app.extensions import db
+    from app.utils.binary_search import PRICE_SEARCH_MODES, linear_search_flights_by_price
+    from app.utils.price_index import price_index
+
+    db_path = os.path.join(workdir, f'flights_{size}.sqlite3')
+    app = _make_app(db_path)
+    results = []
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        # Make sure every connection is opened after the row counter is installed
+        db.engine.dispose()
+
+        started = time.perf_counter()
+        generate_flights(db, size, args.seed)
+        dataset = {'rows': size, 'generate_seconds': round(time.perf_counter() - started, 2)}
+
+        # The index is process-wide; rebuild it for this dataset and report the cost separately
+        price_index.invalidate()
+        db.session.remove()
+        counter.reset()
+        started = time.perf_counter()
+        price_index.build()
+        dataset['price_index_build'] = {
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+            'round_trips': counter.round_trips,
+            'rows_materialised': counter.rows,
+        }
+
+        searches = {mode: PRICE_SEARCH_MODES[mode] for mode in args.algorithms if mode in PRICE_SEARCH_MODES}
+        if 'linear' in args.algorithms:
+            searches['linear'] = linear_search_flights_by_price
+
+        for selectivity in args.selectivities:
+            origin, destination = SELECTIVITY_ROUTES[selectivity]
+            filtered_rows = int(size * selectivity)
+            for target_price in args.targets:
+                for tolerance in args.tolerances:
+                    for name, function in searches.items():
+                        entry = {
+                            'rows': size,
+                            'algorithm': name,
+                            'selectivity': selectivity,
+                            'origin': origin,
+                            'destination': destination,
+                            'target_price': target_price,
+                            'tolerance': tolerance,
+                        }
+                        if name == 'linear' and filtered_rows > args.max_linear_rows:
+                            entry['skipped'] = f'linear search over ~{filtered_rows} rows (--max-linear-rows)'
+                            results.append(entry)
+                            continue
+
+                        def search():
+                            return function(target_price, tolerance, origin, destination)
+
+                        # Warm-up run, not recorded
+                        _run_once(db, counter, search)
+                        runs = [_run_once(db, counter, search) for _ in range(args.repeats)]
+                        latencies = [run[0] for run in runs]
+                        entry.update({
+                            'repeats': args.repeats,
+                            'latency_ms': {
+                                'p50': round(_percentile(latencies, 50), 3),
+                                'p95': round(_percentile(latencies, 95), 3),
+                                'p99': round(_percentile(latencies, 99), 3),
+                                'mean': round(sum(latencies) / len(latencies), 3),
+                            },
+                            'round_trips': max(run[1] for run in runs),
+                            'rows_materialised': max(run[2] for run in runs),
+                            'matches': runs[-1][3],
+                        })
+                        if runs[-1][4]:
+                            entry['error'] = runs[-1][4]
+                        results.append(entry)
+
+        db.session.remove()
+        db.engine.dispose()
+
+    return dataset, results
+
+
+def run_search_benchmark(args):
+    workdir = args.workdir or tempfile.mkdtemp(prefix='xpedition-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        'benchmark': 'search',
+        'generated_at': datetime.utcnow().isoformat(),
+        'seed': args.seed,
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'datasets': [],
+        'results': [],
+    }
+    try:
+        for size in args.sizes:
+            dataset, results = benchmark_dataset(size, args, workdir)
+            report['datasets'].append(dataset)
+            report['results'].extend(results)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def _run_python(args):
+    # A fresh interpreter per run, so nothing is already imported
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+
+
+def profile_imports(top=25):
+    """
+    Import costs of `from app import create_app; create_app()` from -X importtime,
+    as the `top` modules by cumulative time and by self time (milliseconds).
+    """
+    result = _run_python(['-X', 'importtime', '-c', 'from app import create_app; create_app()'])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': round(int(self_us) / 1000, 2),
+            'cumulative_ms': round(int(cumulative_us) / 1000, 2),
+        })
+    return {
+        'benchmark': 'imports',
+        'modules': len(modules),
+        'total_ms': round(sum(module['self_ms'] for module in modules), 1),
+        'lazy_modules_loaded': sorted({module['module'].split('.')[0] for module in modules} & set(LAZY_MODULES)),
+        'by_cumulative': sorted(modules, key=lambda module: module['cumulative_ms'], reverse=True)[:top],
+        'by_self': sorted(modules, key=lambda module: module['self_ms'], reverse=True)[:top],
+    }
+
+
+def measure_startup(runs=5):
+    """
+    Time `from app import create_app; create_app()` in `runs` fresh interpreters,
+    after one untimed run that warms the bytecode and file caches.
+    """
+    samples = []
+    for run in range(runs + 1):
+        result = _run_python(['-c', STARTUP_PROBE])
+        if run:
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    report = {'benchmark': 'startup', 'runs': runs, 'lazy_modules_loaded': samples[-1]['loaded']}
+    for measure in ('import_ms', 'create_app_ms', 'total_ms'):
+        values = [sample[measure] for sample in samples]
+        report[measure] = {
+            'p50': round(_percentile(values, 50), 1),
+            'max': round(max(values), 1),
+        }
+    return report
+
+
+def _print_imports(report):
+    for title, key, field in (('cumulative', 'by_cumulative', 'cumulative_ms'), ('self', 'by_self', 'self_ms')):
+        print(f"Top imports by {title} time")
+        print(f"{'ms':>9}  module")
+        for module in report[key]:
+            print(f"{module[field]:>9.1f}  {'  ' * module['depth']}{module['module']}")
+        print()
+    print(f"{report['modules']} modules imported in {report['total_ms']}ms")
+    if report['lazy_modules_loaded']:
+        print(f"Loaded at startup but meant to be lazy: {', '.join(report['lazy_modules_loaded'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.bench', description='Xpedition benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help='Flight price search algorithms')
+    search.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Flight table sizes to generate')
+    search.add_argument('--algorithms', nargs='+', default=['binary', 'windowed', 'index', 'linear'],
+                        help='Searches to run: binary, windowed, index, linear')
+    search.add_argument('--targets', type=float, nargs='+', default=[150.0, 450.0, 1200.0],
+                        help='Target prices')
+    search.add_argument('--tolerances', type=float, nargs='+', default=[10.0, 50.0, 200.0],
+                        help='Price tolerances')
+    search.add_argument('--selectivities', type=float, nargs='+', default=[1.0, 0.1, 0.01],
+                        choices=sorted(SELECTIVITY_ROUTES), help='Share of rows on the filtered route')
+    search.add_argument('--repeats', type=int, default=5, help='Timed runs per combination')
+    search.add_argument('--max-linear-rows', type=int, default=200000,
+                        help='Skip the linear search when the filter leaves more rows than this')
+    search.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data')
+    search.add_argument('--workdir', help='Directory for the SQLite files (default: a temp dir)')
+    search.add_argument('--keep', action='store_true', help="Don't delete the SQLite files afterwards")
+    search.add_argument('--output', help='Write the JSON report here instead of stdout')
+    search.add_argument('--verbose', action='store_true', help='Keep the searches\' INFO logging')
+
+    imports = commands.add_parser('imports', help='Most expensive imports when creating the app')
+    imports.add_argument('--top', type=int, default=25, help='Modules to list')
+    imports.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    startup = commands.add_parser('startup', help='Cold import + create_app() time')
+    startup.add_argument('--runs', type=int, default=5, help='Timed runs, each in a fresh interpreter')
+    startup.add_argument('--budget-ms', type=float, help='Budget for the median; defaults to STARTUP_TIME_BUDGET_MS')
+    args = parser.parse_args(argv)
+
+    if args.command == 'imports':
+        report = profile_imports(args.top)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            _print_imports(report)
+        return
+
+    if args.command == 'startup':
+        report = measure_startup(args.runs)
+        report['budget_ms'] = args.budget_ms or Config.STARTUP_TIME_BUDGET_MS
+        report['within_budget'] = report['total_ms']['p50'] <= report['budget_ms']
+        print(json.dumps(report, indent=2))
+        if not report['within_budget']:
+            sys.exit(1)
+        return
+
+    if not args.verbose:
+        # The searches log every iteration at INFO, which would swamp the timings
+        logging.getLogger('app').setLevel(logging.WARNING)
+
+    report = run_search_benchmark(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,6 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 import secrets
-from amadeus import Client
 
 # Initialize SQLAlchemy without custom parameters
 db = SQLAlchemy()
@@ -18,6 +17,6 @@ login_manager.login_view = 'auth.login'
 # Initialize CSRF protection with stronger settings
 csrf = CSRFProtect()
 
-# Initialize Amadeus client
-# The actual credentials will be set in the create_app function
+# Kept for backwards compatibility; the Amadeus client is created on first use by
+# app.utils.amadeus_api via get_amadeus_transport()
 amadeus_client = None 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, session, abort
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from app import db
@@ -6,8 +6,11 @@ from app.models import User, UserSettings, Itinerary, Flight, Accommodation, Act
 from app.main.forms import ProfileForm, SettingsForm, ItineraryForm, FlightForm, AccommodationForm, ActivityForm, AIItineraryForm, FlightSearchForm, HotelSearchForm, BookingForm
 from app.utils.ai_planner import ItineraryGenerator
 from app.utils.api_client import get_api_client
+from app.utils.itinerary_repository import load_itinerary_view
+from app.utils.itinerary_deletion import delete_itineraries
+from app.utils.itinerary_listing import list_itineraries_page
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import random
 import string
@@ -81,8 +84,16 @@ def settings():
 @main_bp.route('/itineraries')
 @login_required
 def my_itineraries():
-    itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
-    return render_template('main/my_itineraries.html', title='My Itineraries', itineraries=itineraries)
+    try:
+        itineraries, next_cursor = list_itineraries_page(
+            current_user.id,
+            limit=current_app.config.get('ITINERARIES_PER_PAGE', 12),
+            after=request.args.get('after')
+        )
+    except ValueError:
+        abort(400)
+    return render_template('main/my_itineraries.html', title='My Itineraries', itineraries=itineraries,
+                           next_cursor=next_cursor)
 
 @main_bp.route('/itineraries/new', methods=['GET', 'POST'])
 @login_required
@@ -106,13 +117,16 @@ def create_itinerary():
 @main_bp.route('/itineraries/<int:itinerary_id>')
 @login_required
 def itinerary_detail(itinerary_id):
-    itinerary = Itinerary.query.get_or_404(itinerary_id)
+    view = load_itinerary_view(itinerary_id)
+    if view is None:
+        abort(404)
     # Ensure the itinerary belongs to the current user
-    if itinerary.user_id != current_user.id:
+    if view.user_id != current_user.id:
         flash('You do not have permission to view this itinerary.')
         return redirect(url_for('main.my_itineraries'))
     
-    return render_template('main/itinerary_detail.html', title=itinerary.name, itinerary=itinerary)
+    return render_template('main/itinerary_detail.html', title=view.itinerary.name, timedelta=timedelta,
+                           datetime=datetime, **view.template_context())
 
 @main_bp.route('/itineraries/<int:itinerary_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -151,8 +165,7 @@ def delete_itinerary(itinerary_id):
         flash('You do not have permission to delete this itinerary.')
         return redirect(url_for('main.my_itineraries'))
     
-    db.session.delete(itinerary)
-    db.session.commit()
+    delete_itineraries([itinerary.id], user_id=current_user.id)
     flash('Itinerary deleted successfully!')
     return redirect(url_for('main.my_itineraries'))
 
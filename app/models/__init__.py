@@ -13,6 +13,7 @@ from .hotel_booking import HotelBooking
 from .flight_booking import FlightBooking
 from .user_settings import UserSettings  # Make sure this is included
 from .destination import Destination  # Import from local file
+from .price_change import PriceChange
 
 __all__ = [
     'User',
@@ -26,5 +27,6 @@ __all__ = [
     'HotelBooking',
     'FlightBooking',
     'UserSettings',
-    'Destination'  # Keep this in exports
+    'Destination',  # Keep this in exports
+    'PriceChange'
 ]
\ No newline at end of file
@@ -19,7 +19,7 @@ class Accommodation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
 
-    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=False)
+    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=False, index=True)
 
 
     name = db.Column(db.String(255), nullable=False)
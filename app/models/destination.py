@@ -6,7 +6,7 @@ class Destination(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=False)
+    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     country = db.Column(db.String(100))
     description = db.Column(db.Text)
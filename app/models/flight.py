@@ -13,7 +13,37 @@ class Flight(db.Model):
     __tablename__ = 'flight'
 
 
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+
+
+        # Route/date lookups in the price searches and the flight_search fallback
+
+
+        db.Index('ix_flight_route_departure_cost', 'departure_airport', 'arrival_airport', 'departure_time', 'cost'),
+
+
+        # Itinerary loads and deleting a connection group
+
+
+        db.Index('ix_flight_itinerary_connection', 'itinerary_id', 'connection_group'),
+
+
+        # Price range (MIN/MAX) and nearest-price lookups without a route filter
+
+
+        db.Index('ix_flight_cost', 'cost'),
+
+
+        # One row per ingested journey; the corpus upsert (app/utils/flight_ingest.py) conflicts on it
+
+
+        db.Index('uq_flight_corpus_key', 'corpus_key', unique=True),
+
+
+        {'extend_existing': True}
+
+
+    )
 
 
     
@@ -22,7 +52,10 @@ class Flight(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
 
-    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=False)
+    # NULL for flights in the search corpus, which belong to no itinerary
+
+
+    itinerary_id = db.Column(db.Integer, db.ForeignKey('itinerary.id'), nullable=True)
 
 
     departure_airport = db.Column(db.String(100), nullable=False)
@@ -64,6 +97,9 @@ class Flight(db.Model):
     segment_order = db.Column(db.Integer, default=0)  # Order of segments in a connection
 
 
+    corpus_key = db.Column(db.String(64))  # Journey hash for search corpus rows, NULL otherwise
+
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
@@ -3,7 +3,11 @@ from datetime import datetime
 
 class Itinerary(db.Model):
     __tablename__ = 'itinerary'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Keyset pagination of a user's itineraries, newest first (app/utils/itinerary_listing.py)
+        db.Index('ix_itinerary_user_start_date', 'user_id', 'start_date', 'id'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -15,6 +19,13 @@ class Itinerary(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Cost rollups maintained by app/utils/itinerary_rollups.py; rebuild with
+    # `flask rebuild-itinerary-rollups` after bulk changes that bypass the ORM
+    flight_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    accommodation_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    activity_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    transportation_total = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    
     # Simplified relationships with no backrefs
     saved_flights = db.relationship('SavedFlight', lazy=True)
     flights = db.relationship('Flight', lazy=True)
@@ -22,5 +33,14 @@ class Itinerary(db.Model):
     accommodations = db.relationship('Accommodation', lazy=True, cascade='all, delete-orphan')
     transportation = db.relationship('Transportation', lazy=True)
     
+    @property
+    def total_spent(self):
+        return (self.flight_total or 0) + (self.accommodation_total or 0) + \
+            (self.activity_total or 0) + (self.transportation_total or 0)
+    
+    @property
+    def budget_remaining(self):
+        return (self.total_budget or 0) - self.total_spent
+    
     def __repr__(self):
         return f'<Itinerary {self.name}>'
\ No newline at end of file
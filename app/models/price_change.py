@@ -0,0 +1,39 @@
+from app.extensions import db
+from datetime import datetime
+
+class PriceChange(db.Model):
+    """A repriced SavedFlight whose fare moved, recorded for its owner's change feed"""
+    __tablename__ = 'price_change'
+    __table_args__ = (
+        # The change feed reads a user's newest changes first
+        db.Index('ix_price_change_user_checked', 'user_id', 'checked_at'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    saved_flight_id = db.Column(db.Integer, db.ForeignKey('saved_flight.id', ondelete='CASCADE'), nullable=False)
+    departure_airport = db.Column(db.String(10))
+    arrival_airport = db.Column(db.String(10))
+    departure_time = db.Column(db.DateTime)
+    airline = db.Column(db.String(100))
+    old_price = db.Column(db.Float)
+    new_price = db.Column(db.Float)
+    currency = db.Column(db.String(3))
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'saved_flight_id': self.saved_flight_id,
+            'route': f"{self.departure_airport}-{self.arrival_airport}",
+            'departure_time': self.departure_time.isoformat() if self.departure_time else None,
+            'airline': self.airline,
+            'old_price': self.old_price,
+            'new_price': self.new_price,
+            'change': round((self.new_price or 0) - (self.old_price or 0), 2),
+            'currency': self.currency,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None
+        }
+    
+    def __repr__(self):
+        return f'<PriceChange {self.departure_airport}-{self.arrival_airport} {self.old_price} -> {self.new_price}>'
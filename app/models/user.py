@@ -1,10 +1,9 @@
 from app.extensions import db
 try:
     # Try importing the required modules
-    from passlib.hash import pbkdf2_sha256
     from flask_login import UserMixin
     from datetime import datetime
-    from werkzeug.security import check_password_hash
+    from app.utils.password_hashing import hash_password, verify_and_update
 except ImportError as e:
     print(f"ImportError in models/user.py: {e}")
     # Define placeholder for UserMixin class if import fails
@@ -30,17 +29,17 @@ class User(UserMixin, db.Model):
         return f'<User {self.username}>'
 
     def set_password(self, password):
-        self.password_hash = pbkdf2_sha256.hash(password)
+        self.password_hash = hash_password(password)
 
-    def check_password(self, password):
-        # Try passlib's pbkdf2_sha256 first
-        try:
-            return pbkdf2_sha256.verify(password, self.password_hash)
-        except (ValueError, AttributeError):
-            # If that fails, try the old Werkzeug format
-            try:
-                return check_password_hash(self.password_hash, password)
-            except:
-                return False
+    def check_password(self, password, upgrade=False):
+        """
+        Check a password against the stored hash. With upgrade=True a correct
+        password whose hash uses an outdated scheme or cost is rehashed with the
+        current PASSWORD_HASH_SCHEME/PASSWORD_HASH_ROUNDS; the caller commits.
+        """
+        valid, new_hash = verify_and_update(password, self.password_hash)
+        if valid and upgrade and new_hash:
+            self.password_hash = new_hash
+        return valid
 
 # UserSettings class removed - now only defined in app/models/user_settings.py
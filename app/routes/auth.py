@@ -106,7 +106,10 @@ def login():
         password = request.form.get('password')
         user = User.query.filter_by(username=username).first()
         
-        if user and user.check_password(password):
+        if user and user.check_password(password, upgrade=True):
+            if db.session.is_modified(user):
+                # The stored hash was outdated and has been replaced
+                db.session.commit()
             login_user(user)
             return redirect(url_for('main.dashboard'))
             
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app, session, abort
 
 from flask_login import login_required, current_user
 
@@ -12,6 +12,14 @@ from datetime import datetime, timedelta
 
 from app.utils.ai_planner_fixed import ItineraryGenerator
 
+from app.utils.itinerary_repository import load_itinerary_view
+
+from app.utils.itinerary_deletion import delete_itineraries, delete_flight_group
+
+from app.utils.itinerary_listing import list_itineraries_page, list_itinerary_summaries
+
+from app.utils.price_watch import get_price_change_feed
+
 from flask_wtf import FlaskForm
 from wtforms import StringField, DateField, FloatField, SubmitField, SelectField, BooleanField, PasswordField
 from wtforms.validators import DataRequired, Optional, Email, EqualTo, ValidationError, Length
@@ -116,164 +124,176 @@ def index():
 
 def dashboard():
 
-    """User dashboard showing their itineraries"""
+    """User dashboard showing their itineraries, a page at a time"""
 
-    itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+    try:
 
-    return render_template('main/dashboard.html', itineraries=itineraries)
+        itineraries, next_cursor = list_itineraries_page(
 
+            current_user.id,
 
+            limit=current_app.config.get('ITINERARIES_PER_PAGE', 12),
 
-@main_bp.route('/create-itinerary', methods=['GET', 'POST'])
+            after=request.args.get('after')
 
-@login_required
+        )
 
-def create_itinerary():
+    except ValueError:
 
-    """Create a new itinerary"""
+        abort(400)
 
-    form = ItineraryForm()
+    return render_template('main/dashboard.html', itineraries=itineraries, next_cursor=next_cursor)
 
-    
 
-    if form.validate_on_submit():
 
-        # Create new itinerary from form data
 
-        itinerary = Itinerary(
 
-            name=form.name.data,
+@main_bp.route('/api/itineraries')
 
-            user_id=current_user.id,
+@login_required
 
-            start_date=form.start_date.data,
+def itinerary_summaries():
 
-            end_date=form.end_date.data,
+    """Keyset-paginated (id, name, start_date) listing of the user's itineraries"""
 
-            total_budget=form.total_budget.data or 0
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
 
-        )
+    try:
 
-        
+        items, next_cursor = list_itinerary_summaries(current_user.id, limit=limit,
 
-        db.session.add(itinerary)
+                                                      after=request.args.get('after'))
 
-        db.session.commit()
+    except ValueError as e:
 
-        
+        return jsonify({'error': str(e)}), 400
 
-        flash('Itinerary created successfully!', 'success')
+    return jsonify({
 
-        return redirect(url_for('main.view_itinerary', itinerary_id=itinerary.id))
+        'itineraries': [item.to_dict() for item in items],
 
-    
+        'next_cursor': next_cursor
 
-    return render_template('main/create_itinerary.html', form=form)
+    })
 
 
 
-@main_bp.route('/itinerary/<int:itinerary_id>')
+@main_bp.route('/api/price-changes')
 
 @login_required
 
-def view_itinerary(itinerary_id):
+def price_changes():
 
-    """View a specific itinerary"""
+    """The user's latest saved-flight price changes, optionally only those after ?since=<ISO time>"""
 
-    itinerary = Itinerary.query.get_or_404(itinerary_id)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
 
-    
+    since = request.args.get('since')
 
-    # Ensure the user owns this itinerary
+    if since:
 
-    if itinerary.user_id != current_user.id:
+        try:
 
-        flash('You do not have permission to view this itinerary.', 'danger')
+            since = datetime.fromisoformat(since)
 
-        return redirect(url_for('main.dashboard'))
+        except ValueError:
 
-    
+            return jsonify({'error': 'since must be an ISO 8601 timestamp'}), 400
 
-    # Ensure the itinerary has a total_budget value to prevent TypeErrors
+    return jsonify({'changes': get_price_change_feed(current_user.id, since=since or None, limit=limit)})
 
-    if itinerary.total_budget is None:
 
-        itinerary.total_budget = 0
 
-        db.session.commit()
+@main_bp.route('/create-itinerary', methods=['GET', 'POST'])
+
+@login_required
+
+def create_itinerary():
+
+    """Create a new itinerary"""
+
+    form = ItineraryForm()
 
     
 
-    activities = Activity.query.filter_by(itinerary_id=itinerary_id).all()
+    if form.validate_on_submit():
 
-    accommodations = Accommodation.query.filter_by(itinerary_id=itinerary_id).all()
+        # Create new itinerary from form data
 
-    flights = Flight.query.filter_by(itinerary_id=itinerary_id).all()
+        itinerary = Itinerary(
 
-    destinations = Destination.query.filter_by(itinerary_id=itinerary_id).all()
+            name=form.name.data,
 
-    
+            user_id=current_user.id,
 
-    # Ensure all activities have valid cost values
+            start_date=form.start_date.data,
 
-    for activity in activities:
+            end_date=form.end_date.data,
 
-        if activity.cost is None:
+            total_budget=form.total_budget.data or 0
 
-            activity.cost = 0
+        )
 
-    
+        
 
-    # Ensure all accommodations have valid cost values and dates
+        db.session.add(itinerary)
 
-    for accommodation in accommodations:
+        db.session.commit()
 
-        if accommodation.cost_per_night is None:
+        
+
+        flash('Itinerary created successfully!', 'success')
 
-            accommodation.cost_per_night = 0
+        return redirect(url_for('main.view_itinerary', itinerary_id=itinerary.id))
 
     
 
-    # Ensure all flights have valid cost values
+    return render_template('main/create_itinerary.html', form=form)
+
 
-    for flight in flights:
 
-        if flight.cost is None:
+@main_bp.route('/itinerary/<int:itinerary_id>')
 
-            flight.cost = 0
+@login_required
 
-    
+def view_itinerary(itinerary_id):
 
-    # Commit any changes we made to prevent None values
+    """View a specific itinerary"""
 
-    if activities or accommodations or flights:
+    view = load_itinerary_view(itinerary_id)
 
-        db.session.commit()
+    if view is None:
+
+        abort(404)
 
     
 
-    return render_template(
+    # Ensure the user owns this itinerary
 
-        'main/itinerary_detail.html',
+    if view.user_id != current_user.id:
 
-        itinerary=itinerary,
+        flash('You do not have permission to view this itinerary.', 'danger')
 
-        activities=activities,
+        return redirect(url_for('main.dashboard'))
 
-        accommodations=accommodations,
+    
 
-        flights=flights,
+    return render_template(
 
-        destinations=destinations,
+        'main/itinerary_detail.html',
 
         timedelta=timedelta,
 
-        datetime=datetime
+        datetime=datetime,
+
+        **view.template_context()
 
     )
 
 
 
+
+
 @main_bp.route('/ai-itinerary', methods=['GET'])
 
 def ai_itinerary_form():
@@ -444,23 +464,9 @@ def delete_itinerary(itinerary_id):
 
     
 
-    # Delete related records
-
-    Activity.query.filter_by(itinerary_id=itinerary_id).delete()
+    # Delete the itinerary and all related records in one transaction
 
-    Accommodation.query.filter_by(itinerary_id=itinerary_id).delete()
-
-    Flight.query.filter_by(itinerary_id=itinerary_id).delete()
-
-    Destination.query.filter_by(itinerary_id=itinerary_id).delete()
-
-    
-
-    # Delete the itinerary
-
-    db.session.delete(itinerary)
-
-    db.session.commit()
+    delete_itineraries([itinerary_id], user_id=current_user.id)
 
     
 
@@ -475,10 +481,13 @@ def delete_itinerary(itinerary_id):
 def delete_flight(flight_id):
     """Delete a flight from an itinerary"""
     flight = Flight.query.get_or_404(flight_id)
-    itinerary = Itinerary.query.get(flight.itinerary_id)
+    # Flights in the search corpus belong to no itinerary
+    if flight.itinerary_id is None:
+        abort(404)
     
     # Check if the user owns the itinerary
-    if itinerary.user_id != current_user.id:
+    itinerary = Itinerary.query.filter_by(id=flight.itinerary_id, user_id=current_user.id).first()
+    if itinerary is None:
         flash('You do not have permission to modify this itinerary.', 'danger')
         return redirect(url_for('main.dashboard'))
     
@@ -488,17 +497,7 @@ def delete_flight(flight_id):
     
     if delete_group and connection_group:
         # Delete all flights in the same connection group
-        flights_to_delete = Flight.query.filter_by(
-            itinerary_id=itinerary.id,
-            connection_group=connection_group
-        ).all()
-        
-        count = 0
-        for f in flights_to_delete:
-            db.session.delete(f)
-            count += 1
-        
-        db.session.commit()
+        count = delete_flight_group(itinerary.id, connection_group)
         
         if count > 1:
             flash(f'Flight journey with {count} segments deleted successfully.', 'success')
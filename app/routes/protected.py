@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, abort
 from flask_login import login_required, current_user
 from app.models import User, Itinerary, SavedFlight, Booking, Accommodation, Activity, Flight, Transportation, HotelBooking
 from amadeus import Client, ResponseError
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 import requests
 from flask import current_app
 from app.utils.amadeus_helper import search_hotels, format_hotel_data, search_flights, format_flight_data
+from app.utils.itinerary_repository import load_itinerary_view
+from app.utils.itinerary_listing import get_itinerary_choices
 import traceback
 import logging
 
@@ -50,7 +52,7 @@ def search_flights_route():
             flights = search_flights(origin, destination, departure_date, return_date, passengers)
             if flights:
                 formatted_flights = [format_flight_data(flight) for flight in flights]
-                user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+                user_itineraries = get_itinerary_choices(current_user.id)
                 return render_template('flight_search.html', 
                                     flights=flights,
                                     formatted_flights=formatted_flights,
@@ -72,7 +74,7 @@ def plan_holiday():
     print(f"Current user ID: {current_user.id}")
     
     # Get existing itineraries
-    user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+    user_itineraries = get_itinerary_choices(current_user.id)
     print(f"Found {len(user_itineraries)} itineraries for user")
     for itin in user_itineraries:
         print(f"Itinerary: {itin.id} - {itin.name}")
@@ -109,7 +111,7 @@ def plan_holiday():
             flash('New itinerary created successfully!')
             
             # Get updated list of itineraries
-            user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+            user_itineraries = get_itinerary_choices(current_user.id)
             print(f"Now user has {len(user_itineraries)} itineraries")
             
             return render_template('plan_holiday.html', user_itineraries=user_itineraries)
@@ -232,7 +234,7 @@ def save_flight():
 def test_flight_page():
     """Simple test page for flight saving"""
     # Get all itineraries for the current user
-    user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+    user_itineraries = get_itinerary_choices(current_user.id)
     
     return render_template('protected/test_flight.html', 
                           user_itineraries=user_itineraries,
@@ -241,8 +243,10 @@ def test_flight_page():
 @protected_bp.route('/itinerary/<int:itinerary_id>')
 @login_required
 def view_itinerary(itinerary_id):
-    itinerary = Itinerary.query.filter_by(id=itinerary_id, user_id=current_user.id).first_or_404()
-    return render_template('itinerary_details.html', itinerary=itinerary)
+    view = load_itinerary_view(itinerary_id, user_id=current_user.id)
+    if view is None:
+        abort(404)
+    return render_template('itinerary_details.html', **view.template_context())
 
 @protected_bp.route('/delete-flight/<int:flight_id>', methods=['POST'])
 @login_required
@@ -250,10 +254,13 @@ def delete_flight(flight_id):
     try:
         # Find the flight
         flight = Flight.query.get_or_404(flight_id)
+        # Flights in the search corpus belong to no itinerary
+        if flight.itinerary_id is None:
+            return jsonify({'success': False, 'error': 'Flight not found'}), 404
         
         # Check if the itinerary belongs to the current user
-        itinerary = Itinerary.query.get_or_404(flight.itinerary_id)
-        if itinerary.user_id != current_user.id:
+        itinerary = Itinerary.query.filter_by(id=flight.itinerary_id, user_id=current_user.id).first()
+        if itinerary is None:
             return jsonify({'success': False, 'error': 'You are not authorized to delete this flight'}), 403
         
         # Store the itinerary_id before deletion for redirect
@@ -1,11 +1,15 @@
-from flask import Blueprint, render_template, request, jsonify, current_app, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, current_app, flash, redirect, url_for, Response, stream_with_context
 from flask_login import current_user, login_required
 from app.models import User, Itinerary, Flight, Destination, Activity, Accommodation
-from app.utils.neural_recommender import NeuralRecommender
-from app.utils.binary_search import binary_search_flights_by_price, binary_search_hotels_by_price
-from app.utils.amadeus_api import search_flights
+from app.utils.model_registry import get_model
+from app.utils.binary_search import binary_search_flights_by_price, binary_search_hotels_by_price, PRICE_SEARCH_MODES
+from app.utils.amadeus_api import search_flights, search_flights_flexible
+from app.utils.hotel_api import get_hotel_client
+from app.utils.hotel_search_jobs import get_hotel_search_jobs
+from app.utils.itinerary_listing import get_itinerary_choices
 from app.extensions import db, csrf
 from datetime import datetime, timedelta
+import hmac
 import json
 import logging
 import traceback
@@ -47,8 +51,8 @@ def search_destinations():
                 if age_value and age_value.strip():
                     data['age'] = int(age_value)
             
-            # Get recommendations using neural recommender
-            recommender = NeuralRecommender()
+            # Get recommendations using the shared neural recommender
+            recommender = get_model('neural_recommender')
             recommendations = recommender.get_destination_recommendations(data)
             
             # Return JSON if the request was JSON, otherwise render template
@@ -69,14 +73,91 @@ def search_destinations():
         flash(f"An error occurred: {str(e)}", 'danger')
         return render_template('search/destinations.html', error=str(e))
 
+def _batch_request_authorized():
+    """Logged-in users, or service callers presenting DESTINATION_BATCH_TOKEN as a bearer token"""
+    if current_user.is_authenticated:
+        return True
+    token = current_app.config.get('DESTINATION_BATCH_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+@search_bp.route('/destinations/batch', methods=['POST'])
+@csrf.exempt
+def search_destinations_batch():
+    """
+    Score destination recommendations for many users in one request.
+    
+    Accepts a JSON list of preference dicts, or {"preferences": [...], "top_n": 5},
+    of at most DESTINATION_BATCH_MAX_SIZE entries; larger jobs should be split.
+    Returns {"results": [...]} in input order, or NDJSON (one {"index", "recommendations"}
+    object per line) when ?stream=1 is given or the client accepts application/x-ndjson.
+    An error while streaming ends the stream with an {"index", "error"} line for the
+    first entry without results.
+    """
+    if not _batch_request_authorized():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        preferences_list = data.get('preferences')
+        top_n = data.get('top_n', 5)
+    else:
+        preferences_list = data
+        top_n = 5
+    
+    if not isinstance(preferences_list, list) or not all(isinstance(p, dict) for p in preferences_list):
+        return jsonify({'error': 'Expected a JSON list of preference objects'}), 400
+    
+    max_size = current_app.config.get('DESTINATION_BATCH_MAX_SIZE', 10000)
+    if len(preferences_list) > max_size:
+        return jsonify({'error': f'At most {max_size} preference objects per request; split the job into smaller batches'}), 413
+    
+    try:
+        top_n = int(request.args.get('top_n', top_n))
+        recommender = get_model('neural_recommender')
+        
+        stream = request.args.get('stream') in ('1', 'true') or \
+            request.accept_mimetypes.best == 'application/x-ndjson'
+        
+        if stream:
+            def generate():
+                # Runs after the response has started, so errors become a final NDJSON record
+                index = 0
+                try:
+                    for recommendations in recommender.iter_destination_recommendations(preferences_list, top_n=top_n):
+                        yield json.dumps({'index': index, 'recommendations': recommendations}) + '\n'
+                        index += 1
+                except Exception as e:
+                    logger.error(f"Error streaming batch destination results: {str(e)}")
+                    yield json.dumps({'index': index, 'error': str(e)}) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        results = recommender.get_destination_recommendations_batch(preferences_list, top_n=top_n)
+        return jsonify({'count': len(results), 'results': results})
+    
+    except (TypeError, ValueError) as e:
+        logger.error(f"Invalid batch destination request: {str(e)}")
+        return jsonify({'error': f'Invalid preferences: {str(e)}'}), 400
+    except Exception as e:
+        logger.error(f"Error in batch destination search: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @search_bp.route('/similar-destinations/<destination>', methods=['GET'])
 @csrf.exempt
 def get_similar_destinations(destination):
     """Get destinations similar to the specified one"""
     try:
-        recommender = NeuralRecommender()
+        recommender = get_model('neural_recommender')
         similar_destinations = recommender.get_similar_destinations(destination)
-        return jsonify(similar_destinations)
+        
+        # The table only changes when the model does, so let clients revalidate cheaply
+        response = jsonify(similar_destinations)
+        response.add_etag()
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('SIMILAR_DESTINATIONS_MAX_AGE', 3600)
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error getting similar destinations: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -88,7 +169,7 @@ def flight_search():
     # Get user itineraries if user is logged in
     user_itineraries = None
     if current_user.is_authenticated:
-        user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+        user_itineraries = get_itinerary_choices(current_user.id)
     
     try:
         if request.method == 'POST':
@@ -348,6 +429,7 @@ def flight_search():
             departure_date = request.form.get('departure_date')
             return_date = request.form.get('return_date')
             passengers = int(request.form.get('passengers', 1))
+            flex_days = int(request.form.get('flex_days') or 0)
             
             # Validate inputs
             if not origin or len(origin) != 3:
@@ -370,13 +452,26 @@ def flight_search():
                     return_datetime = datetime.strptime(return_date, '%Y-%m-%d')
                 
                 # Search for flights using Amadeus API
-                formatted_flights, api_response = search_flights(
-                    origin=origin, 
-                    destination=destination,
-                    departure_date=departure_date,
-                    return_date=return_date,
-                    adults=passengers
-                )
+                flex_matrix = None
+                if flex_days > 0:
+                    # Cheapest fare for every nearby date pair, plus the offers for the cheapest one
+                    flex_matrix, api_response = search_flights_flexible(
+                        origin=origin,
+                        destination=destination,
+                        departure_date=departure_date,
+                        return_date=return_date,
+                        adults=passengers,
+                        flex_days=flex_days
+                    )
+                    formatted_flights = flex_matrix['offers']
+                else:
+                    formatted_flights, api_response = search_flights(
+                        origin=origin, 
+                        destination=destination,
+                        departure_date=departure_date,
+                        return_date=return_date,
+                        adults=passengers
+                    )
                 
                 # Handle potential API errors
                 if 'error' in api_response:
@@ -480,12 +575,14 @@ def flight_search():
                 return render_template('flight_search.html',
                                      user_itineraries=user_itineraries,
                                      formatted_flights=formatted_flights,
+                                     flex_matrix=flex_matrix,
                                      search_params={
                                          'from': origin,
                                          'to': destination,
                                          'departure_date': departure_date,
                                          'return_date': return_date,
-                                         'passengers': passengers
+                                         'passengers': passengers,
+                                         'flex_days': flex_days
                                      })
                 
             except Exception as e:
@@ -517,6 +614,7 @@ def flight_price_search():
                 departure_date = data.get('departure_date')
                 return_date = data.get('return_date')
                 adaptive_tolerance = data.get('adaptive_tolerance', False)
+                search_mode = data.get('search_mode', 'binary')
             else:
                 target_price = float(request.form.get('price', 500))
                 tolerance = float(request.form.get('tolerance', 100))
@@ -525,13 +623,17 @@ def flight_price_search():
                 departure_date = request.form.get('departure_date')
                 return_date = request.form.get('return_date')
                 adaptive_tolerance = request.form.get('adaptive_tolerance') == 'on'
+                search_mode = request.form.get('search_mode', 'binary')
+            
+            # Fall back to the classic binary search for unknown modes
+            search_function = PRICE_SEARCH_MODES.get(search_mode, binary_search_flights_by_price)
             
             # Log the search parameters
             destination_info = f"destination={destination}" if destination else "destination=Any (searching all destinations)"
-            logger.info(f"Flight price search: target=£{target_price}, tolerance=£{tolerance}, origin={origin}, {destination_info}, departure_date={departure_date}")
+            logger.info(f"Flight price search: target=£{target_price}, tolerance=£{tolerance}, origin={origin}, {destination_info}, departure_date={departure_date}, mode={search_mode}")
             
-            # Perform binary search
-            matching_flights, performance_data = binary_search_flights_by_price(
+            # Perform the price search
+            matching_flights, performance_data = search_function(
                 target_price=target_price,
                 tolerance=tolerance,
                 origin=origin,
@@ -570,7 +672,7 @@ def flight_price_search():
                 'performance': {
                     'execution_time_ms': performance_data.get('duration_ms', 0),
                     'iterations': performance_data.get('iterations', 0),
-                    'algorithm': 'binary_search',
+                    'algorithm': performance_data.get('algorithm', 'binary_search'),
                     'adaptive_tolerance_used': adaptive_tolerance,
                     'min_price': performance_data.get('min_price'),
                     'max_price': performance_data.get('max_price')
@@ -594,7 +696,8 @@ def flight_price_search():
                                       'to': destination,
                                       'departure_date': departure_date,
                                       'return_date': return_date,
-                                      'adaptive_tolerance': adaptive_tolerance
+                                      'adaptive_tolerance': adaptive_tolerance,
+                                      'search_mode': search_mode
                                   })
         
         # GET request - show search form
@@ -618,7 +721,7 @@ def hotel_search():
         # Get user itineraries if user is logged in
         user_itineraries = None
         if current_user.is_authenticated:
-            user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+            user_itineraries = get_itinerary_choices(current_user.id)
         
         if request.method == 'POST':
             # Get hotel search parameters
@@ -696,7 +799,7 @@ def activity_search():
         # Get user itineraries if user is logged in
         user_itineraries = None
         if current_user.is_authenticated:
-            user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+            user_itineraries = get_itinerary_choices(current_user.id)
 
         if request.method == 'POST':
             if request.is_json:
@@ -783,7 +886,7 @@ def hotel_price_search():
         # Get user itineraries if user is logged in
         user_itineraries = None
         if current_user.is_authenticated:
-            user_itineraries = Itinerary.query.filter_by(user_id=current_user.id).all()
+            user_itineraries = get_itinerary_choices(current_user.id)
         
         if request.method == 'POST':
             # Get search parameters
@@ -910,6 +1013,60 @@ def hotel_price_search():
         flash(f"An error occurred: {str(e)}", 'danger')
         return render_template('search/hotel_price_search.html')
 
+@search_bp.route('/hotel-price/jobs', methods=['POST'])
+@login_required
+def start_hotel_search_job():
+    """Start a live hotel search in the background and return its job id"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        city = (data.get('city') or '').strip().upper()
+        if not city:
+            return jsonify({'error': 'city is required'}), 400
+
+        try:
+            check_in = datetime.strptime(str(data.get('check_in', '')), '%Y-%m-%d')
+            check_out = datetime.strptime(str(data.get('check_out', '')), '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'check_in and check_out must be dates in YYYY-MM-DD format'}), 400
+        if check_out <= check_in:
+            return jsonify({'error': 'check_out must be after check_in'}), 400
+
+        try:
+            guests = int(data.get('guests', 1))
+            rooms = int(data.get('rooms', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'guests and rooms must be whole numbers'}), 400
+        if guests < 1 or rooms < 1:
+            return jsonify({'error': 'guests and rooms must be at least 1'}), 400
+        currency = data.get('currency', 'GBP')
+
+        # The client reads its settings from the app config, so build it in the request thread
+        job_id = get_hotel_search_jobs().submit(get_hotel_client(), city, check_in, check_out,
+                                                adults=guests, rooms=rooms, currency=currency,
+                                                owner=current_user.id)
+        if job_id is None:
+            return jsonify({'error': 'Too many hotel searches in progress; try again shortly'}), 429
+        logger.info(f"Started hotel search job {job_id} for {city} ({check_in:%Y-%m-%d} to {check_out:%Y-%m-%d})")
+
+        return jsonify({
+            'job_id': job_id,
+            'status': 'pending',
+            'status_url': url_for('search.hotel_search_job_status', job_id=job_id)
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error starting hotel search job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@search_bp.route('/hotel-price/jobs/<job_id>', methods=['GET'])
+@login_required
+def hotel_search_job_status(job_id):
+    """Return the current (possibly partial) results of a hotel search job"""
+    job = get_hotel_search_jobs().get(job_id)
+    if job is None or job.pop('owner', None) != current_user.id:
+        return jsonify({'error': 'Unknown or expired hotel search job'}), 404
+    return jsonify(job)
+
 @search_bp.route('/save-hotel-to-itinerary', methods=['POST'])
 @login_required
 def save_hotel_to_itinerary():
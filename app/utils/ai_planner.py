@@ -5,10 +5,9 @@ from datetime import datetime, timedelta
 from app.models import Destination
 from app.models import Itinerary, Activity, Accommodation, Flight
 from app import db
-from .recommendation_model import DestinationRecommender
-from .price_predictor import PricePredictor
 from .api_client import MockApiClient
-from .itinerary_generator import ItineraryNeuralNetwork
+from .model_registry import get_model
+from .planner_executor import get_planner_executor
 import uuid
 
 # Path to save data files
@@ -153,11 +152,11 @@ class ItineraryGenerator:
     def __init__(self):
         self.destinations = DESTINATIONS
         self.interests = INTERESTS
-        self.destination_recommender = DestinationRecommender()
-        self.flight_predictor = PricePredictor(model_type='flight')
-        self.hotel_predictor = PricePredictor(model_type='hotel')
+        self.destination_recommender = get_model('destination_recommender')
+        self.flight_predictor = get_model('flight_price_predictor')
+        self.hotel_predictor = get_model('hotel_price_predictor')
         self.mock_client = MockApiClient()
-        self.itinerary_nn = ItineraryNeuralNetwork()
+        self.itinerary_nn = get_model('itinerary_network')
         print("Initialized AI planner with neural networks")
     
     def generate_itinerary(self, destination, duration_days, budget, interests_text, age=25, travel_style='standard'):
@@ -205,21 +204,45 @@ class ItineraryGenerator:
             'total_budget': budget
         }
         
-        # Use price prediction for accommodations
+        # Activity scoring only needs the traveller's preferences
+        user_preferences = {
+            'interests': interests_list,
+            'budget': budget,
+            'duration': duration_days,
+            'month': datetime.now().month,
+            'age': age,  # Use the provided age parameter
+            'travel_style': travel_style  # Use the provided travel style parameter
+        }
+        
+        # Flights, accommodation prices and activity scores don't depend on each
+        # other, so look them up concurrently within the planner deadline
         accommodations = dest_data['accommodations']
-        for acc in accommodations:
-            predicted_price = self.hotel_predictor.predict_price({
-                'city': destination,
-                'check_in': itinerary['start_date'].strftime('%Y-%m-%d'),
-                'check_out': itinerary['end_date'].strftime('%Y-%m-%d'),
-                'star_rating': 4 if acc['type'] == 'luxury' else 3,
-                'breakfast_included': acc['type'] in ['luxury', 'hotel']
-            })
-            acc['predicted_price'] = predicted_price['predicted_price']
+        planner_run = get_planner_executor().run(
+            {
+                'accommodation': lambda: self._predict_accommodation_prices(destination, itinerary, accommodations),
+                'flights': lambda: self._generate_mock_flights(destination, itinerary['start_date'], itinerary['end_date'], budget),
+                # Use neural network to score and select activities based on user preferences
+                'activities': lambda: self.itinerary_nn.generate_itinerary_activities(
+                    user_preferences=user_preferences,
+                    available_activities=dest_data['activities'],
+                    num_activities=duration_days * 2  # 2 activities per day
+                )
+            },
+            fallbacks={
+                # Listed prices stand in for predictions that didn't arrive in time
+                'accommodation': lambda: [dict(acc, predicted_price=float(acc.get('cost_per_night', 0)))
+                                          for acc in accommodations],
+                'activities': []
+            }
+        )
+        itinerary['timings'] = planner_run.report()
+        
+        if not planner_run.succeeded('flights'):
+            raise RuntimeError('Could not find flights for this trip in time, please try again')
         
         # Select accommodation based on predicted prices and budget
         daily_accommodation_budget = budget * 0.4 / duration_days
-        accommodations = sorted(accommodations, 
+        accommodations = sorted(planner_run.get('accommodation'), 
                               key=lambda x: abs(x['predicted_price'] - daily_accommodation_budget))
         selected_accommodation = accommodations[0]
         
@@ -230,8 +253,7 @@ class ItineraryGenerator:
             'total_cost': selected_accommodation['predicted_price'] * duration_days
         }
         
-        # Generate mock flights to and from the destination
-        outbound_flight, return_flight = self._generate_mock_flights(destination, itinerary['start_date'], itinerary['end_date'], budget)
+        outbound_flight, return_flight = planner_run.get('flights')
         itinerary['flights'] = [outbound_flight, return_flight]
         
         # Calculate flight costs
@@ -241,22 +263,7 @@ class ItineraryGenerator:
         remaining_budget = budget - itinerary['accommodation']['total_cost'] - flight_cost
         daily_activity_budget = remaining_budget / duration_days
         
-        # Use neural network to score and select activities based on user preferences
-        user_preferences = {
-            'interests': interests_list,
-            'budget': budget,
-            'duration': duration_days,
-            'month': datetime.now().month,
-            'age': age,  # Use the provided age parameter
-            'travel_style': travel_style  # Use the provided travel style parameter
-        }
-        
-        # Get neural network recommendations for activities
-        nn_activities = self.itinerary_nn.generate_itinerary_activities(
-            user_preferences=user_preferences,
-            available_activities=dest_data['activities'],
-            num_activities=duration_days * 2  # 2 activities per day
-        )
+        nn_activities = planner_run.get('activities')
         
         # Convert to the format expected by the rest of the code
         selected_activities = []
@@ -303,6 +310,24 @@ class ItineraryGenerator:
         
         return itinerary
 
+    def _predict_accommodation_prices(self, destination, itinerary, accommodations):
+        """
+        Copies of the accommodation options with a 'predicted_price' per night,
+        predicting every option in one batch
+        """
+        predicted_prices = self.hotel_predictor.predict_prices([
+            {
+                'city': destination,
+                'check_in': itinerary['start_date'].strftime('%Y-%m-%d'),
+                'check_out': itinerary['end_date'].strftime('%Y-%m-%d'),
+                'star_rating': 4 if acc['type'] == 'luxury' else 3,
+                'breakfast_included': acc['type'] in ['luxury', 'hotel']
+            }
+            for acc in accommodations
+        ])
+        return [dict(acc, predicted_price=float(predicted_price))
+                for acc, predicted_price in zip(accommodations, predicted_prices['predicted_price'])]
+
     def _generate_mock_flights(self, destination, start_date, end_date, budget):
         """
         Generate mock flights for the itinerary
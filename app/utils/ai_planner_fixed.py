@@ -2,8 +2,7 @@ import os
 import json
 import random
 from datetime import datetime, timedelta
-from .recommendation_model import DestinationRecommender
-from .itinerary_generator import ItineraryNeuralNetwork
+from .model_registry import get_model
 from flask import current_app
 
 class ItineraryGenerator:
@@ -23,8 +22,8 @@ class ItineraryGenerator:
             print("Invalid or missing API key, falling back to MockHotelClient")
             
         # Initialize recommendation model
-        self.recommender = DestinationRecommender()
-        self.neural_network = ItineraryNeuralNetwork()
+        self.recommender = get_model('destination_recommender')
+        self.neural_network = get_model('itinerary_network')
         print("Initialized AI planner with neural networks")
         
     def generate_itinerary(self, preferences):
@@ -1,12 +1,173 @@
-from app.extensions import amadeus_client
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
 import logging
 from flask import current_app
+from app.utils.response_cache import cache_from_config
+from app.utils.amadeus_transport import get_amadeus_transport
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+_flexible_executor_lock = threading.Lock()
+
 def search_flights(origin, destination, departure_date, return_date=None, adults=1):
+    """
+    Search for flights using the Amadeus API, serving repeated identical searches
+    from the flight offer cache
+    
+    Args:
+        origin: Origin airport IATA code (e.g., 'LHR')
+        destination: Destination airport IATA code (e.g., 'JFK')
+        departure_date: Departure date in YYYY-MM-DD format
+        return_date: Optional return date in YYYY-MM-DD format
+        adults: Number of adult passengers
+        
+    Returns:
+        A list of formatted flight offers or an empty list if no flights found
+    """
+    departure_date_str = departure_date.strftime('%Y-%m-%d') if isinstance(departure_date, datetime) else departure_date
+    return_date_str = return_date.strftime('%Y-%m-%d') if isinstance(return_date, datetime) else return_date
+    
+    cache = get_flight_offer_cache()
+    key = _flight_offer_key(cache, origin, destination, departure_date_str, return_date_str, adults)
+    
+    # Only successful searches are cached; errors and empty results are retried next time
+    (formatted_flights, meta), cached = cache.get_or_compute(
+        key,
+        lambda: _search_flights_uncached(origin, destination, departure_date, return_date, adults),
+        cacheable=lambda result: result[1].get('success', False)
+    )
+    
+    if cached:
+        meta = dict(meta, cached=True)
+        logger.info(f"Served flights from {origin} to {destination} on {departure_date_str} from cache")
+    return formatted_flights, meta
+
+def get_flight_offer_cache():
+    """Return the flight offer cache for the current app, creating it from config on first use"""
+    return cache_from_config(current_app, 'flight_offer_cache', 'FLIGHT_OFFER_CACHE')
+
+def _flight_offer_key(cache, origin, destination, departure_date_str, return_date_str, adults):
+    return cache.make_key((origin or '').strip().upper(), (destination or '').strip().upper(),
+                          departure_date_str, return_date_str or None, int(adults))
+
+def _flexible_dates(date_str, flex_days, earliest):
+    day = datetime.strptime(date_str, '%Y-%m-%d').date()
+    dates = [day + timedelta(days=offset) for offset in range(-flex_days, flex_days + 1)]
+    return [d.strftime('%Y-%m-%d') for d in dates if d >= earliest]
+
+def _cheapest_price(flights):
+    prices = [flight['price']['total'] for flight in flights if flight.get('price', {}).get('total') is not None]
+    return min(prices) if prices else None
+
+def _flexible_search_executor():
+    app = current_app._get_current_object()
+    with _flexible_executor_lock:
+        executor = app.extensions.get('flexible_flight_search')
+        if executor is None:
+            # Shared by every request, so the cap bounds total upstream concurrency
+            executor = ThreadPoolExecutor(max_workers=app.config.get('FLEXIBLE_SEARCH_CONCURRENCY', 4),
+                                          thread_name_prefix='flex-search')
+            app.extensions['flexible_flight_search'] = executor
+        return executor
+
+def search_flights_flexible(origin, destination, departure_date, return_date=None, adults=1, flex_days=3):
+    """
+    Search every departure/return date pair within +/- flex_days of the given
+    dates and summarise the cheapest fare for each pair
+    
+    Pairs already in the flight offer cache are served from it; the rest are
+    searched concurrently on a shared pool capped at FLEXIBLE_SEARCH_CONCURRENCY.
+    Dates in the past and returns before the departure are skipped.
+    
+    Args:
+        origin: Origin airport IATA code (e.g., 'LHR')
+        destination: Destination airport IATA code (e.g., 'JFK')
+        departure_date: Departure date in YYYY-MM-DD format
+        return_date: Optional return date in YYYY-MM-DD format
+        adults: Number of adult passengers
+        flex_days: Days either side of each date to search, capped at FLEXIBLE_SEARCH_MAX_DAYS
+        
+    Returns:
+        A (matrix, meta) tuple. matrix holds 'departure_dates', 'return_dates'
+        ([None] for one-way), 'prices' (cheapest fare per departure x return
+        pair, None where nothing was found), 'cheapest' (the cheapest pair) and
+        'offers' (every offer for the cheapest pair, cheapest first)
+    """
+    started = time.time()
+    departure_date = departure_date.strftime('%Y-%m-%d') if isinstance(departure_date, datetime) else departure_date
+    return_date = return_date.strftime('%Y-%m-%d') if isinstance(return_date, datetime) else return_date
+    flex_days = max(0, min(int(flex_days), current_app.config.get('FLEXIBLE_SEARCH_MAX_DAYS', 3)))
+    
+    today = datetime.now().date()
+    departure_dates = _flexible_dates(departure_date, flex_days, today)
+    return_dates = _flexible_dates(return_date, flex_days, today) if return_date else [None]
+    cells = [(dep, ret) for dep in departure_dates for ret in return_dates if ret is None or ret >= dep]
+    
+    matrix = {
+        'departure_dates': departure_dates,
+        'return_dates': return_dates,
+        'prices': [[None] * len(return_dates) for _ in departure_dates],
+        'cheapest': None,
+        'offers': []
+    }
+    meta = {'cells': len(cells), 'cached_cells': 0, 'searched_cells': 0, 'failed_cells': 0}
+    
+    def record(dep, ret, flights, cell_meta):
+        if 'error' in cell_meta:
+            meta['failed_cells'] += 1
+        price = _cheapest_price(flights)
+        if price is None:
+            return
+        matrix['prices'][departure_dates.index(dep)][return_dates.index(ret)] = price
+        if matrix['cheapest'] is None or price < matrix['cheapest']['price']:
+            matrix['cheapest'] = {'departure_date': dep, 'return_date': ret, 'price': price}
+            # Only the cheapest pair's offers are kept
+            matrix['offers'] = sorted(flights, key=lambda flight: flight['price']['total'])
+    
+    # Serve pairs someone already searched without touching the pool
+    cache = get_flight_offer_cache()
+    pending = []
+    for dep, ret in cells:
+        cached = cache.get(_flight_offer_key(cache, origin, destination, dep, ret, adults))
+        if cached is not None:
+            meta['cached_cells'] += 1
+            flights, cell_meta = cached
+            record(dep, ret, flights, cell_meta)
+        else:
+            pending.append((dep, ret))
+    
+    if pending:
+        app = current_app._get_current_object()
+        
+        def search_cell(dep, ret):
+            # Workers need an app context for the Amadeus client and the cache
+            with app.app_context():
+                return search_flights(origin, destination, dep, ret, adults)
+        
+        executor = _flexible_search_executor()
+        futures = {executor.submit(search_cell, dep, ret): (dep, ret) for dep, ret in pending}
+        for future in as_completed(futures):
+            dep, ret = futures[future]
+            meta['searched_cells'] += 1
+            try:
+                flights, cell_meta = future.result()
+            except Exception as e:
+                logger.error(f"Flexible search for {dep}/{ret} failed: {str(e)}")
+                flights, cell_meta = [], {'error': str(e)}
+            record(dep, ret, flights, cell_meta)
+    
+    meta['duration_ms'] = round((time.time() - started) * 1000, 1)
+    if matrix['cheapest'] is None:
+        meta['error'] = 'No flights found for any of the flexible dates'
+    else:
+        meta.update({'success': True, 'count': len(matrix['offers'])})
+    logger.info(f"Flexible search {origin}-{destination}: {meta}")
+    return matrix, meta
+
+def _search_flights_uncached(origin, destination, departure_date, return_date=None, adults=1):
     """
     Search for flights using the Amadeus API
     
@@ -21,8 +182,8 @@ def search_flights(origin, destination, departure_date, return_date=None, adults
         A list of formatted flight offers or an empty list if no flights found
     """
     try:
-        # Get the Amadeus client from the current app context
-        amadeus_client = current_app.config.get('AMADEUS_CLIENT')
+        # A client set in the config (e.g. by tests), otherwise the shared transport
+        amadeus_client = current_app.config.get('AMADEUS_CLIENT') or get_amadeus_transport()
         
         if not amadeus_client:
             logger.error("Amadeus client not initialized")
@@ -1,13 +1,12 @@
-from amadeus import Client, ResponseError
+from app.utils.amadeus_transport import get_amadeus_transport, AmadeusTransportError
 import os
 from datetime import datetime
 
 class AmadeusAPI:
     def __init__(self):
-        self.amadeus = Client(
+        self.amadeus = get_amadeus_transport(
             client_id=os.getenv('AMADEUS_CLIENT_ID'),
-            client_secret=os.getenv('AMADEUS_CLIENT_SECRET'),
-            hostname='test'
+            client_secret=os.getenv('AMADEUS_CLIENT_SECRET')
         )
 
     def search_flights(self, origin, destination, departure_date):
@@ -20,7 +19,7 @@ class AmadeusAPI:
                 max=5
             )
             return response.data
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             print(f"Flight search error: {str(e)}")
             return None
 
@@ -41,11 +40,11 @@ class AmadeusAPI:
                         checkOutDate=check_out.strftime('%Y-%m-%d')
                     )
                     hotel_offers.extend(offers.data)
-                except ResponseError:
+                except AmadeusTransportError:
                     continue
                     
             return hotel_offers
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             print(f"Hotel search error: {str(e)}")
             return None
 
@@ -56,7 +55,7 @@ class AmadeusAPI:
                 longitude=longitude
             )
             return activities.data
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             print(f"Activity search error: {str(e)}")
             return None
 
@@ -69,6 +68,6 @@ class AmadeusAPI:
             if response.data:
                 return response.data[0]['iataCode']
             return None
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             print(f"City search error: {str(e)}")
             return None 
\ No newline at end of file
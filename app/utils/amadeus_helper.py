@@ -1,10 +1,10 @@
-from amadeus import Client, ResponseError
+from app.utils.amadeus_transport import get_amadeus_transport, AmadeusTransportError
 from flask import current_app
 import json
 
 def get_amadeus_client():
-    """Initialize and return an Amadeus client instance."""
-    return Client(
+    """Return the shared, connection-pooled Amadeus client."""
+    return get_amadeus_transport(
         client_id=current_app.config['AMADEUS_CLIENT_ID'],
         client_secret=current_app.config['AMADEUS_CLIENT_SECRET']
     )
@@ -34,7 +34,7 @@ def search_hotels(city_code, check_in_date, check_out_date, adults=1, room_quant
             bestRateOnly=True
         )
         return response.data
-    except ResponseError as error:
+    except AmadeusTransportError as error:
         current_app.logger.error(f"Amadeus API error: {error}")
         raise
 
@@ -154,7 +154,7 @@ def search_flights(origin, destination, departure_date, return_date=None, adults
         
         print(f"\nFiltered to {len(filtered_flights)} valid flights")
         return filtered_flights
-    except ResponseError as error:
+    except AmadeusTransportError as error:
         print(f"Amadeus API error: {error}")
         return None
     except Exception as e:
@@ -0,0 +1,269 @@
+import threading
+import time
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.utils.settings import get_setting
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+AMADEUS_HOSTS = {
+    'test': 'https://test.api.amadeus.com',
+    'production': 'https://api.amadeus.com'
+}
+
+TOKEN_PATH = '/v1/security/oauth2/token'
+
+
+class AmadeusTransportError(Exception):
+    """
+    Raised for failed Amadeus API calls. Carries the same `code` attribute as
+    amadeus.ResponseError so existing error handling keeps working.
+    """
+
+    def __init__(self, status_code, code=None, description=None):
+        self.status_code = status_code
+        self.code = code if code is not None else status_code
+        self.description = description or 'Amadeus API request failed'
+        super().__init__(f"[{self.status_code}] {self.description}")
+
+
+class AmadeusResponse:
+    """Subset of amadeus.Response used by the app: .data, .result and .status_code"""
+
+    def __init__(self, status_code, result):
+        self.status_code = status_code
+        self.result = result
+        self.data = result.get('data') if isinstance(result, dict) else None
+
+
+class _Endpoint:
+    """A GET endpoint, optionally with child namespaces (e.g. locations.hotels.by_city)"""
+
+    def __init__(self, transport, path, **children):
+        self._transport = transport
+        self._path = path
+        for name, child in children.items():
+            setattr(self, name, child)
+
+    def get(self, **params):
+        return self._transport.get(self._path, **params)
+
+
+class _Namespace:
+    def __init__(self, **children):
+        for name, child in children.items():
+            setattr(self, name, child)
+
+
+class AmadeusTransport:
+    """
+    Shared HTTP transport for the Amadeus self-service APIs.
+
+    Mirrors the parts of the amadeus SDK surface the app uses
+    (`shopping.flight_offers_search.get(...)`, `reference_data.locations.get(...)`, ...)
+    on top of a keep-alive requests.Session, so every caller in the process reuses
+    pooled connections and one OAuth token. The token is refreshed
+    `token_refresh_margin` seconds before it expires; while one thread refreshes,
+    others keep using the still-valid token. Per-endpoint call counts, errors and
+    latencies are available from stats().
+    """
+
+    def __init__(self, client_id, client_secret, base_url=AMADEUS_HOSTS['test'], timeout=15,
+                 pool_size=10, token_refresh_margin=60):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token_refresh_margin = token_refresh_margin
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        self.shopping = _Namespace(
+            flight_offers_search=_Endpoint(self, '/v2/shopping/flight-offers'),
+            hotel_offers=_Endpoint(self, '/v2/shopping/hotel-offers'),
+            hotel_offers_search=_Endpoint(self, '/v3/shopping/hotel-offers'),
+            activities=_Endpoint(self, '/v1/shopping/activities')
+        )
+        self.reference_data = _Namespace(
+            locations=_Endpoint(
+                self, '/v1/reference-data/locations',
+                hotels=_Namespace(by_city=_Endpoint(self, '/v1/reference-data/locations/hotels/by-city'))
+            )
+        )
+
+    # OAuth token handling
+
+    def _fetch_token(self):
+        started = time.time()
+        try:
+            response = self.session.post(
+                self.base_url + TOKEN_PATH,
+                data={
+                    'grant_type': 'client_credentials',
+                    'client_id': self.client_id,
+                    'client_secret': self.client_secret
+                },
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            self._record(TOKEN_PATH, started, error=True)
+            raise AmadeusTransportError(None, description=f"Token request failed: {str(e)}")
+
+        self._record(TOKEN_PATH, started, error=response.status_code != 200)
+        if response.status_code != 200:
+            raise self._error_from_response(response)
+
+        payload = response.json()
+        self._token = payload['access_token']
+        self._token_expires_at = time.time() + int(payload.get('expires_in', 1799))
+        logger.info(f"Fetched Amadeus access token (expires in {payload.get('expires_in')}s)")
+
+    def access_token(self):
+        """Return a valid access token, fetching or refreshing it ahead of expiry as needed."""
+        now = time.time()
+        if self._token and now < self._token_expires_at - self.token_refresh_margin:
+            return self._token
+
+        if self._token and now < self._token_expires_at:
+            # Inside the refresh margin: one thread refreshes, the rest use the current token
+            if not self._token_lock.acquire(blocking=False):
+                return self._token
+        else:
+            self._token_lock.acquire()
+
+        try:
+            if not self._token or time.time() >= self._token_expires_at - self.token_refresh_margin:
+                self._fetch_token()
+            return self._token
+        finally:
+            self._token_lock.release()
+
+    def invalidate_token(self):
+        with self._token_lock:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    # Requests
+
+    @staticmethod
+    def _encode_params(params):
+        """Flatten params the way the amadeus SDK does: lists become comma separated, dicts become key[sub]"""
+        encoded = {}
+        for key, value in params.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    encoded[f"{key}[{sub_key}]"] = sub_value
+            elif isinstance(value, (list, tuple)):
+                encoded[key] = ','.join(str(v) for v in value)
+            elif isinstance(value, bool):
+                encoded[key] = 'true' if value else 'false'
+            else:
+                encoded[key] = value
+        return encoded
+
+    def get(self, path, **params):
+        """GET an Amadeus endpoint and return an AmadeusResponse, raising AmadeusTransportError on failure."""
+        encoded = self._encode_params(params)
+
+        for attempt in range(2):
+            headers = {'Authorization': f"Bearer {self.access_token()}"}
+            started = time.time()
+            try:
+                response = self.session.get(self.base_url + path, params=encoded, headers=headers,
+                                            timeout=self.timeout)
+            except requests.RequestException as e:
+                self._record(path, started, error=True)
+                raise AmadeusTransportError(None, description=f"Request to {path} failed: {str(e)}")
+
+            # A token revoked server-side before its expiry: fetch a new one and retry once
+            if response.status_code == 401 and attempt == 0:
+                self._record(path, started, error=True)
+                self.invalidate_token()
+                continue
+
+            self._record(path, started, error=response.status_code >= 400)
+            if response.status_code >= 400:
+                raise self._error_from_response(response)
+            return AmadeusResponse(response.status_code, response.json())
+
+    @staticmethod
+    def _error_from_response(response):
+        code = None
+        description = response.text[:200]
+        try:
+            errors = response.json().get('errors') or []
+            if errors:
+                code = errors[0].get('code')
+                description = errors[0].get('detail') or errors[0].get('title') or description
+            elif 'error_description' in response.json():
+                description = response.json()['error_description']
+        except ValueError:
+            pass
+        return AmadeusTransportError(response.status_code, code, description)
+
+    # Latency counters
+
+    def _record(self, path, started, error=False):
+        elapsed_ms = (time.time() - started) * 1000
+        with self._stats_lock:
+            entry = self._stats.setdefault(path, {'calls': 0, 'errors': 0, 'total_ms': 0.0,
+                                                  'max_ms': 0.0, 'last_ms': 0.0})
+            entry['calls'] += 1
+            entry['errors'] += 1 if error else 0
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['last_ms'] = elapsed_ms
+
+    def stats(self):
+        """Per-endpoint call counts, error counts and latencies in milliseconds."""
+        with self._stats_lock:
+            return {
+                path: dict(entry, avg_ms=entry['total_ms'] / entry['calls'] if entry['calls'] else 0.0)
+                for path, entry in self._stats.items()
+            }
+
+
+# Transports shared by every caller in this process, keyed on credentials and host
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_amadeus_transport(client_id=None, client_secret=None, base_url=None):
+    """
+    Return the shared AmadeusTransport for the given credentials.
+
+    Missing arguments are looked up with get_setting (app config, config.Config,
+    then the environment). AMADEUS_BASE_URL overrides the host selected
+    by AMADEUS_HOSTNAME ('test' or 'production'), e.g. to point at a local stub.
+    """
+    client_id = client_id or get_setting('AMADEUS_CLIENT_ID')
+    client_secret = client_secret or get_setting('AMADEUS_CLIENT_SECRET')
+    base_url = base_url or get_setting('AMADEUS_BASE_URL') or \
+        AMADEUS_HOSTS.get(get_setting('AMADEUS_HOSTNAME', 'test'), AMADEUS_HOSTS['test'])
+
+    key = (client_id, client_secret, base_url)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = AmadeusTransport(
+                client_id, client_secret, base_url,
+                timeout=float(get_setting('AMADEUS_TIMEOUT', 15)),
+                pool_size=int(get_setting('AMADEUS_POOL_SIZE', 10)),
+                token_refresh_margin=float(get_setting('AMADEUS_TOKEN_REFRESH_MARGIN', 60))
+            )
+            _transports[key] = transport
+        return transport
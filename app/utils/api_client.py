@@ -1,7 +1,7 @@
 import requests
 import os
 from datetime import datetime, timedelta
-from amadeus import Client, ResponseError
+from app.utils.amadeus_transport import get_amadeus_transport, AmadeusTransportError
 from flask import current_app
 from app.utils.flight_api import FlightAPIClient
 from app.utils.hotel_api import get_hotel_client, MockHotelClient
@@ -15,7 +15,7 @@ class AmadeusClient:
             raise ValueError("Amadeus API credentials not found in environment variables")
         
         print(f"Initializing Amadeus client with credentials (ID: {client_id[:4]}...)")
-        self.amadeus = Client(
+        self.amadeus = get_amadeus_transport(
             client_id=client_id,
             client_secret=client_secret
         )
@@ -85,7 +85,7 @@ class AmadeusClient:
                 'flights': formatted_results
             }
         
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             print(f"Amadeus API Error: {str(e)}")  # Log the error
             return {
                 'status': 'error',
@@ -141,7 +141,7 @@ class AmadeusClient:
                 'locations': formatted_results
             }
         
-        except ResponseError as e:
+        except AmadeusTransportError as e:
             return {
                 'status': 'error',
                 'message': str(e),
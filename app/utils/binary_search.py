@@ -1,16 +1,114 @@
 from app.extensions import db
 from app.models import Flight
-from sqlalchemy import and_, or_, desc, asc, func
+from app.utils.price_index import price_index
+from flask import current_app
+from sqlalchemy import and_, or_, desc, asc, func, case, cast, Integer
 import time
+import heapq
 import logging
 import traceback
-import numpy as np
 from datetime import datetime, timedelta
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip while the linear search streams the Flight table
+LINEAR_SCAN_BATCH_SIZE = 1000
+
+def _flight_query_filters(origin=None, destination=None, departure_date=None, return_date=None):
+    """
+    Builds the SQLAlchemy filters shared by the database-backed flight price searches.
+    
+    Args:
+        origin (str, optional): Origin airport code filter
+        destination (str, optional): Destination airport code filter
+        departure_date (str, optional): Filter by departure date (YYYY-MM-DD)
+        return_date (str, optional): Return date (YYYY-MM-DD), logged only
+        
+    Returns:
+        list: Filter expressions to combine with and_()
+    """
+    query_filters = []
+    
+    # Add origin and destination filters
+    if origin:
+        query_filters.append(Flight.departure_airport == origin.strip().upper())
+    if destination and destination.strip():
+        query_filters.append(Flight.arrival_airport == destination.strip().upper())
+    
+    # Add date filters if provided
+    if departure_date:
+        try:
+            dep_date_obj = datetime.strptime(departure_date, '%Y-%m-%d')
+            next_day = dep_date_obj + timedelta(days=1)
+            # Find flights on the specified date
+            query_filters.append(Flight.departure_time >= dep_date_obj)
+            query_filters.append(Flight.departure_time < next_day)
+        except ValueError:
+            logger.warning(f"Invalid departure date format: {departure_date}, should be YYYY-MM-DD")
+    
+    if return_date:
+        try:
+            ret_date_obj = datetime.strptime(return_date, '%Y-%m-%d')
+            next_day = ret_date_obj + timedelta(days=1)
+            # For return flights, we could filter another condition if we have a specific return flight field
+            # Here we're just logging that we received this parameter
+            logger.info(f"Return date filter received: {return_date}")
+        except ValueError:
+            logger.warning(f"Invalid return date format: {return_date}, should be YYYY-MM-DD")
+    
+    return query_filters
+
+def _price_histogram(query_filters, target_price, bins=20):
+    """
+    Builds the price histogram shown on the flight price results page.
+    
+    The prices are bucketed by a GROUP BY in the database, so only the price
+    range and one count per non-empty bin are transferred. Bins match
+    np.histogram(prices, bins): equal-width over [min, max] with the maximum
+    counted in the last bin.
+    """
+    bounds = db.session.execute(
+        db.select(func.min(Flight.cost), func.max(Flight.cost))
+        .where(Flight.cost.isnot(None), *query_filters)
+    ).one()
+    min_price, max_price = bounds
+    
+    if min_price is None:
+        return None
+    
+    # np.histogram widens an empty range to +/- 0.5 around the single price
+    if min_price == max_price:
+        min_price, max_price = min_price - 0.5, max_price + 0.5
+    width = (max_price - min_price) / bins
+    bin_edges = [min_price + width * edge for edge in range(bins)] + [max_price]
+    
+    scaled = (Flight.cost - min_price) / width
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # Costs are never below min_price, so truncating is the same as flooring
+        bucket = cast(scaled, Integer)
+    else:
+        bucket = cast(func.floor(scaled), Integer)
+    # The maximum price lands on the upper edge; count it in the last bin
+    bucket = case((bucket >= bins, bins - 1), else_=bucket).label('bucket')
+    
+    rows = db.session.execute(
+        db.select(bucket, func.count())
+        .where(Flight.cost.isnot(None), *query_filters)
+        .group_by(bucket)
+    ).all()
+    
+    counts = [0] * bins
+    for index, count in rows:
+        counts[min(max(int(index), 0), bins - 1)] += count
+    
+    return {
+        'counts': counts,
+        'bin_edges': bin_edges,
+        'target_price': target_price
+    }
+
 def binary_search_flights_by_price(target_price, tolerance=50.0, origin=None, destination=None, max_iterations=10, 
                                   departure_date=None, return_date=None, adaptive_tolerance=False, collect_vis_data=False):
     """
@@ -47,34 +145,7 @@ def binary_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
     
     try:
         # Build the base query with additional filters if provided
-        query_filters = []
-        
-        # Add origin and destination filters
-        if origin:
-            query_filters.append(Flight.departure_airport == origin.strip().upper())
-        if destination and destination.strip():
-            query_filters.append(Flight.arrival_airport == destination.strip().upper())
-        
-        # Add date filters if provided
-        if departure_date:
-            try:
-                dep_date_obj = datetime.strptime(departure_date, '%Y-%m-%d')
-                next_day = dep_date_obj + timedelta(days=1)
-                # Find flights on the specified date
-                query_filters.append(Flight.departure_time >= dep_date_obj)
-                query_filters.append(Flight.departure_time < next_day)
-            except ValueError:
-                logger.warning(f"Invalid departure date format: {departure_date}, should be YYYY-MM-DD")
-        
-        if return_date:
-            try:
-                ret_date_obj = datetime.strptime(return_date, '%Y-%m-%d')
-                next_day = ret_date_obj + timedelta(days=1)
-                # For return flights, we could filter another condition if we have a specific return flight field
-                # Here we're just logging that we received this parameter
-                logger.info(f"Return date filter received: {return_date}")
-            except ValueError:
-                logger.warning(f"Invalid return date format: {return_date}, should be YYYY-MM-DD")
+        query_filters = _flight_query_filters(origin, destination, departure_date, return_date)
         
         # Get the min and max price boundaries from the database
         min_price_query = db.session.query(db.func.min(Flight.cost))
@@ -245,21 +316,7 @@ def binary_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
         # Generate price histogram data for visualization
         histogram_data = None
         if collect_vis_data and final_matches:
-            # Get all prices in the range
-            price_query = db.session.query(Flight.cost)
-            if query_filters:
-                price_query = price_query.filter(and_(*query_filters))
-            
-            all_prices = [price[0] for price in price_query.all()]
-            
-            if all_prices:
-                # Create histogram with 20 bins
-                hist, bin_edges = np.histogram(all_prices, bins=20)
-                histogram_data = {
-                    'counts': hist.tolist(),
-                    'bin_edges': bin_edges.tolist(),
-                    'target_price': target_price
-                }
+            histogram_data = _price_histogram(query_filters, target_price)
         
         performance_data = {
             'iterations': iterations,
@@ -285,12 +342,295 @@ def binary_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
             'algorithm': 'binary_search_failed'
         }
 
+def windowed_search_flights_by_price(target_price, tolerance=50.0, origin=None, destination=None,
+                                     departure_date=None, return_date=None, adaptive_tolerance=False,
+                                     collect_vis_data=False, limit=20):
+    """
+    Finds the flights priced closest to the target price in a single database round-trip.
+    
+    The nearest `limit` flights at or below the target and the nearest `limit` above it
+    are selected with two ORDER BY cost ... LIMIT subqueries (each an index range scan on
+    the cost indexes) combined with UNION ALL. The matching Flight rows and the MIN/MAX
+    price bounds are loaded by the same statement, so no probe or widening queries are
+    needed.
+    
+    Args:
+        target_price (float): The target price to search for
+        tolerance (float): Price range tolerance (+/-) around target price
+        origin (str, optional): Origin airport code filter
+        destination (str, optional): Destination airport code filter (can be None to search any destination)
+        departure_date (str, optional): Filter by departure date (YYYY-MM-DD)
+        return_date (str, optional): Filter by return date (YYYY-MM-DD)
+        adaptive_tolerance (bool): Whether to return the nearest prices if none are within tolerance
+        collect_vis_data (bool): Whether to collect data for visualization
+        limit (int): Maximum number of flights to return
+        
+    Returns:
+        tuple: (matches, performance_data)
+            - matches: List of flights within the target price range
+            - performance_data: Dictionary with search performance metrics
+    """
+    start_time = time.time()
+    
+    target_price = float(target_price)
+    initial_tolerance = float(tolerance)
+    tolerance = initial_tolerance
+    
+    try:
+        query_filters = _flight_query_filters(origin, destination, departure_date, return_date)
+        
+        # Nearest prices on each side of the target, closest first
+        below = db.select(Flight.id).where(Flight.cost <= target_price, *query_filters) \
+            .order_by(Flight.cost.desc()).limit(limit).subquery()
+        above = db.select(Flight.id).where(Flight.cost > target_price, *query_filters) \
+            .order_by(Flight.cost.asc()).limit(limit).subquery()
+        nearest_ids = db.select(below.c.id).union_all(db.select(above.c.id))
+        
+        # Price bounds for the visualisation, computed in the same statement
+        min_price_subquery = db.select(func.min(Flight.cost)).where(*query_filters).scalar_subquery()
+        max_price_subquery = db.select(func.max(Flight.cost)).where(*query_filters).scalar_subquery()
+        
+        rows = db.session.execute(
+            db.select(Flight, min_price_subquery, max_price_subquery).where(Flight.id.in_(nearest_ids))
+        ).all()
+        
+        if not rows:
+            logger.warning("No flights found matching the specified filters")
+            return [], {
+                'iterations': 1,
+                'duration_ms': (time.time() - start_time) * 1000,
+                'comparisons': 2,
+                'algorithm': 'windowed_search',
+                'min_price': None,
+                'max_price': None,
+                'message': 'No flights found matching the specified filters'
+            }
+        
+        min_price = rows[0][1]
+        max_price = rows[0][2]
+        
+        # Closest to the target first
+        candidates = sorted((row[0] for row in rows), key=lambda f: abs(f.cost - target_price))
+        final_matches = [flight for flight in candidates if abs(flight.cost - target_price) <= tolerance]
+        found_matches = bool(final_matches)
+        
+        if not found_matches and adaptive_tolerance:
+            # Widen the tolerance just enough to take in the nearest flights
+            final_matches = candidates[:limit]
+            tolerance = max(tolerance, abs(final_matches[-1].cost - target_price))
+            logger.info(f"Adjusted tolerance to £{tolerance} to include the nearest prices")
+        
+        final_matches = final_matches[:limit]
+        
+        search_steps = []
+        if collect_vis_data:
+            search_steps.append({
+                'iteration': 1,
+                'mid_price': target_price,
+                'low': min_price,
+                'high': max_price,
+                'tolerance': tolerance,
+                'lower_bound': target_price - tolerance,
+                'upper_bound': target_price + tolerance,
+                'matches_found': len(final_matches),
+                'closest_price': final_matches[0].cost if final_matches else None
+            })
+        
+        duration_ms = (time.time() - start_time) * 1000
+        
+        histogram_data = None
+        if collect_vis_data and final_matches:
+            histogram_data = _price_histogram(query_filters, target_price)
+        
+        performance_data = {
+            'iterations': 1,
+            'duration_ms': duration_ms,
+            # One index range scan for each side of the target
+            'comparisons': 2,
+            'algorithm': 'windowed_search',
+            'min_price': min_price,
+            'max_price': max_price,
+            'initial_tolerance': initial_tolerance,
+            'final_tolerance': tolerance,
+            'search_steps': search_steps if collect_vis_data else None,
+            'histogram_data': histogram_data,
+            'found_exact_match': found_matches
+        }
+        
+        return final_matches, performance_data
+        
+    except Exception as e:
+        logger.error(f"Error in windowed search: {str(e)}")
+        logger.error(traceback.format_exc())
+        return [], {
+            'error': str(e),
+            'algorithm': 'windowed_search_failed'
+        }
+
+def indexed_search_flights_by_price(target_price, tolerance=50.0, origin=None, destination=None,
+                                    departure_date=None, return_date=None, adaptive_tolerance=False,
+                                    collect_vis_data=False, limit=20):
+    """
+    Finds flights with prices close to the target price using the in-memory price index.
+
+    The (cost, flight_id) pairs for each matching route/date partition are held in
+    sorted NumPy arrays, so the price window is located with searchsorted and the
+    database is only queried to load the final matching Flight rows.
+
+    Args:
+        target_price (float): The target price to search for
+        tolerance (float): Price range tolerance (+/-) around target price
+        origin (str, optional): Origin airport code filter
+        destination (str, optional): Destination airport code filter (can be None to search any destination)
+        departure_date (str, optional): Filter by departure date (YYYY-MM-DD)
+        return_date (str, optional): Filter by return date (YYYY-MM-DD)
+        adaptive_tolerance (bool): Whether to fall back to the nearest prices if none are within tolerance
+        collect_vis_data (bool): Whether to collect data for visualization
+        limit (int): Maximum number of flights to return
+
+    Returns:
+        tuple: (matches, performance_data)
+            - matches: List of flights within the target price range
+            - performance_data: Dictionary with search performance metrics
+    """
+    # NumPy is only needed once the index is in use, so importing the app doesn't load it
+    import numpy as np
+
+    start_time = time.time()
+
+    target_price = float(target_price)
+    initial_tolerance = float(tolerance)
+    tolerance = initial_tolerance
+
+    try:
+        dep_date_obj = None
+        if departure_date:
+            try:
+                dep_date_obj = datetime.strptime(departure_date, '%Y-%m-%d').date()
+            except ValueError:
+                logger.warning(f"Invalid departure date format: {departure_date}, should be YYYY-MM-DD")
+
+        if return_date:
+            logger.info(f"Return date filter received: {return_date}")
+
+        price_index.ensure_fresh(current_app.config.get('PRICE_INDEX_MAX_AGE'))
+        partitions = price_index.partitions_for(origin, destination, dep_date_obj)
+
+        if not partitions:
+            logger.warning("No flights found matching the specified filters")
+            return [], {
+                'iterations': 0,
+                'duration_ms': (time.time() - start_time) * 1000,
+                'comparisons': 0,
+                'algorithm': 'price_index',
+                'min_price': None,
+                'max_price': None,
+                'message': 'No flights found matching the specified filters'
+            }
+
+        # Each partition is sorted, so its first and last entries are its price bounds
+        min_price = float(min(partition.costs[0] for _, partition in partitions))
+        max_price = float(max(partition.costs[-1] for _, partition in partitions))
+
+        comparisons = 0
+        search_steps = []
+        cost_windows = []
+        id_windows = []
+
+        for iteration, (key, partition) in enumerate(partitions, start=1):
+            costs, flight_ids = partition.window(target_price - tolerance, target_price + tolerance)
+            comparisons += 2
+            cost_windows.append(costs)
+            id_windows.append(flight_ids)
+
+            if collect_vis_data:
+                search_steps.append({
+                    'iteration': iteration,
+                    'mid_price': target_price,
+                    'low': float(partition.costs[0]),
+                    'high': float(partition.costs[-1]),
+                    'tolerance': tolerance,
+                    'lower_bound': target_price - tolerance,
+                    'upper_bound': target_price + tolerance,
+                    'matches_found': len(costs),
+                    'closest_price': float(costs[np.abs(costs - target_price).argmin()]) if len(costs) else None
+                })
+
+        candidate_costs = np.concatenate(cost_windows)
+        candidate_ids = np.concatenate(id_windows)
+        found_matches = len(candidate_costs) > 0
+
+        if not found_matches and adaptive_tolerance:
+            # Take the nearest prices on either side of the target from every partition
+            nearest = [partition.nearest(target_price, limit) for _, partition in partitions]
+            comparisons += len(partitions)
+            candidate_costs = np.concatenate([costs for costs, _ in nearest])
+            candidate_ids = np.concatenate([ids for _, ids in nearest])
+
+        # Keep the closest `limit` candidates, closest to the target first
+        diffs = np.abs(candidate_costs - target_price)
+        if len(diffs) > limit:
+            closest = np.argpartition(diffs, limit - 1)[:limit]
+        else:
+            closest = np.arange(len(diffs))
+        closest = closest[np.argsort(diffs[closest], kind='stable')]
+
+        if not found_matches and adaptive_tolerance and len(closest):
+            tolerance = max(tolerance, float(diffs[closest[-1]]))
+            logger.info(f"Adjusted tolerance to £{tolerance} using nearest indexed prices")
+
+        # Hydrate only the final flights
+        flight_ids = [int(flight_id) for flight_id in candidate_ids[closest]]
+        flights_by_id = {}
+        if flight_ids:
+            flights_by_id = {flight.id: flight for flight in Flight.query.filter(Flight.id.in_(flight_ids)).all()}
+        final_matches = [flights_by_id[flight_id] for flight_id in flight_ids if flight_id in flights_by_id]
+
+        histogram_data = None
+        if collect_vis_data and final_matches:
+            all_prices = np.concatenate([partition.costs for _, partition in partitions])
+            hist, bin_edges = np.histogram(all_prices, bins=20)
+            histogram_data = {
+                'counts': hist.tolist(),
+                'bin_edges': bin_edges.tolist(),
+                'target_price': target_price
+            }
+
+        performance_data = {
+            'iterations': len(partitions),
+            'duration_ms': (time.time() - start_time) * 1000,
+            'comparisons': comparisons,
+            'algorithm': 'price_index',
+            'min_price': min_price,
+            'max_price': max_price,
+            'initial_tolerance': initial_tolerance,
+            'final_tolerance': tolerance,
+            'search_steps': search_steps if collect_vis_data else None,
+            'histogram_data': histogram_data,
+            'found_exact_match': found_matches
+        }
+
+        return final_matches, performance_data
+
+    except Exception as e:
+        logger.error(f"Error in indexed search: {str(e)}")
+        logger.error(traceback.format_exc())
+        return [], {
+            'error': str(e),
+            'algorithm': 'price_index_failed'
+        }
+
 def linear_search_flights_by_price(target_price, tolerance=50.0, origin=None, destination=None, 
-                                  departure_date=None, return_date=None):
+                                  departure_date=None, return_date=None, limit=20):
     """
     Performs a linear search to find flights with prices close to the target price.
     This function is for comparison with the binary search implementation.
     
+    Only (id, cost) pairs are streamed from the database, LINEAR_SCAN_BATCH_SIZE rows
+    at a time, and the closest `limit` flights are kept in a bounded heap, so memory
+    stays O(limit) however many flights match the filters. The Flight rows for the
+    final matches are loaded with one extra query.
+    
     Args:
         target_price (float): The target price to search for
         tolerance (float): Price range tolerance (+/-) around target price
@@ -298,6 +638,7 @@ def linear_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
         destination (str, optional): Destination airport code filter
         departure_date (str, optional): Filter by departure date (YYYY-MM-DD)
         return_date (str, optional): Filter by return date (YYYY-MM-DD)
+        limit (int): Maximum number of flights to return
         
     Returns:
         tuple: (matches, performance_data)
@@ -312,40 +653,32 @@ def linear_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
     tolerance = float(tolerance)
     
     try:
-        # Build query
-        query = Flight.query
-        
-        # Add filters if provided
-        if origin:
-            query = query.filter(Flight.departure_airport == origin.strip().upper())
-        if destination:
-            query = query.filter(Flight.arrival_airport == destination.strip().upper())
-        
-        # Add date filters if provided
-        if departure_date:
-            try:
-                dep_date_obj = datetime.strptime(departure_date, '%Y-%m-%d')
-                next_day = dep_date_obj + timedelta(days=1)
-                query = query.filter(Flight.departure_time >= dep_date_obj)
-                query = query.filter(Flight.departure_time < next_day)
-            except ValueError:
-                logger.warning(f"Invalid departure date format: {departure_date}, should be YYYY-MM-DD")
-        
-        # Get all flights that match the origin/destination criteria
-        all_flights = query.all()
-        comparisons = 1
+        query_filters = _flight_query_filters(origin, destination, departure_date, return_date)
+        stmt = db.select(Flight.id, Flight.cost).where(Flight.cost.isnot(None), *query_filters) \
+            .execution_options(yield_per=LINEAR_SCAN_BATCH_SIZE)
         
-        # Filter by price range
-        matches = [
-            flight for flight in all_flights 
-            if abs(flight.cost - target_price) <= tolerance
-        ]
+        # Min-heap on (-difference, -id): the root is the worst match kept so far,
+        # ties going to the higher id so the lowest ids win as before
+        closest = []
+        for flight_id, cost in db.session.execute(stmt):
+            comparisons += 1
+            difference = abs(cost - target_price)
+            if difference > tolerance:
+                continue
+            entry = (-difference, -flight_id)
+            if len(closest) < limit:
+                heapq.heappush(closest, entry)
+            elif entry > closest[0]:
+                heapq.heapreplace(closest, entry)
         
-        # Sort by closest price to target
-        matches.sort(key=lambda f: abs(f.cost - target_price))
+        # Closest to the target first
+        flight_ids = [-neg_id for _, neg_id in sorted(closest, reverse=True)]
         
-        # Limit to a reasonable number
-        matches = matches[:20]
+        # Load only the flights being returned
+        flights_by_id = {}
+        if flight_ids:
+            flights_by_id = {flight.id: flight for flight in Flight.query.filter(Flight.id.in_(flight_ids)).all()}
+        matches = [flights_by_id[flight_id] for flight_id in flight_ids if flight_id in flights_by_id]
         
         # Calculate performance metrics
         duration_ms = (time.time() - start_time) * 1000
@@ -353,6 +686,7 @@ def linear_search_flights_by_price(target_price, tolerance=50.0, origin=None, de
         performance_data = {
             'iterations': 1,
             'duration_ms': duration_ms,
+            # Every streamed flight is compared against the target once
             'comparisons': comparisons,
             'algorithm': 'linear_search',
             'matches_found': len(matches)
@@ -453,6 +787,13 @@ def compare_search_algorithms(target_price, tolerance=50.0, origin=None, destina
     
     return comparison
 
+# Flight price search implementations selectable from /search/flight-price
+PRICE_SEARCH_MODES = {
+    'binary': binary_search_flights_by_price,
+    'windowed': windowed_search_flights_by_price,
+    'index': indexed_search_flights_by_price
+}
+
 def binary_search_hotels_by_price(target_price, tolerance, city, check_in_date, check_out_date, guests=1, adaptive_tolerance=False, collect_vis_data=False):
     """
     Binary search for hotels by price with given criteria.
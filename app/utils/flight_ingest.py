@@ -0,0 +1,272 @@
+import hashlib
+import json
+import time
+import logging
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app.extensions import db
+from app.models import Flight
+from app.utils.amadeus_api import search_flights, format_flight_offer
+from app.utils.price_index import price_index
+from app.utils.periodic import register_periodic_job
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Ingested flights belong to no itinerary (itinerary_id is NULL) and are identified by
+# corpus_key = KEY_PREFIX + a hash of the journey, which uq_flight_corpus_key keeps unique
+KEY_PREFIX = 'ingest:'
+# Dialects whose INSERT has an upsert clause; others fall back to SELECT then INSERT/UPDATE
+UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql, 'mysql': mysql, 'mariadb': mysql}
+
+
+def parse_offer_time(value):
+    # Stored naive, like the rest of the Flight table
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def journey_key(departure_airport, arrival_airport, departure_time, arrival_time, airline, stops):
+    raw = f"{airline}|{departure_airport}|{departure_time.isoformat()}|{arrival_airport}|{arrival_time.isoformat()}|{stops}"
+    return KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def normalise_offer(offer, now):
+    """
+    Turn a raw Amadeus offer or a format_flight_offer() dict into a corpus Flight row.
+
+    Returns None for offers that can't be stored as a single priced flight,
+    i.e. round trips (their price covers both directions) and offers without
+    a price or times.
+    """
+    if 'itineraries' in offer:
+        try:
+            offer = format_flight_offer(offer)
+        except Exception:
+            return None
+    if not offer or offer.get('is_round_trip'):
+        return None
+    try:
+        cost = float(offer['price']['total'])
+        departure_time = parse_offer_time(offer['departure']['time'])
+        arrival_time = parse_offer_time(offer['arrival']['time'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    departure_airport = offer['departure']['airport']
+    arrival_airport = offer['arrival']['airport']
+    airline = offer.get('airline')
+    stops = offer.get('details', {}).get('stops', 0) or 0
+    return {
+        'itinerary_id': None,
+        'departure_airport': departure_airport,
+        'arrival_airport': arrival_airport,
+        'departure_time': departure_time,
+        'arrival_time': arrival_time,
+        'airline': airline,
+        'flight_number': offer.get('flight_number'),
+        'cost': cost,
+        'stops': stops,
+        'duration': (offer.get('details', {}).get('duration') or '')[:20],
+        'is_connection': stops > 0,
+        'corpus_key': journey_key(departure_airport, arrival_airport, departure_time,
+                                  arrival_time, airline, stops),
+        'segment_order': 0,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def _upsert_statement(dialect_name):
+    """INSERT ... ON CONFLICT (corpus_key) DO UPDATE cost for this dialect, or None"""
+    dialect = UPSERT_DIALECTS.get(dialect_name)
+    if dialect is None:
+        return None
+    stmt = dialect.insert(Flight.__table__)
+    if dialect is mysql:
+        return stmt.on_duplicate_key_update(cost=stmt.inserted.cost, updated_at=stmt.inserted.updated_at)
+    return stmt.on_conflict_do_update(
+        index_elements=['corpus_key'],
+        set_={'cost': stmt.excluded.cost, 'updated_at': stmt.excluded.updated_at}
+    )
+
+
+def _upsert_batch(rows):
+    """
+    Insert new journeys and reprice known ones; returns (inserted, updated).
+
+    The write is a single upsert that relies on uq_flight_corpus_key, so concurrent
+    ingests can't insert the same journey twice. The counts come from a lookup
+    beforehand and are only approximate while another ingest is running.
+    """
+    keys = [row['corpus_key'] for row in rows]
+    existing = dict(db.session.execute(
+        db.select(Flight.corpus_key, Flight.id).where(Flight.corpus_key.in_(keys))
+    ).all())
+    updated = sum(1 for key in keys if key in existing)
+
+    upsert = _upsert_statement(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        db.session.execute(upsert, rows)
+    else:
+        new_rows = [row for row in rows if row['corpus_key'] not in existing]
+        changed = [{'flight_id': existing[row['corpus_key']], 'cost': row['cost'], 'updated_at': row['updated_at']}
+                   for row in rows if row['corpus_key'] in existing]
+        if new_rows:
+            db.session.execute(insert(Flight.__table__), new_rows)
+        if changed:
+            table = Flight.__table__
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('flight_id'))
+                .values(cost=bindparam('cost'), updated_at=bindparam('updated_at')),
+                changed
+            )
+    db.session.commit()
+    return len(rows) - updated, updated
+
+
+def ingest_offers(offers, batch_size=5000):
+    """
+    Bulk-load offers into the flight search corpus with batched upserts:
+    journeys already in the corpus get their price updated, new ones are
+    inserted. Duplicates within a batch keep the cheapest price.
+
+    Returns:
+        dict: offers read, rows inserted/updated, offers skipped, seconds and rows_per_second
+    """
+    started = time.time()
+    now = datetime.utcnow()
+    stats = {'offers': 0, 'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    batch = {}
+
+    def flush():
+        inserted, updated = _upsert_batch(list(batch.values()))
+        stats['inserted'] += inserted
+        stats['updated'] += updated
+        batch.clear()
+
+    for offer in offers:
+        stats['offers'] += 1
+        row = normalise_offer(offer, now)
+        if row is None:
+            stats['skipped'] += 1
+            continue
+        current = batch.get(row['corpus_key'])
+        if current is None or row['cost'] < current['cost']:
+            batch[row['corpus_key']] = row
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if stats['inserted'] or stats['updated']:
+        # Core statements bypass the ORM events that keep the index current
+        price_index.invalidate()
+
+    stats['seconds'] = round(time.time() - started, 3)
+    rows = stats['inserted'] + stats['updated']
+    stats['rows_per_second'] = round(rows / stats['seconds'], 1) if stats['seconds'] > 0 else None
+    logger.info(f"Flight ingest: {stats}")
+    return stats
+
+
+def parse_routes(value):
+    """'LHR-JFK, LHR-CDG' -> [('LHR', 'JFK'), ('LHR', 'CDG')]"""
+    if isinstance(value, str):
+        value = value.split(',')
+    routes = []
+    for route in value or []:
+        origin, _, destination = route.strip().upper().partition('-')
+        if len(origin) == 3 and len(destination) == 3:
+            routes.append((origin, destination))
+        elif route.strip():
+            logger.warning(f"Ignoring invalid route {route!r}, expected e.g. LHR-JFK")
+    return routes
+
+
+def fetch_route_offers(routes, date_offsets, adults=1, recorded=None):
+    """
+    Yield formatted one-way offers for each route and each departure date
+    `offset` days from today, using search_flights (and its cache).
+    Pass a list as `recorded` to also collect every offer, e.g. for a dump.
+    """
+    today = date.today()
+    for origin, destination in routes:
+        for offset in date_offsets:
+            departure_date = (today + timedelta(days=int(offset))).strftime('%Y-%m-%d')
+            flights, meta = search_flights(origin, destination, departure_date, adults=adults)
+            if 'error' in meta:
+                logger.warning(f"No offers for {origin}-{destination} on {departure_date}: {meta['error']}")
+                continue
+            if recorded is not None:
+                recorded.extend(flights)
+            yield from flights
+
+
+def load_offer_dump(path):
+    """Offers from a JSON file: a list of raw or formatted offers, or an Amadeus {'data': [...]} response."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('data', [])
+    return data
+
+
+def run_configured_ingest(app):
+    """Ingest the app's FLIGHT_INGEST_ROUTES for every FLIGHT_INGEST_DATE_OFFSETS day."""
+    routes = parse_routes(app.config.get('FLIGHT_INGEST_ROUTES', ''))
+    offsets = [int(offset) for offset in str(app.config.get('FLIGHT_INGEST_DATE_OFFSETS', '7')).split(',') if offset.strip()]
+    if not routes:
+        logger.info("No FLIGHT_INGEST_ROUTES configured; nothing to ingest")
+        return None
+    return ingest_offers(fetch_route_offers(routes, offsets),
+                         batch_size=app.config.get('FLIGHT_INGEST_BATCH_SIZE', 5000))
+
+
+@click.command('ingest-flights')
+@click.option('--route', 'routes', multiple=True, help='Route such as LHR-JFK (repeatable); defaults to FLIGHT_INGEST_ROUTES')
+@click.option('--offset', 'offsets', type=int, multiple=True,
+              help='Departure days from today (repeatable); defaults to FLIGHT_INGEST_DATE_OFFSETS')
+@click.option('--from-dump', 'dump_in', type=click.Path(exists=True, dir_okay=False),
+              help='Load offers from a recorded JSON file instead of calling the API')
+@click.option('--record', 'dump_out', type=click.Path(dir_okay=False),
+              help='Also write the fetched offers to this JSON file for offline replays')
+@click.option('--batch-size', type=int, help='Rows per INSERT/UPDATE batch; defaults to FLIGHT_INGEST_BATCH_SIZE')
+@with_appcontext
+def ingest_flights_command(routes, offsets, dump_in, dump_out, batch_size):
+    """Load upstream flight offers into the price search corpus."""
+    batch_size = batch_size or current_app.config.get('FLIGHT_INGEST_BATCH_SIZE', 5000)
+
+    recorded = None
+    if dump_in:
+        offers = load_offer_dump(dump_in)
+    else:
+        routes = parse_routes(list(routes)) if routes else parse_routes(current_app.config.get('FLIGHT_INGEST_ROUTES', ''))
+        if not routes:
+            raise click.UsageError('No routes given; pass --route or set FLIGHT_INGEST_ROUTES')
+        offsets = list(offsets) or [int(offset) for offset in
+                                    str(current_app.config.get('FLIGHT_INGEST_DATE_OFFSETS', '7')).split(',') if offset.strip()]
+        recorded = [] if dump_out else None
+        offers = fetch_route_offers(routes, offsets, recorded=recorded)
+
+    stats = ingest_offers(offers, batch_size=batch_size)
+
+    if recorded is not None:
+        with open(dump_out, 'w') as f:
+            json.dump(recorded, f, indent=2)
+        click.echo(f"Recorded {len(recorded)} offers to {dump_out}")
+
+    click.echo(f"Read {stats['offers']} offers: {stats['inserted']} inserted, {stats['updated']} updated, "
+               f"{stats['skipped']} skipped in {stats['seconds']}s ({stats['rows_per_second']} rows/s)")
+
+
+def init_app(app):
+    app.cli.add_command(ingest_flights_command)
+    # Runs every FLIGHT_INGEST_INTERVAL seconds under `flask run-scheduler`
+    register_periodic_job(app, 'flight-ingest', 'FLIGHT_INGEST_INTERVAL', run_configured_ingest)
@@ -8,6 +8,7 @@ import logging
 import traceback
 import subprocess
 from flask import current_app
+from app.utils.region_cache import get_region_cache
 
 class RapidAPIHotelClient:
     """
@@ -52,10 +53,31 @@ class RapidAPIHotelClient:
             'X-RapidAPI-Key': self.api_key,
             'X-RapidAPI-Host': self.api_host
         }
+        
+        # City code -> regionId lookups shared by every client in the process
+        self.region_cache = get_region_cache()
     
     def search_hotels(self, city_code, check_in_date, check_out_date, adults=1, rooms=1, currency='GBP'):
         """
-        Search for hotels using the RapidAPI Hotels API
+        Search for hotels using the RapidAPI Hotels API, waiting for the search to complete
+        """
+        result = None
+        for result in self.iter_search_results(city_code, check_in_date, check_out_date,
+                                               adults=adults, rooms=rooms, currency=currency):
+            pass
+        return result
+    
+    def iter_search_results(self, city_code, check_in_date, check_out_date, adults=1, rooms=1, currency='GBP',
+                            partial_threshold=None, max_wait=10.0, initial_delay=0.5, max_delay=4.0):
+        """
+        Run a RapidAPI hotel search and yield results as the search progresses
+        
+        The search is polled with exponential backoff (initial_delay doubling up to
+        max_delay) for at most max_wait seconds. Once completionPercentage reaches
+        partial_threshold, every poll that returns new properties yields a
+        {'status': 'partial', 'completion': ..., 'hotels': [...]} update. The last
+        item yielded is always the final result: status 'success' with all hotels,
+        or status 'error' with a message.
         """
         try:
             # CRITICAL FIX: Directly use the hardcoded API key for the RapidAPI
@@ -92,11 +114,12 @@ class RapidAPIHotelClient:
             if not destination_id:
                 print(f"ERROR: Could not find destination ID for city code: {city_code}")
                 print("DEBUG: Try using an airport code like LHR (London) or CDG (Paris) instead")
-                return {
+                yield {
                     'status': 'error',
                     'message': f'Unable to find destination ID for {city_code}. Try using an airport code instead (e.g., LHR for London).',
                     'hotels': []
                 }
+                return
             
             print(f"DEBUG: Found destination ID: {destination_id} for {city_code}")
             
@@ -140,11 +163,12 @@ class RapidAPIHotelClient:
                 except:
                     print(f"DEBUG: Error response text: {response.text}")
                 
-                return {
+                yield {
                     'status': 'error',
                     'message': f'API Error: {response.status_code} - {response.text}',
                     'hotels': []
                 }
+                return
             
             # Get the search ID from the response
             data = response.json()
@@ -154,31 +178,35 @@ class RapidAPIHotelClient:
             
             if not search_id:
                 print("ERROR: No search ID found in the response")
-                return {
+                yield {
                     'status': 'error',
                     'message': 'No search ID found in the response',
                     'hotels': []
                 }
+                return
                 
             print(f"Got search ID: {search_id}, now polling for results...")
             
             # Poll for results using the search ID
+            # The API requires us to poll multiple times until completionPercentage = 100
             poll_url = f"{self.base_url}/v2/hotels/search/polls"
             poll_headers = self.headers.copy()
-            # The API requires us to poll multiple times until completionPercentage = 100
             
-            max_attempts = 5
+            deadline = time.time() + max_wait
+            delay = initial_delay
             current_attempt = 0
             hotels_data = None
+            partial_count = 0
             
-            while current_attempt < max_attempts:
+            while True:
                 current_attempt += 1
-                print(f"DEBUG: Polling attempt {current_attempt}/{max_attempts} for search results")
+                print(f"DEBUG: Polling attempt {current_attempt} for search results")
                 
                 poll_response = requests.get(
                     poll_url,
                     headers=poll_headers,
-                    params={"searchId": search_id}
+                    params={"searchId": search_id},
+                    timeout=max(1.0, deadline - time.time())
                 )
                 
                 print(f"DEBUG: Poll response status code: {poll_response.status_code}")
@@ -190,30 +218,44 @@ class RapidAPIHotelClient:
                         print(f"DEBUG: Error response: {json.dumps(error_json, indent=2)}")
                     except:
                         print(f"DEBUG: Error response text: {poll_response.text}")
-                    # If we failed polling, try again
-                    continue
-                
-                poll_data = poll_response.json()
-                completion_percentage = poll_data.get('data', {}).get('status', {}).get('completionPercentage', 0)
-                print(f"Polling attempt {current_attempt}: Completion {completion_percentage}%")
+                else:
+                    poll_data = poll_response.json()
+                    completion_percentage = poll_data.get('data', {}).get('status', {}).get('completionPercentage', 0)
+                    print(f"Polling attempt {current_attempt}: Completion {completion_percentage}%")
+                    
+                    # If search is complete
+                    if completion_percentage == 100:
+                        hotels_data = poll_data
+                        break
+                    
+                    # Hand back what we have so far once the search is far enough along
+                    if partial_threshold is not None and completion_percentage >= partial_threshold:
+                        properties = poll_data.get('data', {}).get('propertySearch', {}).get('properties', [])
+                        if len(properties) > partial_count:
+                            partial_count = len(properties)
+                            yield {
+                                'status': 'partial',
+                                'completion': completion_percentage,
+                                'hotels': self._format_properties(properties, city_code, currency, adults,
+                                                                  check_in_str, check_out_str)
+                            }
                 
-                # If search is complete
-                if completion_percentage == 100:
-                    hotels_data = poll_data
+                # Back off before the next poll, without running past the deadline
+                remaining = deadline - time.time()
+                if remaining <= 0:
                     break
-                    
-                # If not complete, wait and try again
-                print(f"DEBUG: Waiting 2 seconds before next polling attempt...")
-                time.sleep(2)  # Wait 2 seconds between polls
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, max_delay)
             
-            # If we couldn't get results after max attempts
+            # If we couldn't get results before the deadline
             if not hotels_data:
                 print("ERROR: Failed to get hotel results after maximum polling attempts")
-                return {
+                yield {
                     'status': 'error',
                     'message': 'Failed to get hotel results after maximum polling attempts',
                     'hotels': []
                 }
+                return
             
             # Process the response data
             properties = hotels_data.get('data', {}).get('propertySearch', {}).get('properties', [])
@@ -224,76 +266,17 @@ class RapidAPIHotelClient:
                 if 'data' in hotels_data and 'propertySearch' in hotels_data['data']:
                     print(f"DEBUG: Property search data: {json.dumps(hotels_data['data']['propertySearch'], indent=2)[:500]}...")
             
-            # Format the hotel data in the expected format for our application
-            formatted_hotels = []
-            for prop in properties:
-                # Skip properties without price info
-                if not prop.get('price') or not prop.get('id'):
-                    print(f"DEBUG: Skipping hotel without price or ID: {prop.get('name', 'Unknown Hotel')}")
-                    continue
-                    
-                hotel_info = {
-                    'hotel_id': prop.get('id', ''),
-                    'name': prop.get('name', 'Unknown Hotel'),
-                    'rating': str(prop.get('star', 3)),
-                    'address': {
-                        'city': prop.get('neighborhood', {}).get('name', city_code),
-                        'country': 'Not Available'  # RapidAPI doesn't always provide country in basic response
-                    },
-                    'offers': []
-                }
-                
-                # Add the primary offer
-                price_info = prop.get('price', {})
-                
-                offer = {
-                    'id': f"{prop.get('id')}-1",  # Create a unique offer ID
-                    'price': {
-                        'total': price_info.get('lead', {}).get('amount', '0'),
-                        'currency': currency
-                    },
-                    'room_type': prop.get('type', 'STANDARD'),
-                    'guests': {
-                        'adults': adults
-                    },
-                    'check_in': check_in_str,
-                    'check_out': check_out_str
-                }
-                
-                hotel_info['offers'].append(offer)
-                
-                # If there are multiple room types, add them as additional offers
-                if prop.get('roomTypes'):
-                    for idx, room_type in enumerate(prop.get('roomTypes', [])):
-                        # Skip if room price isn't available
-                        if not room_type.get('price'):
-                            continue
-                            
-                        additional_offer = {
-                            'id': f"{prop.get('id')}-{idx+2}",
-                            'price': {
-                                'total': room_type.get('price', {}).get('lead', {}).get('amount', '0'),
-                                'currency': currency
-                            },
-                            'room_type': room_type.get('name', 'DELUXE'),
-                            'guests': {
-                                'adults': adults
-                            },
-                            'check_in': check_in_str,
-                            'check_out': check_out_str
-                        }
-                        
-                        hotel_info['offers'].append(additional_offer)
-                
-                formatted_hotels.append(hotel_info)
+            formatted_hotels = self._format_properties(properties, city_code, currency, adults,
+                                                       check_in_str, check_out_str)
             
             if not formatted_hotels:
                 print("WARNING: No hotel results found after formatting")
             else:
                 print(f"DEBUG: Successfully formatted {len(formatted_hotels)} hotels")
             
-            return {
+            yield {
                 'status': 'success',
+                'completion': 100,
                 'hotels': formatted_hotels
             }
             
@@ -301,15 +284,97 @@ class RapidAPIHotelClient:
             print(f"ERROR in RapidAPI hotel search: {str(e)}")
             import traceback
             traceback.print_exc()
-            return {
+            yield {
                 'status': 'error',
                 'message': f'An error occurred: {str(e)}',
                 'hotels': []
             }
     
+    def _format_properties(self, properties, city_code, currency, adults, check_in_str, check_out_str):
+        """
+        Format RapidAPI property results in the hotel format used by the application
+        """
+        # Format the hotel data in the expected format for our application
+        formatted_hotels = []
+        for prop in properties:
+            # Skip properties without price info
+            if not prop.get('price') or not prop.get('id'):
+                print(f"DEBUG: Skipping hotel without price or ID: {prop.get('name', 'Unknown Hotel')}")
+                continue
+                
+            hotel_info = {
+                'hotel_id': prop.get('id', ''),
+                'name': prop.get('name', 'Unknown Hotel'),
+                'rating': str(prop.get('star', 3)),
+                'address': {
+                    'city': prop.get('neighborhood', {}).get('name', city_code),
+                    'country': 'Not Available'  # RapidAPI doesn't always provide country in basic response
+                },
+                'offers': []
+            }
+            
+            # Add the primary offer
+            price_info = prop.get('price', {})
+            
+            offer = {
+                'id': f"{prop.get('id')}-1",  # Create a unique offer ID
+                'price': {
+                    'total': price_info.get('lead', {}).get('amount', '0'),
+                    'currency': currency
+                },
+                'room_type': prop.get('type', 'STANDARD'),
+                'guests': {
+                    'adults': adults
+                },
+                'check_in': check_in_str,
+                'check_out': check_out_str
+            }
+            
+            hotel_info['offers'].append(offer)
+            
+            # If there are multiple room types, add them as additional offers
+            if prop.get('roomTypes'):
+                for idx, room_type in enumerate(prop.get('roomTypes', [])):
+                    # Skip if room price isn't available
+                    if not room_type.get('price'):
+                        continue
+                        
+                    additional_offer = {
+                        'id': f"{prop.get('id')}-{idx+2}",
+                        'price': {
+                            'total': room_type.get('price', {}).get('lead', {}).get('amount', '0'),
+                            'currency': currency
+                        },
+                        'room_type': room_type.get('name', 'DELUXE'),
+                        'guests': {
+                            'adults': adults
+                        },
+                        'check_in': check_in_str,
+                        'check_out': check_out_str
+                    }
+                    
+                    hotel_info['offers'].append(additional_offer)
+            
+            formatted_hotels.append(hotel_info)
+        
+        return formatted_hotels
+    
     def _get_destination_id(self, city_code):
         """
-        Get destination ID for a city code or name using the locations/v3/search API
+        Get destination ID for a city code or name, using the shared region cache
+        so the locations API is only called for cities we haven't resolved recently
+        """
+        try:
+            return self.region_cache.get(city_code, self._fetch_destination_id)
+        except Exception as e:
+            print(f"ERROR getting destination ID: {str(e)}")
+            return None
+    
+    def _fetch_destination_id(self, city_code):
+        """
+        Look up the destination ID for a city code or name using the locations/v3/search API
+        
+        Returns None if the API has no matching destination and raises if the lookup fails.
         """
         try:
             print(f"DEBUG: Getting destination ID for city code: {city_code}")
@@ -325,7 +390,7 @@ class RapidAPIHotelClient:
             print(f"DEBUG: Location search URL: {url}")
             print(f"DEBUG: Location search query parameters: {querystring}")
             
-            response = requests.get(url, headers=self.headers, params=querystring)
+            response = requests.get(url, headers=self.headers, params=querystring, timeout=10)
             
             print(f"DEBUG: Location search response status code: {response.status_code}")
             
@@ -336,7 +401,7 @@ class RapidAPIHotelClient:
                     print(f"DEBUG: Error response: {json.dumps(error_json, indent=2)}")
                 except:
                     print(f"DEBUG: Error response text: {response.text}")
-                return None
+                raise RuntimeError(f"Location search failed with status code {response.status_code}")
             
             data = response.json()
             print(f"DEBUG: Location search response data: {json.dumps(data, indent=2)[:500]}...")
@@ -357,10 +422,10 @@ class RapidAPIHotelClient:
             return None
             
         except Exception as e:
-            print(f"ERROR getting destination ID: {str(e)}")
+            print(f"ERROR looking up destination ID: {str(e)}")
             import traceback
             traceback.print_exc()
-            return None
+            raise
 
 
 class MockHotelClient:
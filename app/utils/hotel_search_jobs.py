@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.utils.response_cache import SQLiteCacheBackend
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class HotelSearchJobs:
+    """
+    Runs hotel searches on a small background thread pool.
+
+    submit() returns a job id immediately; get() returns a snapshot of the job,
+    which moves through pending -> running -> partial -> complete (or error).
+    Clients that support iter_search_results() publish partial results once the
+    upstream search passes `partial_threshold` percent complete; other clients
+    (e.g. MockHotelClient) go straight to complete. Finished jobs are dropped
+    `job_ttl` seconds after their last update.
+
+    Jobs run in the process that submitted them. When a backend (e.g.
+    SQLiteCacheBackend) is given every update is also written there, so a
+    status request answered by another worker process still finds the job.
+    """
+
+    def __init__(self, max_workers=4, partial_threshold=50, max_wait=30, job_ttl=600, backend=None,
+                 max_active_per_owner=2):
+        self.partial_threshold = partial_threshold
+        self.max_wait = max_wait
+        self.job_ttl = job_ttl
+        self.backend = backend
+        self.max_active_per_owner = max_active_per_owner
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hotel-search')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, client, city_code, check_in_date, check_out_date, adults=1, rooms=1, currency='GBP',
+               owner=None):
+        """
+        Start a search with the given hotel client and return its job id, or
+        None if `owner` already has max_active_per_owner unfinished jobs here.
+        """
+        self._purge_expired()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            if owner is not None and self.max_active_per_owner:
+                active = sum(1 for job in self._jobs.values()
+                             if job['owner'] == owner and job['status'] not in ('complete', 'error'))
+                if active >= self.max_active_per_owner:
+                    return None
+            job = self._jobs[job_id] = {
+                'job_id': job_id,
+                'owner': owner,
+                'status': 'pending',
+                'completion': 0,
+                'hotels': [],
+                'message': None,
+                'version': 0,
+                'created_at': now,
+                'updated_at': now
+            }
+            serialized = json.dumps(job, default=str) if self.backend is not None else None
+        self._save(job_id, serialized, now)
+
+        self._executor.submit(self._run, job_id, client, city_code, check_in_date, check_out_date,
+                              adults, rooms, currency)
+        return job_id
+
+    def get(self, job_id):
+        """Return a copy of the job's current state, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            snapshot = dict(job) if job is not None else None
+        if snapshot is None:
+            snapshot = self._load(job_id)
+            if snapshot is None:
+                return None
+        snapshot['count'] = len(snapshot['hotels'])
+        snapshot['finished'] = snapshot['status'] in ('complete', 'error')
+        return snapshot
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['version'] += 1
+            job['updated_at'] = time.time()
+            serialized = json.dumps(job, default=str) if self.backend is not None else None
+        self._save(job_id, serialized, job['updated_at'])
+
+    def _save(self, job_id, serialized, updated_at):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(job_id, serialized, updated_at + self.job_ttl)
+        except Exception as e:
+            logger.error(f"Could not store hotel search job {job_id}: {str(e)}")
+
+    def _load(self, job_id):
+        if self.backend is None:
+            return None
+        try:
+            value, _ = self.backend.get(job_id)
+        except Exception as e:
+            logger.error(f"Could not load hotel search job {job_id}: {str(e)}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    def _run(self, job_id, client, city_code, check_in_date, check_out_date, adults, rooms, currency):
+        self._update(job_id, status='running')
+        started = time.time()
+        try:
+            if hasattr(client, 'iter_search_results'):
+                results = client.iter_search_results(
+                    city_code, check_in_date, check_out_date,
+                    adults=adults, rooms=rooms, currency=currency,
+                    partial_threshold=self.partial_threshold,
+                    max_wait=self.max_wait
+                )
+            else:
+                results = [client.search_hotels(city_code, check_in_date, check_out_date,
+                                                adults=adults, rooms=rooms, currency=currency)]
+
+            for result in results:
+                if result.get('status') == 'partial':
+                    self._update(job_id, status='partial', completion=result.get('completion', 0),
+                                 hotels=result.get('hotels', []))
+                elif result.get('status') == 'success':
+                    self._update(job_id, status='complete', completion=100, hotels=result.get('hotels', []))
+                else:
+                    self._update(job_id, status='error', message=result.get('message', 'Hotel search failed'))
+
+            logger.info(f"Hotel search job {job_id} for {city_code} finished in {time.time() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Hotel search job {job_id} failed: {str(e)}")
+            self._update(job_id, status='error', message=f'An error occurred: {str(e)}')
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['status'] in ('complete', 'error') and job['updated_at'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+_jobs_lock = threading.Lock()
+
+
+def get_hotel_search_jobs():
+    """Return the app's HotelSearchJobs, creating it from config on first use."""
+    app = current_app._get_current_object()
+    with _jobs_lock:
+        jobs = app.extensions.get('hotel_search_jobs')
+        if jobs is None:
+            backend = None
+            if app.config.get('HOTEL_SEARCH_JOB_BACKEND', 'memory') == 'sqlite':
+                path = app.config.get('HOTEL_SEARCH_JOB_PATH') or \
+                    os.path.join(app.instance_path, 'hotel_search_jobs.sqlite3')
+                backend = SQLiteCacheBackend(path)
+            jobs = HotelSearchJobs(
+                max_workers=app.config.get('HOTEL_SEARCH_WORKERS', 4),
+                partial_threshold=app.config.get('HOTEL_SEARCH_PARTIAL_THRESHOLD', 50),
+                max_wait=app.config.get('HOTEL_SEARCH_MAX_WAIT', 30),
+                job_ttl=app.config.get('HOTEL_SEARCH_JOB_TTL', 600),
+                backend=backend,
+                max_active_per_owner=app.config.get('HOTEL_SEARCH_MAX_ACTIVE_PER_USER', 2)
+            )
+            app.extensions['hotel_search_jobs'] = jobs
+        return jobs
@@ -0,0 +1,145 @@
+import logging
+
+from sqlalchemy import column, inspect, table
+
+from app.extensions import db
+from app.models import (Itinerary, Flight, Accommodation, Activity, Destination, Transportation,
+                        SavedFlight, Booking, PriceChange)
+from app.utils.itinerary_rollups import rebuild_itinerary_rollups
+from app.utils.itinerary_listing import invalidate_itinerary_choices
+from app.utils.price_index import partition_key, price_index
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Itineraries handled per set of DELETE statements, to keep IN (...) lists bounded
+DELETE_CHUNK_SIZE = 500
+
+# Tables deleted by itinerary_id, children before parents
+CHILD_MODELS = (SavedFlight, Transportation, Flight, Activity, Accommodation, Destination)
+
+FLIGHT_BOOKING_LINK_TABLE = 'flight_booking_flights'
+
+
+def _flight_booking_links():
+    """The flight booking association table, or None if this database doesn't have it"""
+    links = db.metadata.tables.get(FLIGHT_BOOKING_LINK_TABLE)
+    if links is not None:
+        return links
+    if inspect(db.engine).has_table(FLIGHT_BOOKING_LINK_TABLE):
+        return table(FLIGHT_BOOKING_LINK_TABLE, column('flight_id'))
+    return None
+
+
+def _delete(model_or_table, condition):
+    stmt = db.delete(model_or_table).where(condition)
+    if hasattr(model_or_table, '__mapper__'):
+        # Rows are removed in SQL only; the session is expired on commit
+        stmt = stmt.execution_options(synchronize_session=False)
+    return db.session.execute(stmt).rowcount
+
+
+def _flight_partition_keys(condition):
+    """Price index partitions holding the flights matched by condition"""
+    rows = db.session.execute(
+        db.select(Flight.departure_airport, Flight.arrival_airport, Flight.departure_time)
+        .where(condition).distinct()
+    ).all()
+    return {partition_key(*row) for row in rows} - {None}
+
+
+def _delete_flight_links(flight_ids, links):
+    if links is None:
+        return 0
+    return _delete(links, links.c.flight_id.in_(flight_ids))
+
+
+def delete_itineraries(itinerary_ids, user_id=None):
+    """
+    Delete itineraries and everything attached to them with set-based statements
+    in a single transaction.
+
+    Flight booking links, price changes on saved flights, saved flights,
+    transportation, flights, activities, accommodations and destinations are
+    deleted; bookings are kept but detached from the itinerary. Pass user_id to
+    only delete itineraries that user owns.
+
+    Returns:
+        dict: rows deleted per table, including 'itinerary'
+    """
+    query = db.select(Itinerary.id, Itinerary.user_id).where(Itinerary.id.in_(list(itinerary_ids)))
+    if user_id is not None:
+        query = query.where(Itinerary.user_id == user_id)
+    rows = db.session.execute(query).all()
+    ids = [row.id for row in rows]
+
+    counts = {model.__tablename__: 0 for model in CHILD_MODELS}
+    counts.update({FLIGHT_BOOKING_LINK_TABLE: 0, PriceChange.__tablename__: 0, 'detached_bookings': 0,
+                   Itinerary.__tablename__: 0})
+    if not ids:
+        return counts
+
+    links = _flight_booking_links()
+    partition_keys = set()
+    try:
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+
+            partition_keys |= _flight_partition_keys(Flight.itinerary_id.in_(chunk))
+            flight_ids = db.select(Flight.id).where(Flight.itinerary_id.in_(chunk))
+            counts[FLIGHT_BOOKING_LINK_TABLE] += _delete_flight_links(flight_ids, links)
+
+            # Not left to ON DELETE CASCADE, which SQLite ignores unless foreign keys are enabled
+            saved_flight_ids = db.select(SavedFlight.id).where(SavedFlight.itinerary_id.in_(chunk))
+            counts[PriceChange.__tablename__] += _delete(PriceChange, PriceChange.saved_flight_id.in_(saved_flight_ids))
+
+            for model in CHILD_MODELS:
+                counts[model.__tablename__] += _delete(model, model.itinerary_id.in_(chunk))
+
+            counts['detached_bookings'] += db.session.execute(
+                db.update(Booking).where(Booking.itinerary_id.in_(chunk)).values(itinerary_id=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            counts[Itinerary.__tablename__] += _delete(Itinerary, Itinerary.id.in_(chunk))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # The bulk DELETE bypasses the ORM events that normally do this
+    invalidate_itinerary_choices(*{row.user_id for row in rows})
+    if partition_keys:
+        price_index.invalidate(partition_keys)
+    logger.info(f"Deleted {counts[Itinerary.__tablename__]} itineraries: {counts}")
+    return counts
+
+
+def delete_user_itineraries(user_id):
+    """Delete every itinerary a user owns, e.g. when closing their account."""
+    ids = db.session.execute(db.select(Itinerary.id).where(Itinerary.user_id == user_id)).scalars().all()
+    return delete_itineraries(ids, user_id=user_id)
+
+
+def delete_flight_group(itinerary_id, connection_group):
+    """
+    Delete every segment of a connecting flight journey, with its booking links,
+    and update the itinerary's flight total in the same transaction.
+
+    Returns the number of flights deleted.
+    """
+    condition = (Flight.itinerary_id == itinerary_id) & (Flight.connection_group == connection_group)
+    try:
+        partition_keys = _flight_partition_keys(condition)
+        _delete_flight_links(db.select(Flight.id).where(condition), _flight_booking_links())
+        count = _delete(Flight, condition)
+        # The bulk DELETE bypasses the rollup events; this commits both together
+        rebuild_itinerary_rollups([itinerary_id])
+    except Exception:
+        db.session.rollback()
+        raise
+    # Nor do the price index's after_delete events run
+    if partition_keys:
+        price_index.invalidate(partition_keys)
+    return count
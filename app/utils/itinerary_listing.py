@@ -0,0 +1,176 @@
+import base64
+import logging
+from datetime import date
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, or_, and_
+from sqlalchemy.orm import Session, configure_mappers, selectinload
+
+from app.extensions import db
+from app.models import Itinerary
+from app.utils.response_cache import ResponseCache, cache_from_config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Newest trips first; id breaks ties so the keyset order is total
+LISTING_ORDER = (Itinerary.start_date.desc(), Itinerary.id.desc())
+
+
+class ItinerarySummary:
+    """The columns an itinerary dropdown or listing needs, without a full ORM object"""
+
+    __slots__ = ('id', 'name', 'start_date')
+
+    def __init__(self, id, name, start_date):
+        self.id = id
+        self.name = name
+        self.start_date = start_date
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'start_date': self.start_date.isoformat() if self.start_date else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        start_date = date.fromisoformat(data['start_date']) if data.get('start_date') else None
+        return cls(data['id'], data['name'], start_date)
+
+
+def encode_cursor(item):
+    """Opaque cursor pointing just past item (an Itinerary or ItinerarySummary)."""
+    raw = f"{item.start_date.isoformat()}|{item.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (start_date, id) for a cursor, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        start_date, itinerary_id = raw.split('|')
+        return date.fromisoformat(start_date), int(itinerary_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def _page(stmt, user_id, limit, after):
+    stmt = stmt.where(Itinerary.user_id == user_id)
+    if after:
+        start_date, itinerary_id = decode_cursor(after)
+        stmt = stmt.where(or_(
+            Itinerary.start_date < start_date,
+            and_(Itinerary.start_date == start_date, Itinerary.id < itinerary_id)
+        ))
+    # One extra row tells us whether there is a next page without a COUNT
+    return stmt.order_by(*LISTING_ORDER).limit(limit + 1)
+
+
+def list_itinerary_summaries(user_id, limit=50, after=None):
+    """
+    One keyset page of a user's itineraries as ItinerarySummary objects, reading
+    only the id, name and start_date columns.
+
+    Returns:
+        tuple: (summaries, next_cursor) where next_cursor is None on the last page
+    """
+    stmt = _page(db.select(Itinerary.id, Itinerary.name, Itinerary.start_date), user_id, limit, after)
+    rows = db.session.execute(stmt).all()
+    items = [ItinerarySummary(*row) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def list_itineraries_page(user_id, limit=12, after=None):
+    """
+    One keyset page of full Itinerary objects with their destinations loaded,
+    for pages that render itinerary cards.
+
+    Returns:
+        tuple: (itineraries, next_cursor) where next_cursor is None on the last page
+    """
+    # Itinerary.destinations is a backref, only present once the mappers are configured
+    configure_mappers()
+    stmt = _page(db.select(Itinerary).options(selectinload(Itinerary.destinations)), user_id, limit, after)
+    itineraries = db.session.execute(stmt).scalars().all()
+    next_cursor = encode_cursor(itineraries[limit - 1]) if len(itineraries) > limit else None
+    return itineraries[:limit], next_cursor
+
+
+# Per-user "add to itinerary" dropdown payloads
+
+def _choices_cache():
+    cache = current_app.extensions.get('itinerary_choices')
+    if cache is None:
+        cache = cache_from_config(current_app, 'itinerary_choices', 'ITINERARY_CHOICES_CACHE')
+    return cache
+
+
+def get_itinerary_choices(user_id):
+    """
+    Every itinerary a user owns as ItinerarySummary objects, newest first, for
+    "add to itinerary" dropdowns. Cached per user until one of their itineraries
+    is created, renamed, re-dated or deleted.
+    """
+    def load():
+        stmt = (db.select(Itinerary.id, Itinerary.name, Itinerary.start_date)
+                .where(Itinerary.user_id == user_id)
+                .order_by(*LISTING_ORDER))
+        return [ItinerarySummary(*row).to_dict() for row in db.session.execute(stmt)]
+
+    payload, _ = _choices_cache().get_or_compute(ResponseCache.make_key(user_id), load)
+    return [ItinerarySummary.from_dict(item) for item in payload]
+
+
+def invalidate_itinerary_choices(*user_ids):
+    if not has_app_context():
+        return
+    cache = _choices_cache()
+    for user_id in set(user_ids):
+        if user_id is not None:
+            cache.invalidate(ResponseCache.make_key(user_id))
+
+
+def _mark_changed(target, *user_ids):
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault('itinerary_choice_users', set()).update(user_ids)
+
+
+def _after_insert_or_delete(mapper, connection, target):
+    _mark_changed(target, target.user_id)
+
+
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in ('name', 'start_date', 'user_id')):
+        return
+    history = state.attrs.user_id.history
+    _mark_changed(target, target.user_id, *(history.deleted or ()))
+
+
+def _after_commit(session):
+    # Invalidate only once the change is visible, so a concurrent request can't re-cache old rows
+    user_ids = session.info.pop('itinerary_choice_users', None)
+    if user_ids:
+        invalidate_itinerary_choices(*user_ids)
+
+
+def _after_rollback(session):
+    session.info.pop('itinerary_choice_users', None)
+
+
+def register_listeners():
+    if not event.contains(Itinerary, 'after_insert', _after_insert_or_delete):
+        event.listen(Itinerary, 'after_insert', _after_insert_or_delete)
+        event.listen(Itinerary, 'after_delete', _after_insert_or_delete)
+        event.listen(Itinerary, 'after_update', _after_update)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+
+def init_app(app):
+    cache_from_config(app, 'itinerary_choices', 'ITINERARY_CHOICES_CACHE')
+    register_listeners()
@@ -0,0 +1,92 @@
+import logging
+
+from sqlalchemy.orm import configure_mappers, selectinload
+
+from app.extensions import db
+from app.models import Itinerary
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class ItineraryTotals:
+    """
+    Budget figures for an itinerary, read from its rollup columns
+    (app/utils/itinerary_rollups.py), so the detail page and the itinerary
+    listings show the same totals
+    """
+
+    __slots__ = ('flights', 'accommodations', 'activities', 'transportation', 'spent', 'budget',
+                 'remaining', 'budget_percent')
+
+    def __init__(self, itinerary):
+        self.flights = itinerary.flight_total or 0
+        self.accommodations = itinerary.accommodation_total or 0
+        self.activities = itinerary.activity_total or 0
+        self.transportation = itinerary.transportation_total or 0
+        self.spent = itinerary.total_spent
+        self.budget = itinerary.total_budget or 0
+        self.remaining = itinerary.budget_remaining
+        self.budget_percent = (self.spent / self.budget * 100) if self.budget > 0 else 0
+
+
+class ItineraryView:
+    """
+    Read-only aggregate of an itinerary and everything shown on its detail page.
+
+    The child collections are tuples, so templates can't accidentally change
+    them. They are loaded for the item lists only; the totals come from the
+    itinerary's rollup columns, not from summing the children.
+    """
+
+    __slots__ = ('itinerary', 'flights', 'accommodations', 'activities', 'destinations', 'totals')
+
+    def __init__(self, itinerary):
+        self.itinerary = itinerary
+        self.flights = tuple(itinerary.flights)
+        self.accommodations = tuple(itinerary.accommodations)
+        self.activities = tuple(itinerary.activities)
+        self.destinations = tuple(itinerary.destinations)
+        self.totals = ItineraryTotals(itinerary)
+
+    @property
+    def user_id(self):
+        return self.itinerary.user_id
+
+    def template_context(self):
+        """Keyword arguments for rendering the itinerary detail templates"""
+        return {
+            'itinerary': self.itinerary,
+            'flights': self.flights,
+            'accommodations': self.accommodations,
+            'activities': self.activities,
+            'destinations': self.destinations,
+            'totals': self.totals
+        }
+
+
+def load_itinerary_view(itinerary_id, user_id=None):
+    """
+    Load an itinerary with its flights, accommodations, activities and destinations.
+
+    Each collection is fetched with one SELECT ... WHERE itinerary_id IN (...), so the
+    number of queries is fixed however many items the itinerary has and nothing is
+    lazy-loaded while the template renders. Pass user_id to only match that user's
+    itinerary. Returns an ItineraryView, or None if no itinerary matched.
+    """
+    # Itinerary.destinations is a backref, only present once the mappers are configured
+    configure_mappers()
+
+    stmt = db.select(Itinerary).where(Itinerary.id == itinerary_id).options(
+        selectinload(Itinerary.flights),
+        selectinload(Itinerary.accommodations),
+        selectinload(Itinerary.activities),
+        selectinload(Itinerary.destinations)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Itinerary.user_id == user_id)
+
+    itinerary = db.session.execute(stmt).scalar_one_or_none()
+    if itinerary is None:
+        return None
+    return ItineraryView(itinerary)
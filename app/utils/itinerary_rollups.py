@@ -0,0 +1,175 @@
+import logging
+from collections import defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, event, func, inspect, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Itinerary, Flight, Accommodation, Activity, Transportation
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+# The cost rules below are the only place itinerary totals are defined: the event
+# handlers, rebuild_itinerary_rollups and the dashboard and detail pages all use them
+
+def item_cost(cost):
+    """Cost of a flight, activity or transport leg; missing or non-positive prices count as zero."""
+    return cost if cost is not None and cost > 0 else 0
+
+
+def accommodation_cost(cost_per_night, check_in_date, check_out_date):
+    """Cost of a stay; stays without valid dates count as one night."""
+    nights = 1
+    if check_in_date is not None and check_out_date is not None:
+        nights = max((check_out_date - check_in_date).days, 1)
+    return item_cost(cost_per_night) * nights
+
+
+# Child model -> (Itinerary rollup column, attributes the cost depends on, cost function)
+ROLLUPS = {
+    Flight: ('flight_total', ('cost',), item_cost),
+    Accommodation: ('accommodation_total', ('cost_per_night', 'check_in_date', 'check_out_date'), accommodation_cost),
+    Activity: ('activity_total', ('cost',), item_cost),
+    Transportation: ('transportation_total', ('price',), item_cost),
+}
+
+
+def _current_values(target, attrs):
+    return [getattr(target, attr) for attr in attrs]
+
+
+def _committed_values(target, attrs):
+    """Attribute values as they are in the database, before any pending changes"""
+    state = inspect(target)
+    values = []
+    for attr in attrs:
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if history.deleted else getattr(target, attr))
+    return values
+
+
+def _apply_delta(connection, target, itinerary_id, column, delta):
+    if itinerary_id is None or not delta:
+        return
+    table = Itinerary.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == itinerary_id)
+        .values({column: func.coalesce(table.c[column], 0) + delta})
+    )
+    # Remember the itinerary so its loaded copy can be refreshed after the flush
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault('rollup_itinerary_ids', set()).add(itinerary_id)
+
+
+def _after_insert(mapper, connection, target):
+    column, attrs, cost = ROLLUPS[mapper.class_]
+    _apply_delta(connection, target, target.itinerary_id, column, cost(*_current_values(target, attrs)))
+
+
+def _after_update(mapper, connection, target):
+    column, attrs, cost = ROLLUPS[mapper.class_]
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in ('itinerary_id',) + attrs):
+        return
+
+    old_itinerary_id = _committed_values(target, ('itinerary_id',))[0]
+    old_cost = cost(*_committed_values(target, attrs))
+    new_cost = cost(*_current_values(target, attrs))
+
+    if old_itinerary_id == target.itinerary_id:
+        _apply_delta(connection, target, target.itinerary_id, column, new_cost - old_cost)
+    else:
+        _apply_delta(connection, target, old_itinerary_id, column, -old_cost)
+        _apply_delta(connection, target, target.itinerary_id, column, new_cost)
+
+
+def _after_delete(mapper, connection, target):
+    column, attrs, cost = ROLLUPS[mapper.class_]
+    itinerary_id = _committed_values(target, ('itinerary_id',))[0]
+    _apply_delta(connection, target, itinerary_id, column, -cost(*_committed_values(target, attrs)))
+
+
+def _expire_rollups(session, flush_context):
+    """Expire the rollup columns of loaded itineraries whose totals changed in this flush"""
+    itinerary_ids = session.info.pop('rollup_itinerary_ids', None)
+    if not itinerary_ids:
+        return
+    columns = [column for column, _, _ in ROLLUPS.values()]
+    for obj in session.identity_map.values():
+        if isinstance(obj, Itinerary) and obj.id in itinerary_ids:
+            session.expire(obj, columns)
+
+
+def register_listeners():
+    """Keep the Itinerary rollup columns in step with ORM inserts, updates and deletes."""
+    for model in ROLLUPS:
+        if not event.contains(model, 'after_insert', _after_insert):
+            event.listen(model, 'after_insert', _after_insert)
+            event.listen(model, 'after_update', _after_update)
+            event.listen(model, 'after_delete', _after_delete)
+    if not event.contains(Session, 'after_flush_postexec', _expire_rollups):
+        event.listen(Session, 'after_flush_postexec', _expire_rollups)
+
+
+def rebuild_itinerary_rollups(itinerary_ids=None):
+    """
+    Recompute the rollup columns from the child tables, for every itinerary or
+    only the given ids. Needed after bulk SQL that bypasses the ORM events.
+
+    Returns the number of itineraries updated.
+    """
+    itinerary_table = Itinerary.__table__
+    ids_query = db.select(itinerary_table.c.id)
+    if itinerary_ids is not None:
+        ids_query = ids_query.where(itinerary_table.c.id.in_(list(itinerary_ids)))
+    totals = {row.id: defaultdict(float) for row in db.session.execute(ids_query)}
+    if not totals:
+        return 0
+
+    for model, (column, attrs, cost) in ROLLUPS.items():
+        table = model.__table__
+        if model is Accommodation:
+            # Nights are counted in Python so the rule matches the event handlers on every database
+            query = db.select(table.c.itinerary_id, *[table.c[attr] for attr in attrs])
+        else:
+            # Same rule as item_cost: only positive prices are summed
+            query = db.select(table.c.itinerary_id, func.sum(table.c[attrs[0]])) \
+                .where(table.c[attrs[0]] > 0).group_by(table.c.itinerary_id)
+        if itinerary_ids is not None:
+            query = query.where(table.c.itinerary_id.in_(list(totals)))
+
+        for row in db.session.execute(query):
+            if row[0] in totals:
+                totals[row[0]][column] += cost(*row[1:])
+
+    columns = [column for column, _, _ in ROLLUPS.values()]
+    db.session.execute(
+        update(itinerary_table).where(itinerary_table.c.id == bindparam('itinerary_id')),
+        [dict({column: round(sums[column], 2) for column in columns}, itinerary_id=itinerary_id)
+         for itinerary_id, sums in totals.items()]
+    )
+    db.session.commit()
+    # The UPDATE bypassed the identity map, so drop any stale loaded copies
+    db.session.expire_all()
+    return len(totals)
+
+
+@click.command('rebuild-itinerary-rollups')
+@click.option('--itinerary-id', 'itinerary_ids', type=int, multiple=True,
+              help='Only rebuild these itineraries (repeatable); defaults to all')
+@with_appcontext
+def rebuild_itinerary_rollups_command(itinerary_ids):
+    """Recompute the cached cost totals on every itinerary."""
+    count = rebuild_itinerary_rollups(itinerary_ids or None)
+    click.echo(f"Rebuilt cost rollups for {count} itineraries")
+
+
+def init_app(app):
+    register_listeners()
+    app.cli.add_command(rebuild_itinerary_rollups_command)
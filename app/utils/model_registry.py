@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+
+def _neural_recommender():
+    from app.utils.neural_recommender import NeuralRecommender
+    return NeuralRecommender()
+
+
+def _destination_recommender():
+    from app.utils.recommendation_model import DestinationRecommender
+    return DestinationRecommender()
+
+
+def _flight_price_predictor():
+    from app.utils.price_predictor import PricePredictor
+    return PricePredictor(model_type='flight')
+
+
+def _hotel_price_predictor():
+    from app.utils.price_predictor import PricePredictor
+    return PricePredictor(model_type='hotel')
+
+
+def _itinerary_network():
+    from app.utils.itinerary_generator import ItineraryNeuralNetwork
+    return ItineraryNeuralNetwork()
+
+
+# name -> (factory, pickle files the instance is loaded from)
+DEFAULT_MODELS = {
+    'neural_recommender': (_neural_recommender,
+                           ['neural_recommender.pkl', 'neural_scaler.pkl', 'knn_model.pkl']),
+    'destination_recommender': (_destination_recommender, ['destination_recommender.pkl']),
+    'flight_price_predictor': (_flight_price_predictor, ['flight_price_predictor.pkl']),
+    'hotel_price_predictor': (_hotel_price_predictor, ['hotel_price_predictor.pkl']),
+    'itinerary_network': (_itinerary_network, ['itinerary_model.pkl']),
+}
+
+
+class _ModelEntry:
+    __slots__ = ('factory', 'paths', 'instance', 'mtimes', 'lock', 'checked_at',
+                 'load_ms', 'loaded_at', 'load_count', 'last_error')
+
+    def __init__(self, factory, paths):
+        self.factory = factory
+        self.paths = paths
+        self.instance = None
+        self.mtimes = None
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.load_ms = None
+        self.loaded_at = None
+        self.load_count = 0
+        self.last_error = None
+
+
+class ModelRegistry:
+    """
+    Process-wide store of the ML models used by the search routes and AI planners.
+
+    Each model is loaded the first time it is requested and the same instance is
+    handed to every caller afterwards, so callers must treat it as read-only.
+    When the modification time of any of a model's pickle files changes, the model
+    is loaded again and swapped in; requests already holding the old instance
+    finish with it. Pickle mtimes are checked at most every `check_interval`
+    seconds.
+    """
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        for name, (factory, files) in DEFAULT_MODELS.items():
+            self.register(name, factory, [os.path.join(MODELS_DIR, f) for f in files])
+
+    def init_app(self, app):
+        self.check_interval = app.config.get('MODEL_RELOAD_CHECK_INTERVAL', self.check_interval)
+        app.extensions['model_registry'] = self
+
+        if app.config.get('MODEL_REGISTRY_PRELOAD'):
+            for name in self._entries:
+                self.get(name)
+
+    def register(self, name, factory, paths):
+        """Register a model factory and the files whose changes should trigger a reload."""
+        with self._lock:
+            self._entries[name] = _ModelEntry(factory, list(paths))
+
+    @staticmethod
+    def _mtimes(paths):
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.path.getmtime(path))
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load(self, name, entry):
+        started = time.time()
+        try:
+            instance = entry.factory()
+        except Exception as e:
+            entry.last_error = str(e)
+            logger.error(f"Error loading model {name}: {str(e)}")
+            raise
+
+        # Taken after the factory returns: models that train on first use write
+        # their pickle while loading, which must not count as a change
+        entry.mtimes = self._mtimes(entry.paths)
+        entry.checked_at = time.time()
+        entry.instance = instance
+        entry.load_ms = (entry.checked_at - started) * 1000
+        entry.loaded_at = entry.checked_at
+        entry.load_count += 1
+        entry.last_error = None
+        logger.info(f"Loaded model {name} in {entry.load_ms:.1f}ms (load #{entry.load_count})")
+        return instance
+
+    def get(self, name):
+        """Return the shared instance of a model, loading or reloading it if needed."""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown model: {name}")
+
+        instance = entry.instance
+        now = time.time()
+        if instance is not None and now - entry.checked_at < self.check_interval:
+            return instance
+
+        with entry.lock:
+            if entry.instance is None:
+                return self._load(name, entry)
+
+            if time.time() - entry.checked_at >= self.check_interval:
+                entry.checked_at = time.time()
+                if self._mtimes(entry.paths) != entry.mtimes:
+                    logger.info(f"Model files for {name} changed, reloading")
+                    try:
+                        return self._load(name, entry)
+                    except Exception:
+                        # Keep serving the previous version until the files load cleanly
+                        return entry.instance
+            return entry.instance
+
+    def reload(self, name=None):
+        """Force a reload of one model, or of every model that has been loaded."""
+        names = [name] if name else [n for n, e in self._entries.items() if e.instance is not None]
+        for model_name in names:
+            entry = self._entries[model_name]
+            with entry.lock:
+                self._load(model_name, entry)
+
+    def stats(self):
+        """Report load state and load times for every registered model."""
+        return {
+            name: {
+                'loaded': entry.instance is not None,
+                'load_ms': entry.load_ms,
+                'loaded_at': entry.loaded_at,
+                'load_count': entry.load_count,
+                'last_error': entry.last_error
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# Shared registry for this worker process
+model_registry = ModelRegistry()
+
+
+def get_model(name):
+    """Return the shared instance of a registered model."""
+    return model_registry.get(name)
@@ -1,6 +1,7 @@
 import os
 import numpy as np
 import pickle
+import json
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.neighbors import NearestNeighbors
@@ -18,6 +19,7 @@ class NeuralRecommender:
         self.model_path = os.path.join(models_dir, 'neural_recommender.pkl')
         self.scaler_path = os.path.join(models_dir, 'neural_scaler.pkl')
         self.knn_path = os.path.join(models_dir, 'knn_model.pkl')
+        self.similarity_path = os.path.join(models_dir, 'similar_destinations.json')
         
         # Popular destinations list
         self.destinations = [
@@ -65,6 +67,9 @@ class NeuralRecommender:
             self.scaler = StandardScaler()
             self.knn_model = NearestNeighbors(n_neighbors=5, algorithm='auto')
             self._initialize_model()
+        
+        # Neighbour table for get_similar_destinations, computed once per KNN model
+        self.similar_destinations = self._load_similarity_table()
     
     def _create_model(self):
         """Create a scikit-learn model for destination recommendations"""
@@ -129,37 +134,79 @@ class NeuralRecommender:
             List of recommended destinations with scores
         """
         try:
-            # Encode user preferences into feature vector
-            features = self._encode_preferences(user_preferences)
-            
-            # Scale features - Fix: Use features as np.ndarray instead of list
-            features_array = np.array([features])
-            scaled_features = self.scaler.transform(features_array)
-            
-            # Get probabilities for each destination
-            probabilities = self.model.predict_proba(scaled_features)[0]
-            
-            # Create recommendations list with confidence scores
-            recommendations = [
-                {
-                    'destination': self.destinations[i],
-                    'score': float(probabilities[i]),
-                    'description': self._get_destination_description(self.destinations[i]),
-                    'image_url': f'/static/images/destinations/{self.destinations[i].lower().replace(" ", "_")}.jpg'
-                }
-                for i in range(len(self.destinations))
-            ]
-            
-            # Sort by score (highest first)
-            recommendations.sort(key=lambda x: x['score'], reverse=True)
-            
-            # Return top 5 recommendations
-            return recommendations[:5]
+            return self.get_destination_recommendations_batch([user_preferences])[0]
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             # Fallback: return some popular destinations
             return self._get_fallback_recommendations()
     
+    def get_destination_recommendations_batch(self, preferences_list, top_n=5):
+        """
+        Generate destination recommendations for many users at once
+        
+        Args:
+            preferences_list: list of user preference dicts, as accepted by
+                get_destination_recommendations
+            top_n: number of recommendations to return per user
+        
+        Returns:
+            List (one entry per user, in input order) of recommendation lists
+        """
+        if not preferences_list:
+            return []
+        
+        # One feature matrix and a single predict_proba call for the whole batch
+        features = self._encode_preferences_batch(preferences_list)
+        probabilities = self.model.predict_proba(self.scaler.transform(features))
+        
+        # Columns of predict_proba follow model.classes_
+        class_destinations = [self.destinations[int(c)] for c in self.model.classes_]
+        top_n = max(1, min(top_n, probabilities.shape[1]))
+        
+        # Top-n columns per row without sorting all of them, then order just those
+        top = np.argpartition(-probabilities, top_n - 1, axis=1)[:, :top_n]
+        top_scores = np.take_along_axis(probabilities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        
+        # Destination details are the same for every user, so build them once
+        details = [
+            {
+                'destination': name,
+                'description': self._get_destination_description(name),
+                'image_url': f'/static/images/destinations/{name.lower().replace(" ", "_")}.jpg'
+            }
+            for name in class_destinations
+        ]
+        
+        return [
+            [
+                {
+                    'destination': details[col]['destination'],
+                    'score': float(score),
+                    'description': details[col]['description'],
+                    'image_url': details[col]['image_url']
+                }
+                for col, score in zip(row_cols.tolist(), row_scores.tolist())
+            ]
+            for row_cols, row_scores in zip(top, top_scores)
+        ]
+    
+    def iter_destination_recommendations(self, preferences_iter, top_n=5, batch_size=1000):
+        """
+        Yield recommendation lists for an iterable of preference dicts, scoring
+        them in batches of batch_size so memory stays bounded for large jobs
+        """
+        batch = []
+        for preferences in preferences_iter:
+            batch.append(preferences)
+            if len(batch) >= batch_size:
+                yield from self.get_destination_recommendations_batch(batch, top_n)
+                batch = []
+        if batch:
+            yield from self.get_destination_recommendations_batch(batch, top_n)
+    
     def _encode_preferences(self, preferences):
         """
         Encode user preferences into feature vector
@@ -189,6 +236,39 @@ class NeuralRecommender:
         
         return features
     
+    def _encode_preferences_batch(self, preferences_list):
+        """
+        Encode a list of user preferences into an (n, feature_dim) matrix,
+        matching _encode_preferences row for row
+        """
+        n = len(preferences_list)
+        features = np.zeros((n, self.feature_dim))
+        
+        # Interests (first 8 features): collect (row, column) pairs and set them in one go
+        rows = []
+        cols = []
+        for row, preferences in enumerate(preferences_list):
+            for interest in preferences.get('interests', []):
+                col = self.interest_mapping.get(interest)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        if rows:
+            features[rows, cols] = 1.0
+        
+        current_month = datetime.now().month
+        budget = np.fromiter((p.get('budget', 1000) for p in preferences_list), dtype=float, count=n)
+        duration = np.fromiter((p.get('duration', 7) for p in preferences_list), dtype=float, count=n)
+        month = np.fromiter((p.get('month', current_month) for p in preferences_list), dtype=float, count=n)
+        age = np.fromiter((p.get('age', 30) for p in preferences_list), dtype=float, count=n)
+        
+        features[:, 8] = np.minimum(budget / 5000, 1.0)  # Cap at 5000
+        features[:, 9] = np.minimum(duration / 30, 1.0)  # Cap at 30 days
+        features[:, 10] = month / 12.0
+        features[:, 11] = np.minimum(age / 100, 1.0)  # Cap at 100
+        
+        return features
+    
     def _get_fallback_recommendations(self):
         """Return fallback recommendations if model fails"""
         return [
@@ -250,33 +330,57 @@ class NeuralRecommender:
         }
         return descriptions.get(destination, 'A fascinating destination waiting to be explored.')
     
-    def get_similar_destinations(self, destination_name, n=3):
-        """Find destinations similar to the given one"""
+    def _build_similarity_table(self):
+        """
+        Run one kneighbors query over every destination and return a dict mapping
+        each destination to its formatted neighbours, closest first
+        """
+        distances, indices = self.knn_model.kneighbors(np.eye(len(self.destinations)))
+        
+        table = {}
+        for idx, destination_name in enumerate(self.destinations):
+            table[destination_name] = [
+                {
+                    'destination': self.destinations[i],
+                    'similarity': float(1.0 - distances[idx][j]),
+                    'description': self._get_destination_description(self.destinations[i]),
+                    'image_url': f'/static/images/destinations/{self.destinations[i].lower().replace(" ", "_")}.jpg'
+                }
+                for j, i in enumerate(indices[idx]) if self.destinations[i] != destination_name
+            ]
+        return table
+    
+    def _load_similarity_table(self):
+        """
+        Load the persisted neighbour table if it was built from the current KNN
+        model file, otherwise rebuild it and save it alongside the model
+        """
         try:
-            # Find the index of the destination
-            if destination_name in self.destinations:
-                idx = self.destinations.index(destination_name)
-                
-                # Get nearest neighbors - Fix: Use np.array directly instead of wrapping in list
-                dest_vector = np.eye(len(self.destinations))[idx]
-                dest_vector_reshaped = dest_vector.reshape(1, -1)  # Reshape to 2D array
-                distances, indices = self.knn_model.kneighbors(dest_vector_reshaped)
-                
-                # Return similar destinations (excluding the input destination)
-                similar = [
-                    {
-                        'destination': self.destinations[i],
-                        'similarity': float(1.0 - distances[0][j]),
-                        'description': self._get_destination_description(self.destinations[i]),
-                        'image_url': f'/static/images/destinations/{self.destinations[i].lower().replace(" ", "_")}.jpg'
-                    }
-                    for j, i in enumerate(indices[0]) if self.destinations[i] != destination_name
-                ]
-                
-                return similar[:n]
-            else:
-                # If destination not found, return some popular alternatives
-                return self._get_fallback_recommendations()[:n]
+            knn_mtime = os.path.getmtime(self.knn_path) if os.path.exists(self.knn_path) else None
+            
+            if knn_mtime is not None and os.path.exists(self.similarity_path):
+                with open(self.similarity_path, 'r') as f:
+                    saved = json.load(f)
+                if saved.get('knn_mtime') == knn_mtime and saved.get('destinations') == self.destinations:
+                    return saved['table']
+            
+            table = self._build_similarity_table()
+            
+            # Only persist tables that belong to a saved KNN model
+            if knn_mtime is not None:
+                with open(self.similarity_path, 'w') as f:
+                    json.dump({'knn_mtime': knn_mtime, 'destinations': self.destinations, 'table': table}, f)
+                logger.info("Saved similar destination table")
+            return table
         except Exception as e:
-            logger.error(f"Error finding similar destinations: {str(e)}")
-            return self._get_fallback_recommendations()[:n]
\ No newline at end of file
+            logger.error(f"Error building similar destination table: {str(e)}")
+            return {}
+    
+    def get_similar_destinations(self, destination_name, n=3):
+        """Find destinations similar to the given one"""
+        similar = self.similar_destinations.get(destination_name)
+        if similar is not None:
+            return similar[:n]
+        
+        # If destination not found, return some popular alternatives
+        return self._get_fallback_recommendations()[:n]
@@ -0,0 +1,70 @@
+import logging
+from functools import lru_cache
+
+from passlib.context import CryptContext
+from werkzeug.security import check_password_hash
+
+from app.utils.settings import get_setting
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEME = 'pbkdf2_sha256'
+# Schemes older hashes may use; they verify but are rehashed on the next login
+LEGACY_SCHEMES = ('pbkdf2_sha256',)
+
+
+@lru_cache(maxsize=8)
+def build_password_context(scheme=DEFAULT_SCHEME, rounds=None):
+    """
+    A CryptContext that hashes with `scheme` and treats every other scheme, and
+    any hash whose rounds differ from `rounds`, as needing an update. rounds=None
+    keeps passlib's default cost for the scheme.
+    """
+    schemes = [scheme] + [legacy for legacy in LEGACY_SCHEMES if legacy != scheme]
+    settings = {'schemes': schemes, 'deprecated': ['auto']}
+    if rounds:
+        rounds = int(rounds)
+        # min and max pinned to the same value, so the cost can be tuned down as well as up
+        settings.update({
+            f'{scheme}__default_rounds': rounds,
+            f'{scheme}__min_rounds': rounds,
+            f'{scheme}__max_rounds': rounds,
+        })
+    return CryptContext(**settings)
+
+
+def get_password_context():
+    """The CryptContext for the configured PASSWORD_HASH_SCHEME and PASSWORD_HASH_ROUNDS"""
+    return build_password_context(
+        get_setting('PASSWORD_HASH_SCHEME', DEFAULT_SCHEME),
+        get_setting('PASSWORD_HASH_ROUNDS') or None
+    )
+
+
+def hash_password(password, context=None):
+    return (context or get_password_context()).hash(password)
+
+
+def verify_and_update(password, password_hash, context=None):
+    """
+    Check a password against a stored hash.
+
+    Returns:
+        tuple: (valid, new_hash) where new_hash is a replacement hash using the
+        current policy when the stored one is outdated, otherwise None
+    """
+    if not password or not password_hash:
+        return False, None
+    context = context or get_password_context()
+    try:
+        return context.verify_and_update(password, password_hash)
+    except ValueError:
+        # Not a passlib hash; accounts created before passlib use Werkzeug's format
+        pass
+    try:
+        if check_password_hash(password_hash, password):
+            return True, context.hash(password)
+    except Exception as e:
+        logger.warning(f"Could not verify password hash: {str(e)}")
+    return False, None
@@ -0,0 +1,78 @@
+import time
+import logging
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def register_periodic_job(app, name, interval_setting, job):
+    """
+    Register job(app) to run every app.config[interval_setting] seconds.
+
+    Nothing runs inside web workers or other processes that call create_app();
+    jobs only run in the single process started with `flask run-scheduler`, so
+    each run happens once however many workers serve requests.
+    """
+    app.extensions.setdefault('periodic_jobs', {})[name] = (interval_setting, job)
+
+
+def _run_job(app, name, job):
+    started = time.time()
+    try:
+        with app.app_context():
+            job(app)
+        logger.info(f"Periodic job {name} finished in {time.time() - started:.1f}s")
+    except Exception as e:
+        logger.error(f"Periodic job {name} failed: {str(e)}")
+
+
+def run_scheduler(app, names=None, once=False):
+    """
+    Run the registered jobs whose interval setting is non-zero, each as soon as
+    the scheduler starts and then every interval, in this process. With
+    once=True every selected job runs a single time and the function returns.
+    """
+    registered = app.extensions.get('periodic_jobs', {})
+    jobs = {}
+    for name, (interval_setting, job) in registered.items():
+        if names and name not in names:
+            continue
+        interval = app.config.get(interval_setting) or 0
+        if once or interval > 0:
+            jobs[name] = (interval, job)
+        else:
+            logger.info(f"Not scheduling {name}: {interval_setting} is not set")
+    if not jobs:
+        return
+
+    next_run = {name: 0.0 for name in jobs}
+    while True:
+        for name, (interval, job) in jobs.items():
+            if time.time() >= next_run[name]:
+                _run_job(app, name, job)
+                next_run[name] = time.time() + interval
+        if once:
+            return
+        time.sleep(max(0.0, min(next_run.values()) - time.time()))
+
+
+@click.command('run-scheduler')
+@click.option('--job', 'names', multiple=True, help='Only run this job (repeatable), e.g. flight-ingest or price-watch')
+@click.option('--once', is_flag=True, help='Run each job once and exit, e.g. from cron')
+@with_appcontext
+def run_scheduler_command(names, once):
+    """Run the periodic background jobs. Start exactly one of these per deployment."""
+    app = current_app._get_current_object()
+    available = sorted(app.extensions.get('periodic_jobs', {}))
+    unknown = set(names) - set(available)
+    if unknown:
+        raise click.UsageError(f"Unknown job(s) {', '.join(sorted(unknown))}; available: {', '.join(available)}")
+    run_scheduler(app, set(names), once=once)
+
+
+def init_app(app):
+    app.cli.add_command(run_scheduler_command)
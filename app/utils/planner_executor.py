@@ -0,0 +1,128 @@
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+
+from flask import current_app, has_app_context
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class PlannerRun:
+    """Results and per-stage timings of one PlannerExecutor.run() call"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.results = {}
+        self.stages = {}
+        self.started_at = time.time()
+        self.total_ms = None
+
+    def get(self, name, default=None):
+        return self.results.get(name, default)
+
+    def succeeded(self, name):
+        return self.stages.get(name, {}).get('status') == 'complete'
+
+    def report(self):
+        """JSON-friendly summary for including in planner responses"""
+        return {
+            'deadline_ms': round(self.deadline * 1000) if self.deadline else None,
+            'total_ms': self.total_ms,
+            'stages': {name: dict(stage) for name, stage in self.stages.items()}
+        }
+
+
+class PlannerExecutor:
+    """
+    Runs a holiday planner's independent lookups (flights, accommodation
+    prices, activity scoring, ...) concurrently on a bounded thread pool.
+
+    run() waits for the stages up to a per-request deadline. Each result is
+    stored as soon as its stage finishes; stages that fail or miss the deadline
+    fall back to the value (or callable) given in `fallbacks`, so the planner
+    can still return a partial plan. Stages still running at the deadline are
+    left to finish in the background and their results are discarded.
+    """
+
+    def __init__(self, max_workers=8, deadline=8.0):
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='planner')
+
+    def _call(self, app, stage, queued_at):
+        started = time.time()
+        if app is not None:
+            with app.app_context():
+                value = stage()
+        else:
+            value = stage()
+        finished = time.time()
+        return value, (started - queued_at) * 1000, (finished - started) * 1000
+
+    def run(self, stages, fallbacks=None, deadline=None):
+        """
+        Run every callable in `stages` ({name: callable}) and return a PlannerRun.
+
+        Args:
+            stages (dict): Stage name -> zero-argument callable
+            fallbacks (dict, optional): Stage name -> value, or callable producing it,
+                used when the stage fails or misses the deadline
+            deadline (float, optional): Seconds to wait; defaults to the executor's deadline
+        """
+        fallbacks = fallbacks or {}
+        deadline = self.deadline if deadline is None else deadline
+        planner_run = PlannerRun(deadline)
+
+        # Workers get their own app context so stages can use current_app and get_model
+        app = current_app._get_current_object() if has_app_context() else None
+        queued_at = time.time()
+        futures = {self._executor.submit(self._call, app, stage, queued_at): name
+                   for name, stage in stages.items()}
+
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                try:
+                    value, wait_ms, duration_ms = future.result()
+                    planner_run.results[name] = value
+                    planner_run.stages[name] = {
+                        'status': 'complete',
+                        'queued_ms': round(wait_ms, 1),
+                        'duration_ms': round(duration_ms, 1)
+                    }
+                except Exception as e:
+                    logger.error(f"Planner stage {name} failed: {str(e)}")
+                    planner_run.stages[name] = {'status': 'error', 'error': str(e)}
+        except FuturesTimeoutError:
+            for future, name in futures.items():
+                if name not in planner_run.stages:
+                    future.cancel()
+                    logger.warning(f"Planner stage {name} missed the {deadline}s deadline")
+                    planner_run.stages[name] = {'status': 'timeout'}
+
+        for name in stages:
+            if name not in planner_run.results and name in fallbacks:
+                fallback = fallbacks[name]
+                planner_run.results[name] = fallback() if callable(fallback) else fallback
+                planner_run.stages[name]['fallback'] = True
+
+        planner_run.total_ms = round((time.time() - planner_run.started_at) * 1000, 1)
+        return planner_run
+
+
+_executor_lock = threading.Lock()
+
+
+def get_planner_executor():
+    """Return the app's PlannerExecutor, creating it from config on first use."""
+    app = current_app._get_current_object()
+    with _executor_lock:
+        executor = app.extensions.get('planner_executor')
+        if executor is None:
+            executor = PlannerExecutor(
+                max_workers=app.config.get('PLANNER_WORKERS', 8),
+                deadline=app.config.get('PLANNER_DEADLINE', 8.0)
+            )
+            app.extensions['planner_executor'] = executor
+        return executor
@@ -0,0 +1,280 @@
+import threading
+import time
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app.extensions import db
+from app.models import Flight
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Session.info key used to collect partitions touched by a flush until the
+# surrounding transaction commits
+PENDING_KEYS = 'price_index_pending_keys'
+
+
+def partition_key(departure_airport, arrival_airport, departure_time):
+    """
+    Build the (departure_airport, arrival_airport, departure date) key used to
+    partition the price index.
+    """
+    if not departure_airport or not arrival_airport or departure_time is None:
+        return None
+    day = departure_time.date() if isinstance(departure_time, datetime) else departure_time
+    return (departure_airport.strip().upper(), arrival_airport.strip().upper(), day)
+
+
+class PricePartition:
+    """
+    Sorted (cost, flight_id) arrays for a single route and departure date.
+    """
+    __slots__ = ('costs', 'flight_ids')
+
+    def __init__(self, costs, flight_ids):
+        # Imported on first build so importing the app doesn't load NumPy
+        import numpy as np
+
+        order = np.argsort(costs, kind='stable')
+        self.costs = np.asarray(costs, dtype=np.float64)[order]
+        self.flight_ids = np.asarray(flight_ids, dtype=np.int64)[order]
+
+    def __len__(self):
+        return len(self.costs)
+
+    def window(self, low, high):
+        """Return the (costs, flight_ids) slices with low <= cost <= high."""
+        start = self.costs.searchsorted(low, side='left')
+        end = self.costs.searchsorted(high, side='right')
+        return self.costs[start:end], self.flight_ids[start:end]
+
+    def nearest(self, target, k):
+        """Return up to 2k entries either side of target, for nearest-price lookups."""
+        pos = int(self.costs.searchsorted(target))
+        start = max(0, pos - k)
+        end = min(len(self.costs), pos + k)
+        return self.costs[start:end], self.flight_ids[start:end]
+
+
+class FlightPriceIndex:
+    """
+    Process-local price index over the Flight table.
+
+    Flights are grouped into partitions keyed on (departure_airport,
+    arrival_airport, departure date). Each partition holds a NumPy array of
+    costs sorted ascending plus the matching flight ids, so target +/- tolerance
+    lookups are two searchsorted calls per partition. Partitions touched by a
+    committed Flight insert, update or delete are marked stale and reloaded on
+    the next lookup; the whole index is rebuilt in a background thread once it
+    is older than max_age so that writes made by other worker processes are
+    eventually picked up, while lookups keep using the current partitions.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._partitions = {}
+        self._stale = set()
+        self._built_at = None
+        self._lock = threading.RLock()
+        # Held for the whole of a build so only one runs at a time
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+        # Keys invalidated while a build is querying, or None outside a build
+        self._invalidated_during_build = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def invalidate(self, keys=None):
+        """Mark the given partitions stale, or drop the whole index if keys is None."""
+        with self._lock:
+            if keys is None:
+                self._built_at = None
+                self._partitions = {}
+                self._stale.clear()
+            else:
+                keys = {key for key in keys if key is not None}
+                self._stale.update(keys)
+                if self._invalidated_during_build is not None:
+                    self._invalidated_during_build.update(keys)
+
+    def build(self):
+        """Load every priced flight into memory, replacing any existing partitions."""
+        started = time.time()
+        with self._lock:
+            # Invalidations that arrive while we query may predate our snapshot,
+            # so they stay stale once it replaces the existing partitions
+            self._invalidated_during_build = set()
+
+        try:
+            rows = db.session.query(
+                Flight.departure_airport,
+                Flight.arrival_airport,
+                Flight.departure_time,
+                Flight.cost,
+                Flight.id
+            ).filter(Flight.cost.isnot(None)).all()
+        except Exception:
+            with self._lock:
+                self._invalidated_during_build = None
+            raise
+
+        grouped = defaultdict(lambda: ([], []))
+        for departure_airport, arrival_airport, departure_time, cost, flight_id in rows:
+            key = partition_key(departure_airport, arrival_airport, departure_time)
+            if key is None:
+                continue
+            costs, flight_ids = grouped[key]
+            costs.append(cost)
+            flight_ids.append(flight_id)
+
+        partitions = {key: PricePartition(costs, ids) for key, (costs, ids) in grouped.items()}
+
+        with self._lock:
+            self._partitions = partitions
+            self._stale = self._invalidated_during_build or set()
+            self._invalidated_during_build = None
+            self._built_at = time.time()
+
+        logger.info(f"Built flight price index: {len(rows)} flights in {len(partitions)} partitions "
+                    f"({(time.time() - started) * 1000:.1f}ms)")
+
+    def _refresh_partition(self, key):
+        departure_airport, arrival_airport, day = key
+        day_start = datetime.combine(day, datetime.min.time())
+
+        with self._lock:
+            self._stale.discard(key)
+
+        rows = db.session.query(Flight.cost, Flight.id).filter(
+            Flight.departure_airport == departure_airport,
+            Flight.arrival_airport == arrival_airport,
+            Flight.departure_time >= day_start,
+            Flight.departure_time < day_start + timedelta(days=1),
+            Flight.cost.isnot(None)
+        ).all()
+
+        with self._lock:
+            if rows:
+                self._partitions[key] = PricePartition([r[0] for r in rows], [r[1] for r in rows])
+            else:
+                self._partitions.pop(key, None)
+
+    def ensure_fresh(self, max_age=None):
+        """
+        Build the index if it has never been built, or start a background
+        rebuild once it is older than max_age. Only one build runs at a time:
+        concurrent first lookups wait for it, and lookups during a rebuild are
+        served from the existing partitions. Stale partitions are reloaded
+        separately, by partitions_for.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        if self._built_at is None:
+            with self._build_lock:
+                # Another request may have built it while we waited
+                if self._built_at is None:
+                    self.build()
+        elif max_age and time.time() - self._built_at > max_age:
+            self._start_rebuild()
+
+    def _start_rebuild(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        app = current_app._get_current_object()
+        threading.Thread(target=self._rebuild, args=(app,), name='price-index-rebuild', daemon=True).start()
+
+    def _rebuild(self, app):
+        try:
+            with self._build_lock, app.app_context():
+                self.build()
+        except Exception as e:
+            logger.error(f"Flight price index rebuild failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def partitions_for(self, origin=None, destination=None, departure_date=None):
+        """
+        Return the partitions matching the given filters, refreshing stale ones.
+
+        Any filter left as None matches every value for that part of the key.
+        """
+        origin = origin.strip().upper() if origin and origin.strip() else None
+        destination = destination.strip().upper() if destination and destination.strip() else None
+
+        def matches(key):
+            return ((origin is None or key[0] == origin) and
+                    (destination is None or key[1] == destination) and
+                    (departure_date is None or key[2] == departure_date))
+
+        with self._lock:
+            candidate_keys = [key for key in set(self._partitions) | self._stale if matches(key)]
+            stale_keys = [key for key in candidate_keys if key in self._stale]
+
+        for key in stale_keys:
+            self._refresh_partition(key)
+
+        with self._lock:
+            return [(key, self._partitions[key]) for key in candidate_keys if key in self._partitions]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'partitions': len(self._partitions),
+                'flights': int(sum(len(p) for p in self._partitions.values())),
+                'stale_partitions': len(self._stale),
+                'built_at': self._built_at
+            }
+
+
+# Shared index for this worker process
+price_index = FlightPriceIndex()
+
+
+def _keys_for_flight(target):
+    """Return the current partition key of a flight plus any key it had before this flush."""
+    keys = {partition_key(target.departure_airport, target.arrival_airport, target.departure_time)}
+
+    # Route or date changes move the flight between partitions
+    old_values = {}
+    for attr in ('departure_airport', 'arrival_airport', 'departure_time'):
+        history = attributes.get_history(target, attr)
+        old_values[attr] = history.deleted[0] if history.deleted else getattr(target, attr)
+    keys.add(partition_key(old_values['departure_airport'], old_values['arrival_airport'],
+                           old_values['departure_time']))
+
+    keys.discard(None)
+    return keys
+
+
+def _record_flight_change(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        price_index.invalidate(_keys_for_flight(target))
+        return
+    session.info.setdefault(PENDING_KEYS, set()).update(_keys_for_flight(target))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_invalidations(session):
+    keys = session.info.pop(PENDING_KEYS, None)
+    if keys:
+        price_index.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_invalidations(session):
+    session.info.pop(PENDING_KEYS, None)
+
+
+event.listen(Flight, 'after_insert', _record_flight_change)
+event.listen(Flight, 'after_update', _record_flight_change)
+event.listen(Flight, 'after_delete', _record_flight_change)
@@ -1,6 +1,7 @@
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
+from joblib import Parallel, delayed
 import os
 import pickle
 from datetime import datetime
@@ -51,25 +52,59 @@ class PricePredictor:
         Returns:
             Predicted price and confidence interval
         """
-        # Convert features to model input format
-        X = self._encode_features(features)
-        X_scaled = self.scaler.transform(X.reshape(1, -1))
+        predictions = self.predict_prices([features])
         
-        # Get prediction
-        prediction = self.model.predict(X_scaled)[0]
+        return {
+            'predicted_price': float(predictions['predicted_price'][0]),
+            'min_price': float(predictions['min_price'][0]),
+            'max_price': float(predictions['max_price'][0]),
+            'confidence': predictions['confidence']
+        }
+    
+    def predict_prices(self, features_list):
+        """
+        Predict prices for a batch of feature dicts in one pass over the forest
+        
+        Args:
+            features_list: list of feature dicts, as accepted by predict_price
+        
+        Returns:
+            dict of numpy arrays (one entry per input row) with predicted_price,
+            min_price and max_price, plus the confidence level
+        """
+        if not features_list:
+            empty = np.zeros(0)
+            return {'predicted_price': empty, 'min_price': empty, 'max_price': empty, 'confidence': 0.95}
+        
+        # Encode every row into a single matrix
+        X = np.vstack([self._encode_features(features) for features in features_list])
+        X_scaled = np.ascontiguousarray(self.scaler.transform(X), dtype=np.float32)
+        
+        # Per-tree predictions for the whole batch, shape (n_trees, n_rows). The
+        # forest's prediction is the mean over its trees, so it comes from the same pass
+        tree_predictions = self._tree_predictions(X_scaled)
+        prediction = tree_predictions.mean(axis=0)
         
         # Calculate confidence interval using tree variance
-        tree_predictions = np.array([tree.predict(X_scaled)[0] 
-                                   for tree in self.model.estimators_])
-        confidence_interval = np.std(tree_predictions) * 2  # 95% confidence interval
+        confidence_interval = tree_predictions.std(axis=0) * 2  # 95% confidence interval
         
         return {
-            'predicted_price': float(prediction),
-            'min_price': float(prediction - confidence_interval),
-            'max_price': float(prediction + confidence_interval),
+            'predicted_price': prediction,
+            'min_price': prediction - confidence_interval,
+            'max_price': prediction + confidence_interval,
             'confidence': 0.95
         }
     
+    def _tree_predictions(self, X_scaled):
+        """Run every tree of the forest over X_scaled, using the forest's n_jobs threads"""
+        estimators = self.model.estimators_
+        
+        # X_scaled is already float32 and C-contiguous, so the per-tree input checks can be skipped
+        results = Parallel(n_jobs=self.model.n_jobs, prefer='threads')(
+            delayed(tree.predict)(X_scaled, check_input=False) for tree in estimators
+        )
+        return np.vstack(results)
+    
     def _encode_features(self, features):
         """Convert raw features to model input format"""
         if self.model_type == 'flight':
@@ -0,0 +1,211 @@
+import threading
+import time
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, func, insert, update
+
+from app.extensions import db
+from app.models import PriceChange, SavedFlight, User, UserSettings
+from app.utils.amadeus_api import search_flights
+from app.utils.flight_ingest import parse_offer_time
+from app.utils.periodic import register_periodic_job
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces out calls across threads so at most `rate` start per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _watched_flights(now):
+    """Saved flights that haven't departed yet, grouped by (departure, arrival, date)"""
+    rows = db.session.execute(
+        db.select(SavedFlight.id, SavedFlight.user_id, SavedFlight.departure_airport,
+                  SavedFlight.arrival_airport, SavedFlight.departure_time, SavedFlight.airline,
+                  SavedFlight.price, SavedFlight.currency)
+        .where(SavedFlight.departure_time > now,
+               SavedFlight.departure_airport.isnot(None),
+               SavedFlight.arrival_airport.isnot(None))
+    ).all()
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.departure_airport.upper(), row.arrival_airport.upper(), row.departure_time.date())].append(row)
+    return groups
+
+
+def _notified_user_ids(user_ids):
+    """The users in user_ids who get notifications; users without settings get the default (on)"""
+    if not user_ids:
+        return set()
+    return set(db.session.execute(
+        db.select(User.id)
+        .outerjoin(UserSettings, UserSettings.user_id == User.id)
+        .where(User.id.in_(list(user_ids)), func.coalesce(UserSettings.notifications_enabled, True))
+    ).scalars())
+
+
+def _offer_prices(offers):
+    """(departure_time, airline, price, currency) for each priced one-way offer"""
+    prices = []
+    for offer in offers:
+        try:
+            prices.append((parse_offer_time(offer['departure']['time']), offer.get('airline'),
+                           float(offer['price']['total']), offer['price'].get('currency')))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return prices
+
+
+def _match_price(saved, prices):
+    """Cheapest offer departing at the saved flight's time, preferring the same airline"""
+    departing = [price for price in prices if price[0] == saved.departure_time]
+    same_airline = [price for price in departing if saved.airline and price[1] == saved.airline]
+    candidates = same_airline or departing
+    if not candidates:
+        return None
+    return min(candidates, key=lambda price: price[2])
+
+
+def run_price_watch(now=None):
+    """
+    Reprice every watched SavedFlight.
+
+    Saved flights are grouped by route and departure date so each distinct
+    route-date is searched once however many users saved it. The searches run
+    concurrently on PRICE_WATCH_CONCURRENCY threads, starting at most
+    PRICE_WATCH_RATE_LIMIT per second. Prices that moved by at least
+    PRICE_WATCH_MIN_CHANGE are written back in one bulk UPDATE, and a
+    PriceChange row is inserted for owners with notifications enabled.
+
+    Returns:
+        dict: counts of watched flights, route-dates searched, failures, changes and notifications
+    """
+    started = time.time()
+    app = current_app._get_current_object()
+    now = now or datetime.utcnow()
+    min_change = app.config.get('PRICE_WATCH_MIN_CHANGE', 1.0)
+
+    groups = _watched_flights(now)
+    stats = {'watched': sum(len(rows) for rows in groups.values()), 'route_dates': len(groups),
+             'failed': 0, 'unmatched': 0, 'changed': 0, 'notifications': 0}
+    if not groups:
+        stats['seconds'] = round(time.time() - started, 3)
+        return stats
+
+    notified = _notified_user_ids({row.user_id for rows in groups.values() for row in rows})
+    limiter = RateLimiter(app.config.get('PRICE_WATCH_RATE_LIMIT', 5))
+
+    def reprice(departure_airport, arrival_airport, day):
+        limiter.acquire()
+        with app.app_context():
+            return search_flights(departure_airport, arrival_airport, day.strftime('%Y-%m-%d'))
+
+    price_updates = []
+    changes = []
+    with ThreadPoolExecutor(max_workers=app.config.get('PRICE_WATCH_CONCURRENCY', 4),
+                            thread_name_prefix='price-watch') as executor:
+        futures = {executor.submit(reprice, *key): key for key in groups}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                offers, meta = future.result()
+            except Exception as e:
+                offers, meta = [], {'error': str(e)}
+            if 'error' in meta:
+                logger.warning(f"Could not reprice {key[0]}-{key[1]} on {key[2]}: {meta['error']}")
+                stats['failed'] += 1
+                continue
+
+            prices = _offer_prices(offers)
+            for saved in groups[key]:
+                match = _match_price(saved, prices)
+                if match is None or (saved.currency and match[3] and saved.currency != match[3]):
+                    stats['unmatched'] += 1
+                    continue
+                new_price = match[2]
+                if saved.price is not None and abs(new_price - saved.price) < min_change:
+                    continue
+                price_updates.append({'saved_flight_id': saved.id, 'price': new_price,
+                                      'currency': match[3] or saved.currency})
+                if saved.price is not None and saved.user_id in notified:
+                    changes.append({
+                        'user_id': saved.user_id,
+                        'saved_flight_id': saved.id,
+                        'departure_airport': saved.departure_airport,
+                        'arrival_airport': saved.arrival_airport,
+                        'departure_time': saved.departure_time,
+                        'airline': saved.airline,
+                        'old_price': saved.price,
+                        'new_price': new_price,
+                        'currency': match[3] or saved.currency,
+                        'checked_at': now
+                    })
+
+    if price_updates:
+        table = SavedFlight.__table__
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('saved_flight_id'))
+            .values(price=bindparam('price'), currency=bindparam('currency')),
+            price_updates
+        )
+    if changes:
+        db.session.execute(insert(PriceChange.__table__), changes)
+    db.session.commit()
+
+    stats['changed'] = len(price_updates)
+    stats['notifications'] = len(changes)
+    stats['seconds'] = round(time.time() - started, 3)
+    logger.info(f"Price watch: {stats}")
+    return stats
+
+
+def get_price_change_feed(user_id, since=None, limit=20):
+    """
+    A user's newest price changes as compact dicts, newest first, optionally
+    only those checked after `since`. Empty for users with notifications off.
+    """
+    if not _notified_user_ids({user_id}):
+        return []
+    stmt = db.select(PriceChange).where(PriceChange.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(PriceChange.checked_at > since)
+    stmt = stmt.order_by(PriceChange.checked_at.desc(), PriceChange.id.desc()).limit(limit)
+    return [change.to_dict() for change in db.session.execute(stmt).scalars()]
+
+
+@click.command('watch-prices')
+@with_appcontext
+def watch_prices_command():
+    """Reprice every saved flight and record price changes."""
+    stats = run_price_watch()
+    click.echo(f"Repriced {stats['route_dates']} route-dates for {stats['watched']} saved flights: "
+               f"{stats['changed']} changed, {stats['notifications']} notifications, "
+               f"{stats['failed']} failed searches in {stats['seconds']}s")
+
+
+def init_app(app):
+    app.cli.add_command(watch_prices_command)
+    # Runs every PRICE_WATCH_INTERVAL seconds under `flask run-scheduler`
+    register_periodic_job(app, 'price-watch', 'PRICE_WATCH_INTERVAL', lambda app: run_price_watch())
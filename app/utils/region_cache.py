@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+import logging
+
+from app.utils.settings import get_setting
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class RegionIdCache:
+    """
+    Persistent city code -> RapidAPI regionId cache.
+
+    Entries are kept in memory and written through to a JSON file, so the
+    mapping survives restarts and is shared by every client in the process.
+    Known cities are served from the cache for `ttl` seconds; after that the
+    stale region id is still returned while a background thread re-resolves
+    it. Cities the API does not know are cached as None for `negative_ttl`
+    seconds so repeated searches for them don't hit the API either.
+
+    The resolver passed to get() returns a region id, returns None when the
+    city is unknown, and raises when the lookup itself failed; failures are
+    never cached.
+    """
+
+    def __init__(self, path=None, ttl=30 * 24 * 3600, negative_ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'negative_hits': 0, 'stale_hits': 0, 'misses': 0,
+                         'refreshes': 0, 'errors': 0}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+                logger.info(f"Loaded {len(self._entries)} hotel region ids from {path}")
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not read hotel region cache {path}: {str(e)}")
+
+    @staticmethod
+    def _key(city_code):
+        return city_code.strip().upper()
+
+    def _is_fresh(self, entry):
+        ttl = self.ttl if entry['region_id'] is not None else self.negative_ttl
+        return time.time() - entry['resolved_at'] < ttl
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries, indent=2, sort_keys=True)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Could not write hotel region cache {self.path}: {str(e)}")
+
+    def _store(self, key, region_id):
+        with self._lock:
+            self._entries[key] = {
+                'region_id': str(region_id) if region_id is not None else None,
+                'resolved_at': time.time()
+            }
+        self._save()
+
+    def _refresh(self, key, city_code, resolver):
+        try:
+            self._store(key, resolver(city_code))
+            with self._lock:
+                self._metrics['refreshes'] += 1
+        except Exception as e:
+            logger.warning(f"Background refresh of hotel region id for {key} failed: {str(e)}")
+            with self._lock:
+                self._metrics['errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, city_code, resolver):
+        """Return the region id for city_code, or None if the city is unknown."""
+        key = self._key(city_code)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None:
+            if self._is_fresh(entry):
+                with self._lock:
+                    self._metrics['hits' if entry['region_id'] is not None else 'negative_hits'] += 1
+                return entry['region_id']
+
+            if entry['region_id'] is not None:
+                # Serve the stale id and refresh it in the background, once per key
+                with self._lock:
+                    self._metrics['stale_hits'] += 1
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start_refresh:
+                    threading.Thread(target=self._refresh, args=(key, city_code, resolver),
+                                     name=f"region-refresh-{key}", daemon=True).start()
+                return entry['region_id']
+
+        with self._lock:
+            self._metrics['misses'] += 1
+        try:
+            region_id = resolver(city_code)
+        except Exception:
+            with self._lock:
+                self._metrics['errors'] += 1
+            raise
+        self._store(key, region_id)
+        return str(region_id) if region_id is not None else None
+
+    def warm(self, mapping, overwrite=False):
+        """Add {city_code: region_id} pairs, e.g. from a seed file. Returns the number added."""
+        added = 0
+        now = time.time()
+        with self._lock:
+            for city_code, region_id in mapping.items():
+                key = self._key(city_code)
+                if region_id is None or (key in self._entries and not overwrite):
+                    continue
+                self._entries[key] = {'region_id': str(region_id), 'resolved_at': now}
+                added += 1
+        if added:
+            self._save()
+        return added
+
+    def warm_from_file(self, seed_path, overwrite=False):
+        """Load a JSON seed file of {city_code: region_id} pairs."""
+        with open(seed_path) as f:
+            added = self.warm(json.load(f), overwrite=overwrite)
+        logger.info(f"Warmed hotel region cache with {added} entries from {seed_path}")
+        return added
+
+    def invalidate(self, city_code=None):
+        with self._lock:
+            if city_code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(city_code), None)
+        self._save()
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries)
+            metrics['unknown_cities'] = sum(1 for e in self._entries.values() if e['region_id'] is None)
+        return metrics
+
+
+# One cache per file in this process; hotel clients may be created outside an app context
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_region_cache():
+    """Return the shared RegionIdCache, loading HOTEL_REGION_SEED_PATH into it on first use."""
+    path = get_setting('HOTEL_REGION_CACHE_PATH')
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = RegionIdCache(
+                path,
+                ttl=float(get_setting('HOTEL_REGION_CACHE_TTL', 30 * 24 * 3600)),
+                negative_ttl=float(get_setting('HOTEL_REGION_CACHE_NEGATIVE_TTL', 24 * 3600))
+            )
+            seed_path = get_setting('HOTEL_REGION_SEED_PATH')
+            if seed_path:
+                try:
+                    cache.warm_from_file(seed_path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not load hotel region seed file {seed_path}: {str(e)}")
+            _caches[path] = cache
+        return cache
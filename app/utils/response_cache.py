@@ -0,0 +1,280 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache storage in a local SQLite file, so every worker process on the host
+    shares entries. Values are stored as JSON text. Expired rows are deleted
+    on a write at most every `purge_interval` seconds, so the file stays bounded.
+    """
+
+    def __init__(self, path, purge_interval=300):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM response_cache WHERE cache_key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None, None
+        return row[0], row[1]
+
+    def set(self, key, value, expires_at):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+        if self.purge_interval and time.time() - self._last_purge > self.purge_interval:
+            self._last_purge = time.time()
+            purged = self.purge_expired()
+            if purged:
+                logger.info(f"Purged {purged} expired entries from {self.path}")
+
+    def delete(self, key=None):
+        with self._connection() as conn:
+            if key is None:
+                conn.execute("DELETE FROM response_cache")
+            else:
+                conn.execute("DELETE FROM response_cache WHERE cache_key = ?", (key,))
+
+    def purge_expired(self):
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),)).rowcount
+
+
+class _InFlight:
+    __slots__ = ('event', 'value', 'error', 'cached')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.cached = False
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for upstream API responses.
+
+    Entries live in an in-process LRU of at most `max_entries` items and,
+    when a backend is given, in a shared store that other workers can read.
+    Concurrent misses for the same key are coalesced: one caller computes the
+    value while the others wait for its result (single-flight). Values are kept
+    as JSON text, so every caller gets its own copy and must be JSON-serialisable;
+    values come back as JSON decodes them (tuples become lists), whether they were
+    computed or cached.
+    """
+
+    def __init__(self, name, ttl=300, max_entries=1024, backend=None, wait_timeout=30):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'backend_errors': 0
+        }
+
+    @staticmethod
+    def make_key(*parts, **named):
+        """Build a stable cache key from positional and keyword parts."""
+        return json.dumps([parts, sorted(named.items())], default=str, separators=(',', ':'))
+
+    def _count(self, metric, amount=1):
+        with self._lock:
+            self._metrics[metric] += amount
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._metrics['expirations'] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics['evictions'] += 1
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        value = self._get_local(key)
+        if value is not None:
+            self._count('hits')
+            return json.loads(value)
+
+        if self.backend is not None:
+            try:
+                value, expires_at = self.backend.get(key)
+            except Exception as e:
+                logger.error(f"{self.name} cache backend read failed: {str(e)}")
+                self._count('backend_errors')
+                value = None
+            if value is not None:
+                self._set_local(key, value, expires_at)
+                self._count('shared_hits')
+                return json.loads(value)
+        return None
+
+    def set(self, key, value, ttl=None):
+        self._store(key, json.dumps(value, default=str), ttl)
+
+    def _store(self, key, serialized, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._set_local(key, serialized, expires_at)
+        self._count('stores')
+        if self.backend is not None:
+            try:
+                self.backend.set(key, serialized, expires_at)
+            except Exception as e:
+                logger.error(f"{self.name} cache backend write failed: {str(e)}")
+                self._count('backend_errors')
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """
+        Return the cached value for key, or call compute() once for all
+        concurrent callers and cache its result when cacheable(result) is true.
+
+        Returns:
+            tuple: (value, cached) where cached is True if the value came from the
+                cache or from a concurrent caller's cacheable result. Results that
+                were not cacheable, e.g. errors, are shared with waiting callers
+                but reported with cached False.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            self._count('coalesced')
+            if in_flight.event.wait(self.wait_timeout):
+                if in_flight.error is not None:
+                    raise in_flight.error
+                return json.loads(in_flight.value), in_flight.cached
+            # The leader is taking too long; compute independently
+            return json.loads(json.dumps(compute(), default=str)), False
+
+        self._count('misses')
+        try:
+            value = compute()
+            # Serialised before waiters wake, so they never see later changes the leader makes
+            in_flight.value = json.dumps(value, default=str)
+            if cacheable is None or cacheable(value):
+                self._store(key, in_flight.value)
+                in_flight.cached = True
+            return json.loads(in_flight.value), False
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            in_flight.event.set()
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything if key is None, from this process and the shared backend."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if self.backend is not None:
+            # Runs from after_commit listeners, so a failing backend must not break the commit
+            try:
+                self.backend.delete(key)
+            except Exception as e:
+                logger.error(f"{self.name} cache backend delete failed: {str(e)}")
+                self._count('backend_errors')
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries)
+        lookups = metrics['hits'] + metrics['shared_hits'] + metrics['misses'] + metrics['coalesced']
+        metrics['hit_rate'] = (lookups - metrics['misses']) / lookups if lookups else 0.0
+        return metrics
+
+
+_registry_lock = threading.Lock()
+
+
+def cache_from_config(app, name, prefix):
+    """
+    Build a ResponseCache from the app config keys <prefix>_TTL, <prefix>_MAX_ENTRIES,
+    <prefix>_BACKEND ('memory' or 'sqlite'), <prefix>_PATH and <prefix>_PURGE_INTERVAL, and register it
+    in app.extensions under `name`.
+    """
+    with _registry_lock:
+        cache = app.extensions.get(name)
+        if cache is not None:
+            return cache
+
+        backend = None
+        if app.config.get(f'{prefix}_BACKEND', 'memory') == 'sqlite':
+            path = app.config.get(f'{prefix}_PATH') or os.path.join(app.instance_path, f'{name}.sqlite3')
+            backend = SQLiteCacheBackend(path, purge_interval=app.config.get(f'{prefix}_PURGE_INTERVAL', 300))
+
+        cache = ResponseCache(
+            name,
+            ttl=app.config.get(f'{prefix}_TTL', 300),
+            max_entries=app.config.get(f'{prefix}_MAX_ENTRIES', 1024),
+            backend=backend
+        )
+        app.extensions[name] = cache
+        return cache
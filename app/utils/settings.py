@@ -0,0 +1,23 @@
+import os
+
+from flask import current_app, has_app_context
+
+
+def get_setting(name, default=None):
+    """
+    Look up a setting for code that may run with or without an app context
+    (scripts, background threads): the app config first, then config.Config,
+    then the environment.
+    """
+    if has_app_context():
+        value = current_app.config.get(name)
+        if value is not None:
+            return value
+    try:
+        from config import Config
+        value = getattr(Config, name, None)
+        if value is not None:
+            return value
+    except ImportError:
+        pass
+    return os.environ.get(name, default)
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.extensions import db
+from app.models import User
+from app.utils.response_cache import ResponseCache, cache_from_config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Columns kept in the snapshot. password_hash is left out so it is never held in
+# the cache; it loads from the database on first access, e.g. in check_password
+SNAPSHOT_COLUMNS = ('id', 'username', 'email', 'profile_picture', 'created_at')
+
+
+def _user_cache():
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = cache_from_config(current_app, 'user_cache', 'USER_CACHE')
+    return cache
+
+
+def _snapshot(user):
+    data = {column: getattr(user, column) for column in SNAPSHOT_COLUMNS}
+    if data['created_at'] is not None:
+        data['created_at'] = data['created_at'].isoformat()
+    return data
+
+
+def _from_snapshot(data):
+    data = dict(data)
+    if data.get('created_at'):
+        data['created_at'] = datetime.fromisoformat(data['created_at'])
+    user = User(**data)
+    # Treat the rebuilt object as a row loaded from the database, with the
+    # columns that aren't in the snapshot expired so they load when touched
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load_cached_user(user_id):
+    """
+    The User for Flask-Login's user_loader, rebuilt from a short-lived snapshot
+    when one is cached so most authenticated requests skip the user SELECT.
+
+    The returned object belongs to the current session: relationships such as
+    settings and itineraries lazy-load as usual, and changes flush normally.
+    Returns None if the user doesn't exist.
+    """
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    def load():
+        user = db.session.get(User, user_id)
+        return _snapshot(user) if user is not None else None
+
+    data, cached = _user_cache().get_or_compute(ResponseCache.make_key(user_id), load)
+    if data is None:
+        return None
+    if not cached:
+        # This caller ran the query, so the user is already in the session
+        return db.session.get(User, user_id)
+    return _from_snapshot(data)
+
+
+def invalidate_user(*user_ids):
+    if not has_app_context():
+        return
+    cache = _user_cache()
+    for user_id in set(user_ids):
+        if user_id is not None:
+            cache.invalidate(ResponseCache.make_key(user_id))
+
+
+def _mark_changed(mapper, connection, target):
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+def _after_commit(session):
+    # Invalidate only once the change is visible, so a concurrent request can't re-cache the old row
+    user_ids = session.info.pop('changed_user_ids', None)
+    if user_ids:
+        invalidate_user(*user_ids)
+
+
+def _after_rollback(session):
+    session.info.pop('changed_user_ids', None)
+
+
+def register_listeners():
+    """Drop a user's snapshot whenever their profile, email or password changes."""
+    if not event.contains(User, 'after_update', _mark_changed):
+        event.listen(User, 'after_update', _mark_changed)
+        event.listen(User, 'after_delete', _mark_changed)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+
+def init_app(app):
+    cache_from_config(app, 'user_cache', 'USER_CACHE')
+    register_listeners()
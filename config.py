@@ -36,6 +36,116 @@ class Config:
     AMADEUS_CLIENT_ID = os.environ.get('AMADEUS_CLIENT_ID')
     AMADEUS_CLIENT_SECRET = os.environ.get('AMADEUS_CLIENT_SECRET')
     
+    # Amadeus host ('test' or 'production'); AMADEUS_BASE_URL overrides it, e.g. for a local stub
+    AMADEUS_HOSTNAME = os.environ.get('AMADEUS_HOSTNAME', 'test')
+    AMADEUS_BASE_URL = os.environ.get('AMADEUS_BASE_URL')
+    AMADEUS_TIMEOUT = float(os.environ.get('AMADEUS_TIMEOUT', 15))
+    AMADEUS_POOL_SIZE = int(os.environ.get('AMADEUS_POOL_SIZE', 10))
+    # Refresh the OAuth token this many seconds before it expires
+    AMADEUS_TOKEN_REFRESH_MARGIN = int(os.environ.get('AMADEUS_TOKEN_REFRESH_MARGIN', 60))
+    
     # Hard-coded RapidAPI key for hotel searches
     # This is a temporary solution to avoid environment variable issues
-    RAPIDAPI_KEY = os.environ.get('RAPIDAPI_KEY') or '3ef65386aamsh420e793f0b72475p1ac5dajsne8a6ce37783b'
\ No newline at end of file
+    RAPIDAPI_KEY = os.environ.get('RAPIDAPI_KEY') or '3ef65386aamsh420e793f0b72475p1ac5dajsne8a6ce37783b'
+
+    # Seconds before the in-memory flight price index is fully rebuilt
+    PRICE_INDEX_MAX_AGE = int(os.environ.get('PRICE_INDEX_MAX_AGE', 300))
+
+    # Seconds between checks for updated model pickles
+    MODEL_RELOAD_CHECK_INTERVAL = float(os.environ.get('MODEL_RELOAD_CHECK_INTERVAL', 5))
+    # Load every model in create_app instead of on first use
+    MODEL_REGISTRY_PRELOAD = os.environ.get('MODEL_REGISTRY_PRELOAD', 'false').lower() in ('true', '1', 'yes')
+
+    # Browser/proxy cache lifetime for /search/similar-destinations responses
+    SIMILAR_DESTINATIONS_MAX_AGE = int(os.environ.get('SIMILAR_DESTINATIONS_MAX_AGE', 3600))
+    # /search/destinations/batch: logged-in users, or callers sending
+    # "Authorization: Bearer <DESTINATION_BATCH_TOKEN>", may score up to
+    # DESTINATION_BATCH_MAX_SIZE preference sets per request
+    DESTINATION_BATCH_TOKEN = os.environ.get('DESTINATION_BATCH_TOKEN')
+    DESTINATION_BATCH_MAX_SIZE = int(os.environ.get('DESTINATION_BATCH_MAX_SIZE', 10000))
+
+    # Cache for Amadeus flight offer searches; set FLIGHT_OFFER_CACHE_BACKEND=sqlite
+    # to share entries between worker processes through FLIGHT_OFFER_CACHE_PATH
+    FLIGHT_OFFER_CACHE_TTL = int(os.environ.get('FLIGHT_OFFER_CACHE_TTL', 300))
+    FLIGHT_OFFER_CACHE_MAX_ENTRIES = int(os.environ.get('FLIGHT_OFFER_CACHE_MAX_ENTRIES', 1024))
+    FLIGHT_OFFER_CACHE_BACKEND = os.environ.get('FLIGHT_OFFER_CACHE_BACKEND', 'memory')
+    FLIGHT_OFFER_CACHE_PATH = os.environ.get('FLIGHT_OFFER_CACHE_PATH')
+    # Seconds between sweeps of expired rows from the sqlite cache file
+    FLIGHT_OFFER_CACHE_PURGE_INTERVAL = int(os.environ.get('FLIGHT_OFFER_CACHE_PURGE_INTERVAL', 300))
+
+    # Background hotel searches behind /search/hotel-price/jobs. Partial results are
+    # published once the upstream search is HOTEL_SEARCH_PARTIAL_THRESHOLD percent complete
+    HOTEL_SEARCH_WORKERS = int(os.environ.get('HOTEL_SEARCH_WORKERS', 4))
+    HOTEL_SEARCH_PARTIAL_THRESHOLD = int(os.environ.get('HOTEL_SEARCH_PARTIAL_THRESHOLD', 50))
+    HOTEL_SEARCH_MAX_WAIT = float(os.environ.get('HOTEL_SEARCH_MAX_WAIT', 30))
+    # Seconds a finished job's results stay available
+    HOTEL_SEARCH_JOB_TTL = int(os.environ.get('HOTEL_SEARCH_JOB_TTL', 600))
+    # Jobs run in the worker that started them; with more than one worker process set
+    # HOTEL_SEARCH_JOB_BACKEND=sqlite so any worker can answer status requests through
+    # HOTEL_SEARCH_JOB_PATH
+    HOTEL_SEARCH_JOB_BACKEND = os.environ.get('HOTEL_SEARCH_JOB_BACKEND', 'memory')
+    HOTEL_SEARCH_JOB_PATH = os.environ.get('HOTEL_SEARCH_JOB_PATH')
+    # Unfinished jobs each signed-in user may have per worker process
+    HOTEL_SEARCH_MAX_ACTIVE_PER_USER = int(os.environ.get('HOTEL_SEARCH_MAX_ACTIVE_PER_USER', 2))
+
+    # Persistent city code -> RapidAPI regionId cache used by hotel searches.
+    # HOTEL_REGION_SEED_PATH optionally points at a JSON {city_code: region_id} file to warm it
+    HOTEL_REGION_CACHE_PATH = os.environ.get('HOTEL_REGION_CACHE_PATH') or \
+        os.path.join(basedir, 'instance', 'hotel_region_ids.json')
+    HOTEL_REGION_CACHE_TTL = int(os.environ.get('HOTEL_REGION_CACHE_TTL', 30 * 24 * 3600))
+    # How long a city the API doesn't know stays cached as unknown
+    HOTEL_REGION_CACHE_NEGATIVE_TTL = int(os.environ.get('HOTEL_REGION_CACHE_NEGATIVE_TTL', 24 * 3600))
+    HOTEL_REGION_SEED_PATH = os.environ.get('HOTEL_REGION_SEED_PATH')
+
+    # Per-user "add to itinerary" dropdown payloads; invalidated when an itinerary
+    # is created, renamed, re-dated or deleted, so the TTL only bounds memory use
+    ITINERARY_CHOICES_CACHE_TTL = int(os.environ.get('ITINERARY_CHOICES_CACHE_TTL', 3600))
+    ITINERARY_CHOICES_CACHE_MAX_ENTRIES = int(os.environ.get('ITINERARY_CHOICES_CACHE_MAX_ENTRIES', 4096))
+    ITINERARY_CHOICES_CACHE_BACKEND = os.environ.get('ITINERARY_CHOICES_CACHE_BACKEND', 'memory')
+    ITINERARY_CHOICES_CACHE_PATH = os.environ.get('ITINERARY_CHOICES_CACHE_PATH')
+    # Itinerary cards per page on the dashboard and My Itineraries
+    ITINERARIES_PER_PAGE = int(os.environ.get('ITINERARIES_PER_PAGE', 12))
+
+    # Per-process User snapshots used by login_manager.user_loader. Changes made in this
+    # process invalidate them at once; other workers see them after USER_CACHE_TTL seconds
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 4096))
+
+    # Password hashing policy. Hashes using another scheme or a different number of
+    # rounds are replaced on the user's next successful login. Leave
+    # PASSWORD_HASH_ROUNDS unset for passlib's default; see scripts/benchmark_login.py
+    PASSWORD_HASH_SCHEME = os.environ.get('PASSWORD_HASH_SCHEME', 'pbkdf2_sha256')
+    PASSWORD_HASH_ROUNDS = int(os.environ['PASSWORD_HASH_ROUNDS']) if os.environ.get('PASSWORD_HASH_ROUNDS') else None
+
+    # AI holiday planner: flight, accommodation and activity lookups run concurrently
+    # on PLANNER_WORKERS threads, and a plan is returned after PLANNER_DEADLINE seconds
+    # with fallbacks for any lookup that hasn't finished
+    PLANNER_WORKERS = int(os.environ.get('PLANNER_WORKERS', 8))
+    PLANNER_DEADLINE = float(os.environ.get('PLANNER_DEADLINE', 8))
+
+    # Flexible-date flight search: at most FLEXIBLE_SEARCH_MAX_DAYS either side of each
+    # date, with FLEXIBLE_SEARCH_CONCURRENCY upstream searches in flight per process
+    FLEXIBLE_SEARCH_MAX_DAYS = int(os.environ.get('FLEXIBLE_SEARCH_MAX_DAYS', 3))
+    FLEXIBLE_SEARCH_CONCURRENCY = int(os.environ.get('FLEXIBLE_SEARCH_CONCURRENCY', 4))
+
+    # Flight search corpus ingestion (`flask ingest-flights`). Routes look like
+    # "LHR-JFK,LHR-CDG"; offsets are departure days from today. Set
+    # FLIGHT_INGEST_INTERVAL to a number of seconds to also ingest on a schedule
+    # from the single `flask run-scheduler` process
+    FLIGHT_INGEST_ROUTES = os.environ.get('FLIGHT_INGEST_ROUTES', '')
+    FLIGHT_INGEST_DATE_OFFSETS = os.environ.get('FLIGHT_INGEST_DATE_OFFSETS', '7,14,21,28')
+    FLIGHT_INGEST_BATCH_SIZE = int(os.environ.get('FLIGHT_INGEST_BATCH_SIZE', 5000))
+    FLIGHT_INGEST_INTERVAL = int(os.environ.get('FLIGHT_INGEST_INTERVAL', 0))
+
+    # Saved-flight price watch (`flask watch-prices`). Each route-date is searched once per
+    # run, PRICE_WATCH_CONCURRENCY at a time and at most PRICE_WATCH_RATE_LIMIT searches
+    # started per second. Moves smaller than PRICE_WATCH_MIN_CHANGE are ignored. Set
+    # PRICE_WATCH_INTERVAL to a number of seconds to also run it from `flask run-scheduler`
+    PRICE_WATCH_CONCURRENCY = int(os.environ.get('PRICE_WATCH_CONCURRENCY', 4))
+    PRICE_WATCH_RATE_LIMIT = float(os.environ.get('PRICE_WATCH_RATE_LIMIT', 5))
+    PRICE_WATCH_MIN_CHANGE = float(os.environ.get('PRICE_WATCH_MIN_CHANGE', 1.0))
+    PRICE_WATCH_INTERVAL = int(os.environ.get('PRICE_WATCH_INTERVAL', 0))
+
+    # Median cold-start budget, in milliseconds, for `import app` plus create_app() in a
+    # fresh interpreter; checked by scripts/test_startup_time.py and `python -m app.bench startup`
+    STARTUP_TIME_BUDGET_MS = float(os.environ.get('STARTUP_TIME_BUDGET_MS', 2000))
@@ -0,0 +1,58 @@
+"""add flight search and itinerary foreign key indexes
+
+Revision ID: 4c7d2e9a1b36
+Revises:
+Create Date: 2026-10-18 10:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7d2e9a1b36'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_flight_route_departure_cost', 'flight',
+     ['departure_airport', 'arrival_airport', 'departure_time', 'cost']),
+    ('ix_flight_itinerary_connection', 'flight', ['itinerary_id', 'connection_group']),
+    ('ix_flight_cost', 'flight', ['cost']),
+    ('ix_accommodations_itinerary_id', 'accommodations', ['itinerary_id']),
+    ('ix_activity_itinerary_id', 'activity', ['itinerary_id']),
+    ('ix_destinations_itinerary_id', 'destinations', ['itinerary_id']),
+]
+
+
+def _existing_indexes(inspector, table):
+    return {index['name']: index['column_names'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing = _existing_indexes(inspector, table)
+        if name in existing:
+            continue
+        # Databases built with db.create_all() may already have these, and
+        # MySQL creates an index for every foreign key automatically
+        if any(cols[:len(columns)] == columns for cols in existing.values()):
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
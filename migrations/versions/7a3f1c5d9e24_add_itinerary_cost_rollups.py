@@ -0,0 +1,88 @@
+"""add itinerary cost rollup columns
+
+Revision ID: 7a3f1c5d9e24
+Revises: 4c7d2e9a1b36
+Create Date: 2026-10-18 14:37:05.402611
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3f1c5d9e24'
+down_revision = '4c7d2e9a1b36'
+branch_labels = None
+depends_on = None
+
+
+# rollup column -> (child table, cost columns)
+ROLLUPS = {
+    'flight_total': ('flight', ['cost']),
+    'accommodation_total': ('accommodations', ['cost_per_night', 'check_in_date', 'check_out_date']),
+    'activity_total': ('activity', ['cost']),
+    'transportation_total': ('transportation', ['price']),
+}
+
+
+def _positive(cost):
+    # Same rule as app.utils.itinerary_rollups.item_cost
+    return cost if cost is not None and cost > 0 else 0
+
+
+def _row_cost(table, values):
+    if table == 'accommodations':
+        # Same rule as app.utils.itinerary_rollups.accommodation_cost
+        cost_per_night, check_in_date, check_out_date = values
+        nights = 1
+        if check_in_date is not None and check_out_date is not None:
+            nights = max((check_out_date - check_in_date).days, 1)
+        return _positive(cost_per_night) * nights
+    return _positive(values[0])
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'itinerary' not in tables:
+        return
+
+    existing = {column['name'] for column in inspector.get_columns('itinerary')}
+    with op.batch_alter_table('itinerary') as batch_op:
+        for column in ROLLUPS:
+            if column not in existing:
+                batch_op.add_column(sa.Column(column, sa.Float(), nullable=False, server_default='0'))
+
+    # Backfill from the existing child rows
+    metadata = sa.MetaData()
+    totals = defaultdict(lambda: defaultdict(float))
+    for column, (table_name, cost_columns) in ROLLUPS.items():
+        if table_name not in tables:
+            continue
+        table = sa.Table(table_name, metadata, autoload_with=bind)
+        query = sa.select(table.c.itinerary_id, *[table.c[name] for name in cost_columns])
+        for row in bind.execute(query):
+            totals[row[0]][column] += _row_cost(table_name, row[1:])
+
+    if totals:
+        itinerary = sa.table('itinerary', sa.column('id'), *[sa.column(column) for column in ROLLUPS])
+        bind.execute(
+            itinerary.update().where(itinerary.c.id == sa.bindparam('itinerary_id')),
+            [dict({column: round(sums[column], 2) for column in ROLLUPS}, itinerary_id=itinerary_id)
+             for itinerary_id, sums in totals.items()]
+        )
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'itinerary' not in inspector.get_table_names():
+        return
+
+    existing = {column['name'] for column in inspector.get_columns('itinerary')}
+    with op.batch_alter_table('itinerary') as batch_op:
+        for column in reversed(list(ROLLUPS)):
+            if column in existing:
+                batch_op.drop_column(column)
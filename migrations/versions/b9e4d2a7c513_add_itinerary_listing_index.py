@@ -0,0 +1,38 @@
+"""add itinerary keyset listing index
+
+Revision ID: b9e4d2a7c513
+Revises: 7a3f1c5d9e24
+Create Date: 2026-10-18 15:52:19.730448
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4d2a7c513'
+down_revision = '7a3f1c5d9e24'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = 'ix_itinerary_user_start_date'
+INDEX_COLUMNS = ['user_id', 'start_date', 'id']
+
+
+def _index_names(inspector):
+    return {index['name'] for index in inspector.get_indexes('itinerary')}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'itinerary' not in inspector.get_table_names():
+        return
+    if INDEX_NAME not in _index_names(inspector):
+        op.create_index(INDEX_NAME, 'itinerary', INDEX_COLUMNS, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'itinerary' in inspector.get_table_names() and INDEX_NAME in _index_names(inspector):
+        op.drop_index(INDEX_NAME, table_name='itinerary')
@@ -0,0 +1,53 @@
+"""add price_change table for the saved flight price watch
+
+Revision ID: d3a8f6b1c947
+Revises: b9e4d2a7c513
+Create Date: 2026-10-18 17:21:44.108392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f6b1c947'
+down_revision = 'b9e4d2a7c513'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = 'ix_price_change_user_checked'
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'price_change' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'price_change',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('saved_flight_id', sa.Integer(), nullable=False),
+        sa.Column('departure_airport', sa.String(length=10), nullable=True),
+        sa.Column('arrival_airport', sa.String(length=10), nullable=True),
+        sa.Column('departure_time', sa.DateTime(), nullable=True),
+        sa.Column('airline', sa.String(length=100), nullable=True),
+        sa.Column('old_price', sa.Float(), nullable=True),
+        sa.Column('new_price', sa.Float(), nullable=True),
+        sa.Column('currency', sa.String(length=3), nullable=True),
+        sa.Column('checked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.ForeignKeyConstraint(['saved_flight_id'], ['saved_flight.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(INDEX_NAME, 'price_change', ['user_id', 'checked_at'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'price_change' not in inspector.get_table_names():
+        return
+    if INDEX_NAME in {index['name'] for index in inspector.get_indexes('price_change')}:
+        op.drop_index(INDEX_NAME, table_name='price_change')
+    op.drop_table('price_change')
@@ -0,0 +1,104 @@
+"""detach the flight search corpus from its placeholder itinerary
+
+Revision ID: e6c1a4f9b2d8
+Revises: d3a8f6b1c947
+Create Date: 2026-10-18 19:02:16.553870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1a4f9b2d8'
+down_revision = 'd3a8f6b1c947'
+branch_labels = None
+depends_on = None
+
+
+INDEX_NAME = 'uq_flight_corpus_key'
+KEY_PREFIX = 'ingest:'
+# The user and itinerary flight_ingest used to own corpus rows with
+CORPUS_USERNAME = 'flight-corpus'
+CORPUS_ITINERARY_NAME = 'Flight search corpus'
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'flight' not in tables:
+        return
+
+    existing = {column['name'] for column in inspector.get_columns('flight')}
+    if 'corpus_key' not in existing:
+        with op.batch_alter_table('flight') as batch_op:
+            batch_op.alter_column('itinerary_id', existing_type=sa.Integer(), nullable=True)
+            batch_op.add_column(sa.Column('corpus_key', sa.String(length=64), nullable=True))
+
+    # Move already-ingested rows out of the placeholder itinerary, keeping the
+    # oldest row of any journey that concurrent ingests inserted twice
+    flight = sa.table('flight', sa.column('id'), sa.column('itinerary_id'),
+                      sa.column('connection_group'), sa.column('corpus_key'))
+    rows = bind.execute(
+        sa.select(flight.c.id, flight.c.connection_group)
+        .where(flight.c.connection_group.like(f'{KEY_PREFIX}%'))
+        .order_by(flight.c.id)
+    ).all()
+    seen = set()
+    keep, duplicates = [], []
+    for row in rows:
+        if row.connection_group in seen:
+            duplicates.append(row.id)
+        else:
+            seen.add(row.connection_group)
+            keep.append({'flight_id': row.id, 'key': row.connection_group})
+    if duplicates:
+        bind.execute(flight.delete().where(flight.c.id.in_(duplicates)))
+    if keep:
+        bind.execute(
+            flight.update().where(flight.c.id == sa.bindparam('flight_id'))
+            .values(corpus_key=sa.bindparam('key'), itinerary_id=None, connection_group=None),
+            keep
+        )
+
+    if INDEX_NAME not in {index['name'] for index in inspector.get_indexes('flight')}:
+        op.create_index(INDEX_NAME, 'flight', ['corpus_key'], unique=True)
+
+    # Drop the placeholder owner, which also frees its username for registration
+    if 'user' in tables and 'itinerary' in tables:
+        user = sa.table('user', sa.column('id'), sa.column('username'))
+        itinerary = sa.table('itinerary', sa.column('id'), sa.column('user_id'), sa.column('name'))
+        user_id = bind.execute(sa.select(user.c.id).where(user.c.username == CORPUS_USERNAME)).scalar()
+        if user_id is not None:
+            bind.execute(itinerary.delete().where(itinerary.c.user_id == user_id,
+                                                  itinerary.c.name == CORPUS_ITINERARY_NAME))
+            remaining = bind.execute(
+                sa.select(sa.func.count()).select_from(itinerary).where(itinerary.c.user_id == user_id)
+            ).scalar()
+            if not remaining:
+                if 'user_settings' in tables:
+                    settings = sa.table('user_settings', sa.column('user_id'))
+                    bind.execute(settings.delete().where(settings.c.user_id == user_id))
+                bind.execute(user.delete().where(user.c.id == user_id))
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'flight' not in inspector.get_table_names():
+        return
+    existing = {column['name'] for column in inspector.get_columns('flight')}
+    if 'corpus_key' not in existing:
+        return
+
+    # Corpus rows have no itinerary and can't survive itinerary_id becoming NOT NULL;
+    # run `flask ingest-flights` again after downgrading to reload them
+    flight = sa.table('flight', sa.column('itinerary_id'))
+    bind.execute(flight.delete().where(flight.c.itinerary_id.is_(None)))
+
+    if INDEX_NAME in {index['name'] for index in inspector.get_indexes('flight')}:
+        op.drop_index(INDEX_NAME, table_name='flight')
+    with op.batch_alter_table('flight') as batch_op:
+        batch_op.drop_column('corpus_key')
+        batch_op.alter_column('itinerary_id', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,251 @@
+"""
+Local stand-in for the Amadeus self-service APIs.
+
+Serves the OAuth token endpoint and the shopping/reference-data endpoints the
+app calls, returning deterministic fake data shaped like the real responses.
+
+    python scripts/amadeus_stub_server.py --port 8765
+    AMADEUS_BASE_URL=http://127.0.0.1:8765 python run.py
+
+Scripts can also start it in-process with start_stub_server().
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+AIRLINES = ['BA', 'AF', 'KL', 'LH', 'IB', 'VS', 'EI', 'U2']
+
+
+def _seed(*parts):
+    return int(hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()[:8], 16)
+
+
+def _error(status, code, title, detail=None):
+    return status, {'errors': [{'status': status, 'code': code, 'title': title, 'detail': detail or title}]}
+
+
+def _flight_segment(origin, destination, day, seed):
+    departure = datetime.strptime(day, '%Y-%m-%d') + timedelta(hours=6 + seed % 14, minutes=(seed // 7) % 4 * 15)
+    minutes = 60 + seed % 600
+    arrival = departure + timedelta(minutes=minutes)
+    return {
+        'departure': {'iataCode': origin, 'at': departure.strftime('%Y-%m-%dT%H:%M:%S')},
+        'arrival': {'iataCode': destination, 'at': arrival.strftime('%Y-%m-%dT%H:%M:%S')},
+        'carrierCode': AIRLINES[seed % len(AIRLINES)],
+        'number': str(100 + seed % 900),
+        'duration': f"PT{minutes // 60}H{minutes % 60}M"
+    }
+
+
+def flight_offers(params):
+    origin = params.get('originLocationCode')
+    destination = params.get('destinationLocationCode')
+    departure_date = params.get('departureDate')
+    if not origin or not destination or not departure_date:
+        return _error(400, 32171, 'MANDATORY DATA MISSING',
+                      'originLocationCode, destinationLocationCode and departureDate are required')
+
+    return_date = params.get('returnDate')
+    currency = params.get('currencyCode', 'GBP')
+    count = int(params.get('max', 5))
+
+    offers = []
+    for i in range(min(count, 20)):
+        seed = _seed(origin, destination, departure_date, return_date, i)
+        outbound = _flight_segment(origin, destination, departure_date, seed)
+        itineraries = [{'duration': outbound['duration'], 'segments': [outbound]}]
+        if return_date:
+            inbound = _flight_segment(destination, origin, return_date, seed // 3)
+            itineraries.append({'duration': inbound['duration'], 'segments': [inbound]})
+
+        offers.append({
+            'type': 'flight-offer',
+            'id': str(i + 1),
+            'itineraries': itineraries,
+            'price': {'currency': currency, 'total': f"{40 + seed % 900 + (seed % 100) / 100:.2f}"},
+            'validatingAirlineCodes': [outbound['carrierCode']]
+        })
+    return 200, {'meta': {'count': len(offers)}, 'data': offers}
+
+
+def hotel_offers(params):
+    city_code = params.get('cityCode')
+    hotel_ids = [h for h in params.get('hotelIds', '').split(',') if h]
+    check_in = params.get('checkInDate')
+    check_out = params.get('checkOutDate')
+    if not (city_code or hotel_ids) or not check_in or not check_out:
+        return _error(400, 32171, 'MANDATORY DATA MISSING', 'cityCode or hotelIds and stay dates are required')
+
+    hotel_ids = hotel_ids or [f"{city_code}STUB{i:02d}" for i in range(5)]
+    data = []
+    for hotel_id in hotel_ids:
+        seed = _seed(hotel_id, check_in, check_out)
+        data.append({
+            'type': 'hotel-offers',
+            'hotel': {
+                'hotelId': hotel_id,
+                'name': f"Stub Hotel {hotel_id}",
+                'rating': str(2 + seed % 4),
+                'cityCode': city_code or hotel_id[:3],
+                'address': {'lines': [f"{seed % 200} Stub Street"], 'cityName': city_code or hotel_id[:3],
+                            'countryCode': 'GB'},
+                'amenities': ['WIFI', 'PARKING'][:1 + seed % 2]
+            },
+            'offers': [{
+                'id': f"OFFER{seed % 100000}",
+                'checkInDate': check_in,
+                'checkOutDate': check_out,
+                'room': {'typeEstimated': {'category': 'STANDARD_ROOM'}},
+                'boardType': 'ROOM_ONLY',
+                'price': {'currency': params.get('currency', 'GBP'), 'total': f"{60 + seed % 400}.00"}
+            }]
+        })
+    return 200, {'data': data}
+
+
+def locations(params):
+    keyword = (params.get('keyword') or '').upper()
+    if not keyword:
+        return _error(400, 32171, 'MANDATORY DATA MISSING', 'keyword is required')
+    code = keyword[:3]
+    return 200, {'data': [{
+        'type': 'location',
+        'subType': 'CITY',
+        'id': f"C{code}",
+        'name': keyword,
+        'iataCode': code,
+        'address': {'cityName': keyword, 'countryName': 'STUBLAND'}
+    }]}
+
+
+def hotels_by_city(params):
+    city_code = params.get('cityCode')
+    if not city_code:
+        return _error(400, 32171, 'MANDATORY DATA MISSING', 'cityCode is required')
+    return 200, {'data': [{'hotelId': f"{city_code}STUB{i:02d}", 'name': f"Stub Hotel {i}"} for i in range(10)]}
+
+
+def activities(params):
+    if 'latitude' not in params or 'longitude' not in params:
+        return _error(400, 32171, 'MANDATORY DATA MISSING', 'latitude and longitude are required')
+    return 200, {'data': [{
+        'id': str(i),
+        'name': f"Stub activity {i}",
+        'price': {'amount': f"{10 + i * 5}.00", 'currencyCode': 'EUR'}
+    } for i in range(5)]}
+
+
+ROUTES = {
+    '/v2/shopping/flight-offers': flight_offers,
+    '/v2/shopping/hotel-offers': hotel_offers,
+    '/v3/shopping/hotel-offers': hotel_offers,
+    '/v1/reference-data/locations': locations,
+    '/v1/reference-data/locations/hotels/by-city': hotels_by_city,
+    '/v1/shopping/activities': activities,
+}
+
+
+class StubState:
+    def __init__(self, token_ttl=1799, latency_ms=0):
+        self.token_ttl = token_ttl
+        self.latency_ms = latency_ms
+        self.tokens = {}
+        self.token_requests = 0
+        self.requests = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+class AmadeusStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so client connection pooling is observable
+    state = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/vnd.amadeus+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+
+        if urlparse(self.path).path != '/v1/security/oauth2/token':
+            return self._send(*_error(404, 38196, 'Resource not found'))
+        if form.get('grant_type') != ['client_credentials'] or not form.get('client_id') or not form.get('client_secret'):
+            return self._send(401, {'error': 'invalid_client', 'error_description': 'Client credentials are invalid'})
+
+        with self.state.lock:
+            self.state.token_requests += 1
+            token = f"stub-token-{self.state.token_requests}"
+            self.state.tokens[token] = time.time() + self.state.token_ttl
+
+        self._send(200, {'type': 'amadeusOAuth2Token', 'access_token': token, 'token_type': 'Bearer',
+                         'expires_in': self.state.token_ttl, 'state': 'approved'})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+
+        if parsed.path == '/_stub/stats':
+            with self.state.lock:
+                return self._send(200, {'token_requests': self.state.token_requests,
+                                        'connections': self.state.connections,
+                                        'requests': dict(self.state.requests)})
+
+        handler = ROUTES.get(parsed.path)
+        if handler is None:
+            return self._send(*_error(404, 38196, 'Resource not found'))
+
+        token = self.headers.get('Authorization', '').replace('Bearer ', '', 1)
+        with self.state.lock:
+            expires_at = self.state.tokens.get(token)
+            self.state.requests[parsed.path] = self.state.requests.get(parsed.path, 0) + 1
+        if expires_at is None or expires_at < time.time():
+            return self._send(*_error(401, 38192, 'Invalid access token', 'The access token provided is expired or invalid'))
+
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000)
+        self._send(*handler(params))
+
+
+def start_stub_server(host='127.0.0.1', port=0, token_ttl=1799, latency_ms=0):
+    """Start the stub in a background thread and return (server, base_url)."""
+    handler = type('Handler', (AmadeusStubHandler,), {'state': StubState(token_ttl, latency_ms)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a local Amadeus API stub')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--token-ttl', type=int, default=1799, help='Access token lifetime in seconds')
+    parser.add_argument('--latency-ms', type=int, default=0, help='Artificial latency added to API calls')
+    args = parser.parse_args()
+
+    handler = type('Handler', (AmadeusStubHandler,), {'state': StubState(args.token_ttl, args.latency_ms)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Amadeus stub listening on http://{args.host}:{args.port}")
+    print(f"Set AMADEUS_BASE_URL=http://{args.host}:{args.port} to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,90 @@
+"""
+Benchmark password verification, the CPU-bound part of a login, at several
+hashing costs.
+
+For each rounds setting a hash is created and verified repeatedly, optionally
+from several threads at once to approximate concurrent logins, and the p50/p99
+verification times are reported. Use the results to pick PASSWORD_HASH_ROUNDS.
+
+    python scripts/benchmark_login.py
+    python scripts/benchmark_login.py --scheme pbkdf2_sha256 --rounds 29000 100000 600000 --concurrency 4
+"""
+import argparse
+import json
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.password_hashing import build_password_context, get_password_context
+
+DEFAULT_ROUNDS = {
+    'pbkdf2_sha256': [29000, 100000, 300000, 600000],
+    'bcrypt': [10, 12, 14],
+    'argon2': [2, 3, 4],
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def benchmark(scheme, rounds, iterations, concurrency, password='correct horse battery staple'):
+    context = build_password_context(scheme, rounds)
+    password_hash = context.hash(password)
+
+    def verify(_):
+        started = time.perf_counter()
+        context.verify(password, password_hash)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(verify, range(iterations)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'scheme': scheme,
+        'rounds': rounds,
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+        'max_ms': round(max(samples), 2),
+        'logins_per_second': round(iterations / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark password verification cost')
+    parser.add_argument('--scheme', help='passlib scheme; defaults to PASSWORD_HASH_SCHEME')
+    parser.add_argument('--rounds', type=int, nargs='+', help='Rounds settings to compare')
+    parser.add_argument('--iterations', type=int, default=50, help='Verifications per setting')
+    parser.add_argument('--concurrency', type=int, default=1, help='Threads verifying at once')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    configured = get_password_context()
+    scheme = args.scheme or configured.default_scheme()
+    rounds_settings = args.rounds or DEFAULT_ROUNDS.get(scheme, [None])
+
+    results = [benchmark(scheme, rounds, args.iterations, args.concurrency) for rounds in rounds_settings]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'scheme':<15} {'rounds':>8} {'p50 ms':>9} {'p99 ms':>9} {'logins/s':>9}")
+    for result in results:
+        print(f"{result['scheme']:<15} {str(result['rounds'] or 'default'):>8} "
+              f"{result['p50_ms']:>9} {result['p99_ms']:>9} {result['logins_per_second']:>9}")
+    print(f"\n{args.iterations} verifications per setting, {args.concurrency} concurrent")
+
+
+if __name__ == '__main__':
+    main()
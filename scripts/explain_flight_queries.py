@@ -0,0 +1,114 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+
+from app import create_app
+from app.extensions import db
+
+# Initialize the Flask app
+app = create_app()
+
+# Indexes added by migration 4c7d2e9a1b36, per table
+NEW_INDEXES = {
+    'flight': ['ix_flight_route_departure_cost', 'ix_flight_itinerary_connection', 'ix_flight_cost'],
+    'accommodations': ['ix_accommodations_itinerary_id'],
+    'activity': ['ix_activity_itinerary_id'],
+    'destinations': ['ix_destinations_itinerary_id'],
+}
+
+# The hot-path queries, written with a {hint} placeholder after the table name
+# so the "before" plan can be produced with the new indexes switched off
+QUERIES = [
+    ('flight_search fallback (route)',
+     "SELECT * FROM flight {hint} WHERE departure_airport = :dep AND arrival_airport = :arr"),
+    ('price range for a route',
+     "SELECT MIN(cost), MAX(cost) FROM flight {hint} WHERE departure_airport = :dep AND arrival_airport = :arr"),
+    ('price window for a route and date',
+     "SELECT * FROM flight {hint} WHERE departure_airport = :dep AND arrival_airport = :arr "
+     "AND departure_time >= :day_start AND departure_time < :day_end "
+     "AND cost BETWEEN :low AND :high"),
+    ('price window, any route',
+     "SELECT * FROM flight {hint} WHERE cost BETWEEN :low AND :high"),
+    ('delete_flight connection group',
+     "SELECT id FROM flight {hint} WHERE itinerary_id = :itinerary_id AND connection_group = :group"),
+    ('itinerary accommodations',
+     "SELECT * FROM accommodations {hint} WHERE itinerary_id = :itinerary_id"),
+    ('itinerary activities',
+     "SELECT * FROM activity {hint} WHERE itinerary_id = :itinerary_id"),
+    ('itinerary destinations',
+     "SELECT * FROM destinations {hint} WHERE itinerary_id = :itinerary_id"),
+]
+
+PARAMS = {
+    'dep': 'LHR',
+    'arr': 'JFK',
+    'day_start': '2025-06-01 00:00:00',
+    'day_end': '2025-06-02 00:00:00',
+    'low': 400,
+    'high': 600,
+    'itinerary_id': 1,
+    'group': 'group-1',
+}
+
+
+def table_for(sql):
+    return sql.split(' FROM ', 1)[1].split()[0]
+
+
+def index_hint(dialect, table):
+    """Return the table hint that disables the new indexes for the "before" plan."""
+    if dialect == 'sqlite':
+        return 'NOT INDEXED'
+    if dialect == 'mysql':
+        existing = {row[2] for row in db.session.execute(text(f"SHOW INDEX FROM {table}"))}
+        ignored = [name for name in NEW_INDEXES[table] if name in existing]
+        return f"IGNORE INDEX ({', '.join(ignored)})" if ignored else ''
+    return ''
+
+
+def explain(dialect, sql):
+    if dialect == 'sqlite':
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"), PARAMS).fetchall()
+        return [row[-1] for row in rows]
+
+    result = db.session.execute(text(f"EXPLAIN {sql}"), PARAMS)
+    columns = list(result.keys())
+    lines = []
+    for row in result:
+        values = dict(zip(columns, row))
+        lines.append(f"table={values.get('table')} type={values.get('type')} "
+                     f"key={values.get('key')} rows={values.get('rows')} extra={values.get('Extra')}")
+    return lines
+
+
+def explain_flight_queries():
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        if dialect not in ('sqlite', 'mysql'):
+            print(f"Query plans are only reported for SQLite and MySQL (connected to {dialect})")
+            return
+
+        print(f"Query plan report ({dialect}: {db.engine.url.render_as_string(hide_password=True)})")
+
+        for label, sql in QUERIES:
+            table = table_for(sql)
+            before = explain(dialect, sql.format(hint=index_hint(dialect, table)))
+            after = explain(dialect, sql.format(hint=''))
+
+            print(f"\n=== {label} ===")
+            print("Before (new indexes ignored):")
+            for line in before:
+                print(f"  {line}")
+            print("After:")
+            for line in after:
+                print(f"  {line}")
+
+            uses_new_index = any(name in line for line in after for name in NEW_INDEXES[table])
+            print(f"Uses new index: {'yes' if uses_new_index else 'NO'}")
+
+if __name__ == "__main__":
+    explain_flight_queries()
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import json
+import urllib.request
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.amadeus_transport import AmadeusTransport, AmadeusTransportError
+from scripts.amadeus_stub_server import start_stub_server
+
+
+def stub_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_stub/stats") as response:
+        return json.loads(response.read())
+
+
+def test_amadeus_transport():
+    server, base_url = start_stub_server(token_ttl=3)
+    print(f"Started Amadeus stub on {base_url}")
+
+    try:
+        transport = AmadeusTransport('stub-id', 'stub-secret', base_url, token_refresh_margin=1)
+
+        # Repeated searches share one token and one pooled connection
+        for _ in range(10):
+            response = transport.shopping.flight_offers_search.get(
+                originLocationCode='LHR',
+                destinationLocationCode='JFK',
+                departureDate='2025-06-01',
+                adults=1,
+                currencyCode='GBP',
+                max=5
+            )
+            assert len(response.data) == 5, response.result
+
+        stats = stub_stats(base_url)
+        print(f"After 10 searches: {stats}")
+        assert stats['token_requests'] == 1, "expected the token to be cached"
+        assert stats['connections'] <= 2, "expected keep-alive connections to be reused"
+
+        # Nested endpoints and SDK-style parameter encoding
+        cities = transport.reference_data.locations.get(keyword='London', subType=['CITY'], page={'limit': 5})
+        assert cities.data[0]['iataCode'] == 'LON'
+        hotels = transport.reference_data.locations.hotels.by_city.get(cityCode='PAR')
+        assert len(hotels.data) == 10
+
+        # Inside the refresh margin the token is renewed ahead of expiry
+        time.sleep(2.2)
+        transport.shopping.flight_offers_search.get(originLocationCode='LHR', destinationLocationCode='CDG',
+                                                    departureDate='2025-06-01', adults=1)
+        assert stub_stats(base_url)['token_requests'] == 2, "expected a refresh-ahead token fetch"
+
+        # A token rejected by the server is replaced and the call retried once
+        server.RequestHandlerClass.state.tokens.clear()
+        transport.shopping.flight_offers_search.get(originLocationCode='LHR', destinationLocationCode='AMS',
+                                                    departureDate='2025-06-01', adults=1)
+        assert stub_stats(base_url)['token_requests'] == 3, "expected a new token after a 401"
+
+        # API errors surface as AmadeusTransportError with the Amadeus error code
+        try:
+            transport.shopping.flight_offers_search.get(originLocationCode='LHR')
+            raise AssertionError("expected a missing-parameter error")
+        except AmadeusTransportError as e:
+            assert e.status_code == 400 and e.code == 32171, e
+
+        print("\nPer-endpoint latency:")
+        for path, entry in transport.stats().items():
+            print(f"  {path}: {entry['calls']} calls, {entry['errors']} errors, "
+                  f"avg {entry['avg_ms']:.1f}ms, max {entry['max_ms']:.1f}ms")
+
+        print("\nAll Amadeus transport checks passed")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_amadeus_transport()
@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.bench import measure_startup
+from config import Config
+
+
+def test_startup_time(runs=5):
+    budget_ms = Config.STARTUP_TIME_BUDGET_MS
+    report = measure_startup(runs)
+
+    print(f"import app:   p50 {report['import_ms']['p50']}ms, max {report['import_ms']['max']}ms")
+    print(f"create_app(): p50 {report['create_app_ms']['p50']}ms, max {report['create_app_ms']['max']}ms")
+    print(f"total:        p50 {report['total_ms']['p50']}ms, max {report['total_ms']['max']}ms (budget {budget_ms}ms)")
+
+    # ML libraries and upstream SDKs should be imported by the features that use them
+    assert not report['lazy_modules_loaded'], \
+        f"create_app() imported {', '.join(report['lazy_modules_loaded'])}; see `python -m app.bench imports`"
+    assert report['total_ms']['p50'] <= budget_ms, \
+        f"cold start took {report['total_ms']['p50']}ms, over the {budget_ms}ms STARTUP_TIME_BUDGET_MS"
+
+    print("\nStartup time check passed")
+
+
+if __name__ == "__main__":
+    test_startup_time()
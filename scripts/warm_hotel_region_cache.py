@@ -0,0 +1,57 @@
+"""
+Warm the hotel region id cache.
+
+Loads a seed file of {city_code: region_id} pairs and/or resolves the given
+city codes through the RapidAPI locations endpoint, then prints cache stats.
+
+    python scripts/warm_hotel_region_cache.py --seed regions.json
+    python scripts/warm_hotel_region_cache.py LON PAR NYC --export regions.json
+"""
+import argparse
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.utils.hotel_api import RapidAPIHotelClient
+
+# Initialize the Flask app
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm the hotel region id cache')
+    parser.add_argument('cities', nargs='*', help='City or airport codes to resolve through the API')
+    parser.add_argument('--seed', help='JSON file of {city_code: region_id} pairs to load')
+    parser.add_argument('--overwrite', action='store_true', help='Let seed entries replace cached ones')
+    parser.add_argument('--export', help='Write the resolved {city_code: region_id} pairs to this file')
+    args = parser.parse_args()
+
+    with app.app_context():
+        client = RapidAPIHotelClient()
+        cache = client.region_cache
+
+        if args.seed:
+            added = cache.warm_from_file(args.seed, overwrite=args.overwrite)
+            print(f"Loaded {added} entries from {args.seed}")
+
+        resolved = {}
+        for city in args.cities:
+            region_id = client._get_destination_id(city)
+            print(f"{city.upper()}: {region_id if region_id is not None else 'unknown'}")
+            if region_id is not None:
+                resolved[city.upper()] = region_id
+
+        if args.export:
+            with open(args.export, 'w') as f:
+                json.dump(resolved, f, indent=2, sort_keys=True)
+            print(f"Wrote {len(resolved)} entries to {args.export}")
+
+        print(f"Cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()